@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+import argparse
+import random
+import time
+
+from pythongame.core.common import HeroId
+from pythongame.core.entity_creation import create_player_state_as_initial
+from pythongame.core.game_state import GameState
+from pythongame.core.pathfinding.flat_grid_astar import FlatGridAStar
+from pythongame.core.pathfinding.grid_astar_pathfinder import GridBasedAStar
+from pythongame.map_file import load_map_from_json_file
+from pythongame.register_game_data import register_all_game_data
+
+# Compares the generic AStar-based grid pathfinder with the array-based one that the game uses, by running both on the
+# same randomly chosen (start, goal) pairs on a map.
+
+PATH_MAX_DISTANCE_FROM_START = 20
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--map', default="resources/maps/map1.json")
+parser.add_argument('--num-searches', type=int, default=300)
+parser.add_argument('--agent-size', type=int, default=2)
+parser.add_argument('--seed', type=int, default=0)
+args = parser.parse_args()
+
+
+def main():
+    register_all_game_data()
+    map_data = load_map_from_json_file(args.map)
+    player_state = create_player_state_as_initial(HeroId.MAGE, {})
+    game_state = GameState(map_data.game_world, (1200, 550), player_state, False, map_data.player_position)
+    clearance_map = game_state.pathfinder_clearance_map
+    print("Map: %s (%i x %i cells)" % (args.map, clearance_map.width, clearance_map.height))
+
+    rng = random.Random(args.seed)
+    free_cells = [(x, y) for x in range(clearance_map.width) for y in range(clearance_map.height)
+                  if clearance_map.is_cell_free(x, y, args.agent_size)]
+    queries = []
+    for _ in range(args.num_searches):
+        start = rng.choice(free_cells)
+        goal = (start[0] + rng.randint(-PATH_MAX_DISTANCE_FROM_START, PATH_MAX_DISTANCE_FROM_START),
+                start[1] + rng.randint(-PATH_MAX_DISTANCE_FROM_START, PATH_MAX_DISTANCE_FROM_START))
+        bounds = (start[0] - PATH_MAX_DISTANCE_FROM_START, start[1] - PATH_MAX_DISTANCE_FROM_START,
+                  start[0] + PATH_MAX_DISTANCE_FROM_START, start[1] + PATH_MAX_DISTANCE_FROM_START)
+        queries.append((start, goal, bounds))
+
+    generic_astar = GridBasedAStar(clearance_map, (args.agent_size, args.agent_size))
+    generic_path_lengths = []
+    start_time = time.time()
+    for start, goal, bounds in queries:
+        generic_astar.set_pathfinding_bounds(*bounds)
+        result = generic_astar.astar(start, goal)
+        generic_path_lengths.append(len(list(result)) if result is not None else None)
+    generic_duration = time.time() - start_time
+
+    flat_astar = FlatGridAStar(clearance_map)
+    flat_path_lengths = []
+    start_time = time.time()
+    for start, goal, bounds in queries:
+        result = flat_astar.find_path(start, goal, args.agent_size, bounds)
+        flat_path_lengths.append(len(result) if result is not None else None)
+    flat_duration = time.time() - start_time
+
+    num_found = len([length for length in flat_path_lengths if length is not None])
+    print("Searches: %i (%i paths found)" % (len(queries), num_found))
+    print("Generic AStar:  %.1fms total, %.2fms per search" % (
+        generic_duration * 1000, generic_duration * 1000 / len(queries)))
+    print("Flat grid A*:   %.1fms total, %.2fms per search" % (
+        flat_duration * 1000, flat_duration * 1000 / len(queries)))
+    print("Speedup: %.1fx" % (generic_duration / flat_duration))
+    if generic_path_lengths != flat_path_lengths:
+        print("WARNING: The pathfinders found paths of different lengths!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import platform
+
+from pythongame.benchmark_scenarios import SCENARIOS, get_scenario, run_scenario
+from pythongame.core.common import Millis
+
+# Runs stress scenarios through the game engine (without rendering) and reports frame time percentiles and the time
+# spent in each phase of the frame, as JSON. Save the output from different commits to compare them.
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--map', default="map1.json")
+parser.add_argument('--scenario', action='append', choices=[s.name for s in SCENARIOS],
+                    help="Can be given several times. All scenarios are run by default.")
+parser.add_argument('--ticks', type=int, default=600)
+parser.add_argument('--warmup-ticks', type=int, default=60)
+parser.add_argument('--tick-duration', type=int, default=16, help="Milliseconds of game time per tick")
+parser.add_argument('--seed', type=int, default=0)
+parser.add_argument('--output', help="File to write the JSON results to. They are printed if this is left out.")
+args = parser.parse_args()
+
+scenarios = [get_scenario(name) for name in args.scenario] if args.scenario else SCENARIOS
+results = {
+    "python_version": platform.python_version(),
+    "map": args.map,
+    "scenarios": [run_scenario(scenario, "resources/maps/" + args.map, args.ticks, args.warmup_ticks,
+                               Millis(args.tick_duration), args.seed)
+                  for scenario in scenarios]
+}
+
+json_string = json.dumps(results, indent=2)
+if args.output:
+    with open(args.output, 'w') as output_file:
+        output_file.write(json_string)
+    print("Saved benchmark results to " + args.output)
+else:
+    print(json_string)
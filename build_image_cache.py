@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+import time
+
+import pygame
+
+from pythongame.core.game_data import ENTITY_SPRITE_INITIALIZERS, UI_ICON_SPRITE_PATHS, PORTRAIT_ICON_SPRITE_PATHS
+from pythongame.core.view.image_cache import CACHE_DIRECTORY
+from pythongame.core.view.image_loading import LazyImagesBySprite, load_images_by_ui_sprite, \
+    load_images_by_portrait_sprite, SPRITE_IMAGES_MAX_NUM_BYTES
+from pythongame.map_editor.map_editor_ui_view import MAP_EDITOR_UI_ICON_SIZE
+from pythongame.register_game_data import register_all_game_data
+from pythongame.scenes.scenes_game.game_ui_view import UI_ICON_SIZE, UI_ICON_BIG_SIZE, PORTRAIT_ICON_SIZE
+
+# Scales all images that are used by the game and the map editor and stores them in the image cache, so that the first
+# startup is as fast as the following ones. (Without this, the cache is filled as the images are first loaded.)
+
+register_all_game_data()
+
+
+def main():
+    pygame.init()
+    # Images can only be converted to the screen's pixel format once there is a screen
+    pygame.display.set_mode((1, 1))
+    start_time = time.perf_counter()
+    images_by_sprite = LazyImagesBySprite(ENTITY_SPRITE_INITIALIZERS, SPRITE_IMAGES_MAX_NUM_BYTES)
+    images_by_sprite.preload(ENTITY_SPRITE_INITIALIZERS.keys())
+    for icon_size in [UI_ICON_SIZE, UI_ICON_BIG_SIZE, MAP_EDITOR_UI_ICON_SIZE]:
+        load_images_by_ui_sprite(UI_ICON_SPRITE_PATHS, icon_size)
+    load_images_by_portrait_sprite(PORTRAIT_ICON_SPRITE_PATHS, PORTRAIT_ICON_SIZE)
+    print("Image cache in '%s/' is up to date (%.2fs)" % (CACHE_DIRECTORY, time.perf_counter() - start_time))
+
+
+if __name__ == "__main__":
+    main()
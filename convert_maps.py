@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+import argparse
+import glob
+import os
+import time
+
+from pythongame.core.global_path_finder import init_global_path_finder
+from pythongame.map_file import load_map_from_json_file, save_map_to_binary_file, load_map_from_binary_file
+from pythongame.register_game_data import register_all_game_data
+
+# Converts JSON maps to the binary map format, which the game loads much faster. The binary file is written next to
+# the JSON file. (The map editor keeps the binary file up to date when it saves a map, so this is mostly needed for
+# maps that have been edited by hand or generated.)
+
+register_all_game_data()
+
+parser = argparse.ArgumentParser()
+parser.add_argument('maps', nargs='*', help="JSON map files to convert (defaults to all maps in resources/maps/)")
+
+
+def main(args):
+    # NPC's need the global path finder to be initialized when they are created
+    init_global_path_finder()
+    map_file_paths = args.maps or sorted(glob.glob("resources/maps/*.json"))
+    for map_file_path in map_file_paths:
+        start_time = time.perf_counter()
+        map_data = load_map_from_json_file(map_file_path)
+        json_load_time = time.perf_counter() - start_time
+
+        binary_map_file_path = save_map_to_binary_file(map_data, map_file_path)
+
+        start_time = time.perf_counter()
+        load_map_from_binary_file(binary_map_file_path)
+        binary_load_time = time.perf_counter() - start_time
+
+        print("%s: %d kB, loaded in %.1fms  ->  %s: %d kB, loaded in %.1fms" % (
+            map_file_path, os.path.getsize(map_file_path) // 1024, json_load_time * 1000,
+            binary_map_file_path, os.path.getsize(binary_map_file_path) // 1024, binary_load_time * 1000))
+
+
+if __name__ == "__main__":
+    main(parser.parse_args())
@@ -23,7 +23,8 @@ def main():
         room_allowed_width=(8, 25),
         room_allowed_height=(8, 25),
         corridor_allowed_width=(2, 6),
-        generate_npc=generate_npc, )
+        generate_npc=generate_npc,
+        rng=random)
     grid, rooms = dungeon_generator.generate_random_grid()
     json = dungeon_generator.generate_random_map_as_json_from_grid(grid, rooms)
     write_json_to_file(json, "resources/maps/dudmap.json")
@@ -1,4 +1,6 @@
 #!/usr/bin/env python3
+import random
+
 from pythongame.core.game_data import CONSUMABLES, \
     get_consumables_with_level
 from pythongame.core.item_data import get_items_with_level, get_item_data_by_type, create_item_description, \
@@ -18,7 +20,7 @@ def print_loot():
             print("{:<25}".format(c_type.name) + "{:<15}".format("") + str(CONSUMABLES[c_type].description))
         for i_type in item_types:
             data = get_item_data_by_type(i_type)
-            description_lines = [line.text for line in create_item_description(randomized_item_id(i_type))]
+            description_lines = [line.text for line in create_item_description(randomized_item_id(i_type, random))]
             print("{:<25}".format(data.base_name) + "{:<15}".format("(unique)" if data.is_unique else "") + ", ".join(
                 description_lines))
         print("")
@@ -0,0 +1,163 @@
+import random
+import time
+from typing import Callable, List, Dict, Any
+
+from pythongame.core.buff_effects import get_buff_effect
+from pythongame.core.common import HeroId, NpcType, Millis, BuffType, ItemType
+from pythongame.core.entity_creation import create_npc
+from pythongame.core.frame_phase_timer import FramePhaseTimer
+from pythongame.core.item_data import randomized_item_id, get_item_data_by_type
+from pythongame.core.item_inventory import ItemEquipmentCategory
+from pythongame.headless_runner import HeadlessRunner
+
+# Reproducible stress scenarios for the game simulation. Each scenario is set up on top of a freshly loaded map, and
+# is then run headless with a fixed time step while frame times are measured.
+
+MELEE_ENEMY_TYPES = [NpcType.GOBLIN_WARRIOR, NpcType.GOBLIN_WORKER, NpcType.ZOMBIE, NpcType.ZOMBIE_FAST, NpcType.MUMMY,
+                     NpcType.VETERAN, NpcType.WARRIOR]
+
+PLAYER_BUFF_TYPES = [BuffType.HEALING_OVER_TIME, BuffType.INCREASED_MOVE_SPEED, BuffType.BLOOD_LUST,
+                     BuffType.ELIXIR_OF_POWER, BuffType.ELIXIR_OF_MAGIC_RESIST, BuffType.SHRINE_DAMAGE,
+                     BuffType.SHRINE_ARMOR, BuffType.SHRINE_MAGIC_RESIST, BuffType.SHRINE_MOVE_SPEED,
+                     BuffType.BUFFED_BY_HEALING_WAND, BuffType.RESTORING_HEALTH_FROM_BREW,
+                     BuffType.PROTECTED_BY_STONE_AMULET, BuffType.BUFFED_FROM_RETRIBUTION_TALENT,
+                     BuffType.INCREASED_DAMAGE_FROM_NECKLACE_OF_SUFFERING, BuffType.ITEM_WINGED_HELMET,
+                     BuffType.ITEM_CANDLE, BuffType.ITEM_WHIP, BuffType.ITEM_BLOOD_AMULET]
+
+# NPC's are spawned within this distance from the player, so that they are close enough to the camera to be active
+SPAWN_MAX_DISTANCE = (450, 280)
+
+
+class BenchmarkScenario:
+    def __init__(self, name: str, description: str, hero_id: HeroId,
+                 setup: Callable[[HeadlessRunner, random.Random], None]):
+        self.name = name
+        self.description = description
+        self.hero_id = hero_id
+        self.setup = setup
+
+
+def _make_player_unkillable(runner: HeadlessRunner):
+    # The player would otherwise die quickly in most scenarios, which changes what is being measured
+    health = runner.game_state.player_state.health_resource
+    health.increase_max(10 ** 9)
+    health.gain_to_max()
+
+
+def _spawn_npcs_around_player(runner: HeadlessRunner, rng: random.Random, npc_types: List[NpcType], count: int):
+    game_world = runner.game_state.game_world
+    player_x, player_y = game_world.player_entity.get_position()
+    num_spawned = 0
+    num_attempts = 0
+    while num_spawned < count and num_attempts < count * 50:
+        num_attempts += 1
+        position = (player_x + rng.randint(-SPAWN_MAX_DISTANCE[0], SPAWN_MAX_DISTANCE[0]),
+                    player_y + rng.randint(-SPAWN_MAX_DISTANCE[1], SPAWN_MAX_DISTANCE[1]))
+        npc = create_npc(rng.choice(npc_types), position)
+        if not game_world.would_entity_collide_if_new_pos(npc.world_entity, position):
+            game_world.add_non_player_character(npc)
+            num_spawned += 1
+
+
+def _setup_melee_chase(runner: HeadlessRunner, rng: random.Random):
+    _make_player_unkillable(runner)
+    _spawn_npcs_around_player(runner, rng, MELEE_ENEMY_TYPES, 200)
+
+
+def _setup_projectile_storm(runner: HeadlessRunner, rng: random.Random):
+    _make_player_unkillable(runner)
+    _spawn_npcs_around_player(runner, rng, [NpcType.SKELETON_MAGE, NpcType.GOBLIN_WARLOCK], 80)
+
+
+def _setup_summons_fighting(runner: HeadlessRunner, rng: random.Random):
+    _make_player_unkillable(runner)
+    _spawn_npcs_around_player(runner, rng, [NpcType.PLAYER_SUMMON_DRAGON], 50)
+    _spawn_npcs_around_player(runner, rng, MELEE_ENEMY_TYPES, 50)
+
+
+def _setup_buffed_player(runner: HeadlessRunner, rng: random.Random):
+    _make_player_unkillable(runner)
+    # Fill every equipment slot (and the rest of the inventory) with items, so that many item effects are active
+    item_types_by_category: Dict[ItemEquipmentCategory, List[ItemType]] = {}
+    for item_type in ItemType:
+        category = get_item_data_by_type(item_type).item_equipment_category
+        item_types_by_category.setdefault(category, []).append(item_type)
+    for item_types in item_types_by_category.values():
+        runner.game_engine.try_add_item_to_inventory(randomized_item_id(rng.choice(item_types), rng))
+    inventory_slots = runner.game_state.player_state.item_inventory.slots
+    for _ in [slot for slot in inventory_slots if slot.is_empty() and slot.enforced_equipment_category is None]:
+        runner.game_engine.try_add_item_to_inventory(randomized_item_id(rng.choice(list(ItemType)), rng))
+    for buff_type in PLAYER_BUFF_TYPES:
+        runner.game_state.player_state.gain_buff_effect(get_buff_effect(buff_type), Millis(10 ** 9))
+    _spawn_npcs_around_player(runner, rng, MELEE_ENEMY_TYPES, 30)
+
+
+SCENARIOS = [
+    BenchmarkScenario("melee_chase", "200 melee enemies chasing the player on map1", HeroId.WARRIOR,
+                      _setup_melee_chase),
+    BenchmarkScenario("projectile_storm", "Skeleton mages and goblin warlocks shooting at the player",
+                      HeroId.WARRIOR, _setup_projectile_storm),
+    BenchmarkScenario("summons_fighting", "50 summoned dragons fighting 50 melee enemies", HeroId.MAGE,
+                      _setup_summons_fighting),
+    BenchmarkScenario("buffed_player", "Player with many buffs and item effects, among a few enemies",
+                      HeroId.WARRIOR, _setup_buffed_player),
+]
+
+
+def get_scenario(name: str) -> BenchmarkScenario:
+    for scenario in SCENARIOS:
+        if scenario.name == name:
+            return scenario
+    raise Exception("Unknown benchmark scenario: " + name)
+
+
+def run_scenario(scenario: BenchmarkScenario, map_file_path: str, num_ticks: int, num_warmup_ticks: int,
+                 tick_duration: Millis, seed: int) -> Dict[str, Any]:
+    runner = HeadlessRunner(map_file_path, scenario.hero_id, random.Random(seed))
+    scenario.setup(runner, random.Random(seed))
+    num_npcs_at_start = len(runner.game_state.game_world.non_player_characters)
+
+    # Warm-up lets lazily initialized data (pathfinding etc) be set up before measuring
+    runner.run(num_warmup_ticks, tick_duration)
+
+    phase_timer = FramePhaseTimer()
+    runner.game_engine.phase_timer = phase_timer
+    frame_times = []
+    max_num_projectiles = 0
+    for _ in range(num_ticks):
+        start_time = time.perf_counter()
+        runner.game_engine.run_one_frame(tick_duration)
+        frame_times.append((time.perf_counter() - start_time) * 1000)
+        max_num_projectiles = max(max_num_projectiles, len(runner.game_state.game_world.projectile_entities))
+    runner.game_engine.phase_timer = None
+
+    return {
+        "scenario": scenario.name,
+        "description": scenario.description,
+        "ticks": num_ticks,
+        "tick_duration_ms": tick_duration,
+        "seed": seed,
+        "npcs_at_start": num_npcs_at_start,
+        "npcs_at_end": len(runner.game_state.game_world.non_player_characters),
+        "max_projectiles": max_num_projectiles,
+        "frame_time_ms": _summarize(frame_times),
+        "phase_time_ms": {phase: _summarize(durations)
+                          for phase, durations in phase_timer.durations_by_phase.items()},
+    }
+
+
+def _summarize(durations: List[float]) -> Dict[str, float]:
+    sorted_durations = sorted(durations)
+    return {
+        "mean": round(sum(sorted_durations) / len(sorted_durations), 3),
+        "p50": round(_percentile(sorted_durations, 50), 3),
+        "p90": round(_percentile(sorted_durations, 90), 3),
+        "p99": round(_percentile(sorted_durations, 99), 3),
+        "max": round(sorted_durations[-1], 3),
+    }
+
+
+# Nearest-rank percentile of an already sorted list
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    index = max(0, int(round(percentile / 100 * len(sorted_values))) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
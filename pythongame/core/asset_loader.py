@@ -0,0 +1,47 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import Callable, Any, List, Optional
+
+MAX_NUM_WORKERS = 8
+
+
+# Decodes asset files (images and sounds) on worker threads, so that the main thread can show the loading progress
+# meanwhile. pygame releases the GIL while decoding files, so with several CPU cores the files are decoded in parallel.
+# Anything that needs the display (like converting images to the screen's pixel format) has to be done afterwards, on
+# the main thread.
+#
+# With 0 workers, each file is decoded right away when it's submitted. That's the default with a single CPU core, as
+# there is nothing to gain from decoding in the background then.
+class AssetLoader:
+    def __init__(self, num_workers: Optional[int] = None):
+        if num_workers is None:
+            num_cpus = os.cpu_count() or 1
+            num_workers = min(MAX_NUM_WORKERS, num_cpus) if num_cpus > 1 else 0
+        self._executor = ThreadPoolExecutor(max_workers=num_workers) if num_workers > 0 else None
+        self._futures: List[Future] = []
+
+    def submit(self, decode: Callable[..., Any], *args) -> Future:
+        if self._executor:
+            future = self._executor.submit(decode, *args)
+        else:
+            future = Future()
+            future.set_result(decode(*args))
+        self._futures.append(future)
+        return future
+
+    def get_progress(self) -> float:
+        if not self._futures:
+            return 1
+        return len([f for f in self._futures if f.done()]) / len(self._futures)
+
+    def is_done(self) -> bool:
+        return all(f.done() for f in self._futures)
+
+    # Blocks until all files have been decoded or the timeout runs out, so that a loading screen doesn't take CPU time
+    # from the workers by rendering as fast as it can
+    def wait(self, timeout_seconds: float):
+        wait(self._futures, timeout_seconds)
+
+    def shutdown(self):
+        if self._executor:
+            self._executor.shutdown()
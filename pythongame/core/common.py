@@ -693,17 +693,17 @@ class ItemId:
         return string
 
     @staticmethod
-    def randomized_base(item_type: ItemType, name: str, base_stats: List[StatModifierInterval]):
-        modifiers = [StatModifier(modifier_interval.hero_stat, random.choice(modifier_interval.interval))
+    def randomized_base(item_type: ItemType, name: str, base_stats: List[StatModifierInterval], rng: random.Random):
+        modifiers = [StatModifier(modifier_interval.hero_stat, rng.choice(modifier_interval.interval))
                      for modifier_interval in base_stats]
         return ItemId(item_type, name, modifiers, [])
 
     @staticmethod
     def randomized_with_affix(item_type: ItemType, name: str, base_stats: List[StatModifierInterval],
-                              affix_stats: List[StatModifierInterval]):
-        base_stat_modifiers = [StatModifier(modifier_interval.hero_stat, random.choice(modifier_interval.interval))
+                              affix_stats: List[StatModifierInterval], rng: random.Random):
+        base_stat_modifiers = [StatModifier(modifier_interval.hero_stat, rng.choice(modifier_interval.interval))
                                for modifier_interval in base_stats]
-        affix_stat_modifiers = [StatModifier(modifier_interval.hero_stat, random.choice(modifier_interval.interval))
+        affix_stat_modifiers = [StatModifier(modifier_interval.hero_stat, rng.choice(modifier_interval.interval))
                                 for modifier_interval in affix_stats]
         return ItemId(item_type, name, base_stat_modifiers, affix_stat_modifiers)
 
@@ -1011,7 +1011,8 @@ class AbstractScene:
     def run_one_frame(self, _time_passed: Millis) -> Optional[SceneTransition]:
         pass
 
-    def render(self):
+    # Returns the parts of the screen that were changed, or None if the entire screen should be updated
+    def render(self) -> Optional[List[Any]]:
         pass
 
 
@@ -53,22 +53,22 @@ def deal_damage_to_player(game_state: GameState, base_amount: float, damage_type
     if damage_type == DamageType.PHYSICAL:
         dodge_chance = player_state.get_effective_dodge_chance()
         block_chance = player_state.get_effective_block_chance()
-        if random.random() < dodge_chance:
+        if game_state.rng.random() < dodge_chance:
             game_state.game_world.visual_effects.append(create_visual_dodge_text(game_state.game_world.player_entity))
             play_sound(SoundId.ENEMY_ATTACK_WAS_DODGED)
             player_state.notify_about_event(PlayerDodgedEvent(npc_attacker), game_state)
             return
-        elif random.random() < block_chance:
+        elif game_state.rng.random() < block_chance:
             if player_state.block_damage_reduction > 0:
                 game_state.game_world.visual_effects.append(
                     create_visual_block_text(game_state.game_world.player_entity))
             damage_reduction += player_state.block_damage_reduction
             player_state.notify_about_event(PlayerBlockedEvent(npc_attacker), game_state)
         # Armor has a random element to it. Example: 5 armor absorbs 0-5 damage
-        damage_reduction += random.randint(0, player_state.get_effective_armor())
+        damage_reduction += game_state.rng.randint(0, player_state.get_effective_armor())
     elif damage_type == DamageType.MAGIC:
         resist_chance = player_state.get_effective_magic_resist_chance()
-        if random.random() < resist_chance:
+        if game_state.rng.random() < resist_chance:
             game_state.game_world.visual_effects.append(create_visual_resist_text(game_state.game_world.player_entity))
             play_sound(SoundId.MAGIC_DAMAGE_WAS_RESISTED)
             return
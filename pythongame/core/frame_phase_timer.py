@@ -0,0 +1,22 @@
+import time
+from typing import Dict, List
+
+
+# Measures how long the different phases of a frame take. The game engine reports the end of each phase to the timer
+# if one has been set (which is only done by benchmarks).
+class FramePhaseTimer:
+
+    def __init__(self):
+        self.durations_by_phase: Dict[str, List[float]] = {}  # in milliseconds
+        self._phase_start_time = None
+
+    def start_frame(self):
+        self._phase_start_time = time.perf_counter()
+
+    def end_phase(self, phase: str):
+        now = time.perf_counter()
+        self.durations_by_phase.setdefault(phase, []).append((now - self._phase_start_time) * 1000)
+        self._phase_start_time = now
+
+    def clear(self):
+        self.durations_by_phase.clear()
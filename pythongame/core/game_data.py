@@ -217,7 +217,8 @@ def register_consumable_level(consumable_type: ConsumableType, level: int):
 
 
 def get_consumables_with_level(level: int) -> List[ConsumableType]:
-    return list(consumable_types_grouped_by_level.get(level, set()))
+    # Sorted for the same reason as in get_items_with_level()
+    return sorted(consumable_types_grouped_by_level.get(level, set()), key=lambda consumable: consumable.value)
 
 
 def get_optional_consumable_level(consumable_type: ConsumableType) -> Optional[int]:
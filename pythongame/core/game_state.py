@@ -1,3 +1,4 @@
+import random
 from typing import Dict
 
 from pygame.rect import Rect
@@ -9,6 +10,7 @@ from pythongame.core.health_and_mana import HealthOrManaResource
 from pythongame.core.item_inventory import ItemInventory
 from pythongame.core.math import boxes_intersect, rects_intersect, get_position_from_center_position, \
     is_x_and_y_within_distance
+from pythongame.core.pathfinding.clearance_map import ClearanceMap
 from pythongame.core.quests import QuestId, Quest
 from pythongame.core.talents import TalentsConfig, TalentsState
 from pythongame.core.world_entity import WorldEntity
@@ -16,6 +18,9 @@ from pythongame.game_data.loot_tables import LootTableId
 
 GRID_CELL_WIDTH = 25
 
+# How far outside of the camera an entity can be and still be visible, as its sprite can be larger than the entity
+RENDER_AREA_MARGIN = 250
+
 
 class LootableOnGround:
     def __init__(self, world_entity: WorldEntity):
@@ -658,6 +663,9 @@ class GameWorldState:
         self.items_on_ground: List[ItemOnGround] = items_on_ground
         self.money_piles_on_ground: List[MoneyPileOnGround] = money_piles_on_ground
         self.non_player_characters: List[NonPlayerCharacter] = non_player_characters
+        self._npcs_spatial_hash = SpatialHash()
+        for npc in non_player_characters:
+            self._npcs_spatial_hash.add_entity(npc.world_entity, npc)
         self.entire_world_area = entire_world_area
         self.walls_state = WallsState(walls, entire_world_area)
         self.visual_effects = []
@@ -668,10 +676,17 @@ class GameWorldState:
         self.chests: List[Chest] = chests
         self.dungeon_entrances = dungeon_entrances
         self.player_movement_speed_was_updated = Observable()
+        # Only set for large maps, where most walls, decorations and enemies are loaded by region, as the camera gets
+        # close to them (see map_streaming.py)
+        self.region_streamer = None
 
     def get_portal_with_id(self, portal_id: PortalId) -> Portal:
         return [p for p in self.portals if p.portal_id == portal_id][0]
 
+    def update_streamed_regions(self, camera_world_area: Rect):
+        if self.region_streamer is not None:
+            self.region_streamer.update(self, camera_world_area)
+
     def notify_movement_speed_observers(self):
         self.player_movement_speed_was_updated.notify(self.player_entity.get_speed_multiplier())
 
@@ -686,33 +701,49 @@ class GameWorldState:
 
     def add_non_player_character(self, npc: NonPlayerCharacter):
         self.non_player_characters.append(npc)
+        self._npcs_spatial_hash.add_entity(npc.world_entity, npc)
+
+    def remove_non_player_character(self, npc: NonPlayerCharacter):
+        self.non_player_characters.remove(npc)
+        self._npcs_spatial_hash.remove_entity(npc.world_entity)
+        self._cancel_path_requests(npc)
+
+    # Path requests that an NPC has queued (see NpcPathfinder) would otherwise still be handled after the NPC has been
+    # removed, using up the path finder's frame budget
+    @staticmethod
+    def _cancel_path_requests(npc: NonPlayerCharacter):
+        pathfinder = getattr(npc.npc_mind, "pathfinder", None)
+        if pathfinder is not None:
+            pathfinder.cancel_requests()
 
     def remove_all_player_summons(self):
+        for npc in self.non_player_characters:
+            if npc.npc_category == NpcCategory.PLAYER_SUMMON:
+                self._npcs_spatial_hash.remove_entity(npc.world_entity)
+                self._cancel_path_requests(npc)
         self.non_player_characters = [npc for npc in self.non_player_characters
                                       if npc.npc_category != NpcCategory.PLAYER_SUMMON]
 
     def get_walls_in_sight_of_player(self, camera_world_area: Rect) -> List[WorldEntity]:
         return self.walls_state.get_walls_in_camera(camera_world_area)
 
-    def get_decorations_to_render(self, camera_world_area: Rect) -> List[DecorationEntity]:
-        return self.decorations_state.get_decorations_in_camera(camera_world_area)
-
     def get_projectiles_intersecting_with(self, entity: WorldEntity) -> List[Projectile]:
         return [p for p in self.projectile_entities if boxes_intersect(entity.rect(), p.world_entity.rect())]
 
     def get_enemy_intersecting_with(self, entity: WorldEntity) -> List[NonPlayerCharacter]:
-        return [e for e in self.non_player_characters if
+        return [e for e in self._npcs_spatial_hash.get_items_close_to_rect(entity.rect()) if
                 e.is_enemy and boxes_intersect(e.world_entity.rect(), entity.rect())]
 
     def get_enemy_intersecting_rect(self, rect: Rect) -> List[NonPlayerCharacter]:
-        return [e for e in self.non_player_characters if e.is_enemy and rects_intersect(e.world_entity.rect(), rect)]
+        return [e for e in self._npcs_spatial_hash.get_items_close_to_rect(rect)
+                if e.is_enemy and rects_intersect(e.world_entity.rect(), rect)]
 
     def get_enemies_within_x_y_distance_of(self, distance: int, position: Tuple[int, int]):
-        return [e for e in self.non_player_characters
+        area = Rect(position[0] - distance, position[1] - distance, distance * 2, distance * 2)
+        return [e for e in self._npcs_spatial_hash.get_items_close_to_rect(area)
                 if e.is_enemy
                 and is_x_and_y_within_distance(e.world_entity.get_center_position(), position, distance)]
 
-    # NOTE: Very naive brute-force collision checking
     def update_world_entity_position_within_game_world(self, entity: WorldEntity, time_passed: Millis):
         new_position = entity.get_new_position_according_to_dir_and_speed(time_passed)
         if new_position:
@@ -721,7 +752,6 @@ class GameWorldState:
             if not self.would_entity_collide_if_new_pos(entity, new_pos_within_world):
                 entity.set_position(new_pos_within_world)
 
-    # NOTE: Very naive brute-force collision checking
     def update_npc_position_within_game_world(self, npc: NonPlayerCharacter, time_passed: Millis):
         entity = npc.world_entity
         new_position = entity.get_new_position_according_to_dir_and_speed(time_passed)
@@ -737,21 +767,28 @@ class GameWorldState:
                 entity.set_position(new_pos_within_world)
 
     # TODO Improve the interaction between functions in here
-    def would_entity_collide_if_new_pos(self, entity, new_pos_within_world):
+    def would_entity_collide_if_new_pos(self, entity: WorldEntity, new_pos_within_world: Tuple[int, int]) -> bool:
         if not self.is_position_within_game_world(new_pos_within_world):
             raise Exception("not within game-world: " + str(new_pos_within_world))
-        old_pos = entity.x, entity.y
-        entity.set_position(new_pos_within_world)
-        walls = self.walls_state.get_walls_close_to_position(entity.get_position())
-        other_entities = [e.world_entity for e in self.non_player_characters] + \
-                         [self.player_entity] + walls + [p.world_entity for p in self.portals] + \
-                         [s.world_entity for s in self.shrines] + \
-                         [w.world_entity for w in self.warp_points] + [c.world_entity for c in self.chests] + \
-                         [e.world_entity for e in self.dungeon_entrances]
-        collision = any([other for other in other_entities if self._entities_collide(entity, other)
-                         and entity is not other])
-        entity.set_position(old_pos)
-        return collision
+        # The rect is moved the same way as in WorldEntity.set_position, without touching the entity itself
+        new_rect = entity.pygame_collision_rect.copy()
+        new_rect.x = new_pos_within_world[0]
+        new_rect.y = new_pos_within_world[1]
+        for wall in self.walls_state.get_walls_close_to_position(
+                (int(new_pos_within_world[0]), int(new_pos_within_world[1]))):
+            if new_rect.colliderect(wall.pygame_collision_rect):
+                return True
+        for other in self._npcs_spatial_hash.get_entities_close_to_rect(new_rect):
+            if other is not entity and new_rect.colliderect(other.pygame_collision_rect):
+                return True
+        if self.player_entity is not None and self.player_entity is not entity \
+                and new_rect.colliderect(self.player_entity.pygame_collision_rect):
+            return True
+        for immovable_objects in [self.portals, self.shrines, self.warp_points, self.chests, self.dungeon_entrances]:
+            for obj in immovable_objects:
+                if obj.world_entity is not entity and new_rect.colliderect(obj.world_entity.pygame_collision_rect):
+                    return True
+        return False
 
     def get_within_world(self, pos: Tuple[int, int], size: Tuple[int, int]):
         # TODO extract world area arithmetic
@@ -768,6 +805,9 @@ class GameWorldState:
 
     def remove_dead_npcs(self) -> List[NonPlayerCharacter]:
         npcs_that_died = [npc for npc in self.non_player_characters if npc.health_resource.is_at_or_below_zero()]
+        for npc in npcs_that_died:
+            self._npcs_spatial_hash.remove_entity(npc.world_entity)
+            self._cancel_path_requests(npc)
         self.non_player_characters = [npc for npc in self.non_player_characters if
                                       not npc.health_resource.is_at_or_below_zero()]
         return npcs_that_died
@@ -804,6 +844,24 @@ class GameWorldState:
                [c.world_entity for c in self.chests] + \
                [e.world_entity for e in self.dungeon_entrances]
 
+    # Only the entities that could be visible within the given area. Some sprites reach far outside of their entity
+    # (like the frost nova effect), so entities this far outside of the area are still included.
+    def get_renderable_non_wall_entities_in_area(self, area: Rect) -> List[WorldEntity]:
+        padded_area = area.inflate(RENDER_AREA_MARGIN * 2, RENDER_AREA_MARGIN * 2)
+        # There can be a lot of NPCs in the world, so they are looked up through the spatial hash
+        npc_entities = self._npcs_spatial_hash.get_entities_close_to_rect(padded_area)
+        entities = [p.world_entity for p in self.consumables_on_ground] + \
+                   [i.world_entity for i in self.items_on_ground] + \
+                   [m.world_entity for m in self.money_piles_on_ground] + \
+                   npc_entities + \
+                   [p.world_entity for p in self.projectile_entities] + \
+                   [p.world_entity for p in self.portals] + \
+                   [s.world_entity for s in self.shrines] + \
+                   [w.world_entity for w in self.warp_points] + \
+                   [c.world_entity for c in self.chests] + \
+                   [e.world_entity for e in self.dungeon_entrances]
+        return [self.player_entity] + [e for e in entities if padded_area.colliderect(e.pygame_collision_rect)]
+
 
 class GameState:
     def __init__(self,
@@ -812,32 +870,62 @@ class GameState:
                  player_state: PlayerState,
                  is_dungeon: bool,
                  player_spawn_position: Tuple[int, int],
+                 rng: Optional[random.Random] = None,
+                 pathfinder_clearance: Optional[List[int]] = None,  # see world_snapshot.py
                  ):
 
         self.game_world = game_world
+        # All randomness in the game logic should come from here, so that a game can be replayed deterministically
+        # from a seed (see input_recording.py). Purely cosmetic randomness (particles, sounds) doesn't need to.
+        self.rng: random.Random = rng if rng is not None else random.Random()
         self.camera_size = camera_size
         self.camera_world_area = Rect((0, 0), self.camera_size)
         self.camera_shake: CameraShake = None
-        self.pathfinder_wall_grid = self._setup_pathfinder_wall_grid(
-            self.game_world.entire_world_area, [w.world_entity for w in game_world.walls_state.walls])
+        if game_world.region_streamer is not None:
+            # Pathfinding covers the entire map, including the regions that aren't loaded
+            wall_positions = game_world.region_streamer.wall_positions
+        else:
+            wall_positions = [w.world_entity.get_position() for w in game_world.walls_state.walls]
+        self.pathfinder_wall_grid = self._setup_pathfinder_wall_grid(self.game_world.entire_world_area, wall_positions)
+        self.pathfinder_clearance_map = ClearanceMap(self.pathfinder_wall_grid, pathfinder_clearance)
+        # Walls can be added and removed after setup (in the map editor), so the pathfinding data is kept up to date
+        game_world.walls_state.wall_was_added.register_observer(self._on_wall_added)
+        game_world.walls_state.wall_was_removed.register_observer(self._on_wall_removed)
         self.player_spawn_position: Tuple[int, int] = player_spawn_position
         self.is_dungeon = is_dungeon
         self.player_state: PlayerState = player_state
 
     @staticmethod
-    def _setup_pathfinder_wall_grid(entire_world_area: Rect, walls: List[WorldEntity]):
+    def _setup_pathfinder_wall_grid(entire_world_area: Rect, wall_positions: List[Tuple[int, int]]):
         # TODO extract world area arithmetic
         grid_width = entire_world_area.w // GRID_CELL_WIDTH
         grid_height = entire_world_area.h // GRID_CELL_WIDTH
         grid = []
         for x in range(grid_width + 1):
             grid.append((grid_height + 1) * [0])
-        for w in walls:
-            cell_x = (w.x - entire_world_area.x) // GRID_CELL_WIDTH
-            cell_y = (w.y - entire_world_area.y) // GRID_CELL_WIDTH
+        for position in wall_positions:
+            cell_x, cell_y = GameState._get_pathfinder_cell(entire_world_area, position)
             grid[cell_x][cell_y] = 1
         return grid
 
+    @staticmethod
+    def _get_pathfinder_cell(entire_world_area: Rect, wall_position: Tuple[int, int]) -> Tuple[int, int]:
+        return ((wall_position[0] - entire_world_area.x) // GRID_CELL_WIDTH,
+                (wall_position[1] - entire_world_area.y) // GRID_CELL_WIDTH)
+
+    def _on_wall_added(self, wall: Wall):
+        cell_x, cell_y = self._get_pathfinder_cell(self.game_world.entire_world_area, wall.world_entity.get_position())
+        self.pathfinder_wall_grid[cell_x][cell_y] = 1
+        self.pathfinder_clearance_map.set_blocked((cell_x, cell_y), True)
+
+    def _on_wall_removed(self, wall: Wall):
+        entire_world_area = self.game_world.entire_world_area
+        cell = self._get_pathfinder_cell(entire_world_area, wall.world_entity.get_position())
+        nearby_walls = self.game_world.walls_state.get_walls_close_to_position(wall.world_entity.get_position())
+        if not any([w for w in nearby_walls if self._get_pathfinder_cell(entire_world_area, w.get_position()) == cell]):
+            self.pathfinder_wall_grid[cell[0]][cell[1]] = 0
+            self.pathfinder_clearance_map.set_blocked(cell, False)
+
     def modify_hero_stat(self, hero_stat: HeroStat, stat_delta: Union[int, float]):
         if hero_stat == HeroStat.MOVEMENT_SPEED:
             self.game_world.modify_hero_movement_speed(stat_delta)
@@ -845,14 +933,12 @@ class GameState:
             self.player_state.modify_stat(hero_stat, stat_delta)
 
     def get_all_entities_to_render(self) -> List[WorldEntity]:
-        return self.get_walls_in_sight_of_player() + self.game_world.get_renderable_non_wall_entities()
+        return self.get_walls_in_sight_of_player() + \
+               self.game_world.get_renderable_non_wall_entities_in_area(self.camera_world_area)
 
     def get_walls_in_sight_of_player(self) -> List[WorldEntity]:
         return self.game_world.get_walls_in_sight_of_player(self.camera_world_area)
 
-    def get_decorations_to_render(self) -> List[DecorationEntity]:
-        return self.game_world.get_decorations_to_render(self.camera_world_area)
-
     def handle_camera_shake(self, time_passed: Millis):
         if self.camera_shake is not None:
             self.camera_shake.notify_time_passed(time_passed)
@@ -900,22 +986,46 @@ class WallsState:
         self.walls: List[Wall] = walls
         self._buckets = Buckets([w.world_entity for w in walls], entire_world_area)
         self._entire_world_area = entire_world_area
+        self.wall_was_added = Observable()
+        self.wall_was_removed = Observable()
+        self.walls_were_streamed_in = Observable()
+        self.walls_were_streamed_out = Observable()
 
     def add_wall(self, wall: Wall):
         self.walls.append(wall)
         self._buckets.add_entity(wall.world_entity)
+        self.wall_was_added.notify(wall)
 
     def remove_wall(self, wall: Wall):
         self.walls.remove(wall)
         self._buckets.remove_entity(wall.world_entity)
+        self.wall_was_removed.notify(wall)
+
+    # Walls of a region that was streamed in or out (see map_streaming.py). In contrast to add_wall and remove_wall,
+    # the walls are still part of the map when they're not loaded, so pathfinding isn't affected.
+    def add_streamed_walls(self, walls: List[Wall]):
+        self.walls += walls
+        for wall in walls:
+            self._buckets.add_entity(wall.world_entity)
+        self.walls_were_streamed_in.notify(walls)
+
+    def remove_streamed_walls(self, walls: List[Wall]):
+        walls_to_remove = set(walls)
+        self.walls = [w for w in self.walls if w not in walls_to_remove]
+        for wall in walls:
+            self._buckets.remove_entity(wall.world_entity)
+        self.walls_were_streamed_out.notify(walls)
 
     def remove_all_from_position(self, position: Tuple[int, int]):
         for wall in self.get_walls_at_position(position):
             self.remove_wall(wall)
 
     def clear(self):
+        removed_walls = list(self.walls)
         self.walls.clear()
         self._buckets = Buckets([], self._entire_world_area)
+        for wall in removed_walls:
+            self.wall_was_removed.notify(wall)
 
     # TODO Use _entities_collide?
     def does_entity_intersect_with_wall(self, entity: WorldEntity):
@@ -942,18 +1052,39 @@ class DecorationsState:
         self.decoration_entities: List[DecorationEntity] = decoration_entities
         self._buckets = Buckets(decoration_entities, entire_world_area)
         self._entire_world_area = entire_world_area
+        self.decoration_was_added = Observable()
+        self.decoration_was_removed = Observable()
+        self.decorations_were_streamed_in = Observable()
 
     def clear(self):
+        removed_decorations = list(self.decoration_entities)
         self.decoration_entities.clear()
         self._buckets = Buckets([], self._entire_world_area)
+        for decoration in removed_decorations:
+            self.decoration_was_removed.notify(decoration)
 
     def add_decoration(self, decoration: DecorationEntity):
         self.decoration_entities.append(decoration)
         self._buckets.add_entity(decoration)
+        self.decoration_was_added.notify(decoration)
 
     def remove_decoration(self, decoration: DecorationEntity):
         self.decoration_entities.remove(decoration)
         self._buckets.remove_entity(decoration)
+        self.decoration_was_removed.notify(decoration)
+
+    # See WallsState.add_streamed_walls
+    def add_streamed_decorations(self, decorations: List[DecorationEntity]):
+        self.decoration_entities += decorations
+        for decoration in decorations:
+            self._buckets.add_entity(decoration)
+        self.decorations_were_streamed_in.notify(decorations)
+
+    def remove_streamed_decorations(self, decorations: List[DecorationEntity]):
+        decorations_to_remove = set(decorations)
+        self.decoration_entities = [d for d in self.decoration_entities if d not in decorations_to_remove]
+        for decoration in decorations:
+            self._buckets.remove_entity(decoration)
 
     def get_decorations_in_camera(self, camera_world_area: Rect) -> List[DecorationEntity]:
         return self._buckets.get_entitites_close_to_world_area(camera_world_area)
@@ -965,27 +1096,31 @@ class DecorationsState:
 # This class provides a way to store entities based on their location in the world,
 # which improves performance mainly for collision checking and rendering
 # NOTE: it should only be used for immovable objects (such as walls and floor tiles)
+# Only buckets that contain something are stored, so that large maps that are streamed in (see map_streaming.py) only
+# use memory for the parts of the world that are loaded.
 class Buckets:
     _BUCKET_WIDTH = 100
     _BUCKET_HEIGHT = 100
 
     def __init__(self, entities: List[Any], entire_world_area: Rect):
-        self._buckets: Dict[int, Dict[int, List[Any]]] = {}
+        self._buckets: Dict[Tuple[int, int], List[Any]] = {}
         self.entire_world_area = entire_world_area
-        for x_bucket in range(self.entire_world_area.w // Buckets._BUCKET_WIDTH + 1):
-            self._buckets[x_bucket] = {}
-            for y_bucket in range(self.entire_world_area.h // Buckets._BUCKET_HEIGHT + 1):
-                self._buckets[x_bucket][y_bucket] = []
         for entity in entities:
             self.add_entity(entity)
 
     def add_entity(self, entity: Any):
-        bucket = self._bucket_for_world_position(entity.get_position())
-        bucket.append(entity)
+        bucket_index = self._bucket_index_for_world_position(entity.get_position())
+        if bucket_index in self._buckets:
+            self._buckets[bucket_index].append(entity)
+        else:
+            self._buckets[bucket_index] = [entity]
 
     def remove_entity(self, entity: Any):
-        bucket = self._bucket_for_world_position(entity.get_position())
+        bucket_index = self._bucket_index_for_world_position(entity.get_position())
+        bucket = self._buckets[bucket_index]
         bucket.remove(entity)
+        if not bucket:
+            del self._buckets[bucket_index]
 
     def get_entitites_close_to_world_area(self, world_area: Rect) -> List[Any]:
         x0_bucket, y0_bucket = self._bucket_index_for_world_position(world_area.topleft)
@@ -999,15 +1134,84 @@ class Buckets:
         return [entity for bucket in buckets for entity in bucket]
 
     def _buckets_between_indices(self, x0: int, x1: int, y0: int, y1: int) -> List[List[Any]]:
-        for x_bucket in range(max(0, x0), min(x1 + 1, len(self._buckets))):
-            for y_bucket in range(max(0, y0), min(y1 + 1, len(self._buckets[x_bucket]))):
-                yield self._buckets[x_bucket][y_bucket]
-
-    def _bucket_for_world_position(self, world_position: Tuple[int, int]):
-        x_bucket, y_bucket = self._bucket_index_for_world_position(world_position)
-        return self._buckets[x_bucket][y_bucket]
+        for x_bucket in range(x0, x1 + 1):
+            for y_bucket in range(y0, y1 + 1):
+                bucket = self._buckets.get((x_bucket, y_bucket))
+                if bucket:
+                    yield bucket
 
     def _bucket_index_for_world_position(self, world_position: Tuple[int, int]) -> Tuple[int, int]:
         x_bucket = int(world_position[0] - self.entire_world_area.x) // Buckets._BUCKET_WIDTH
         y_bucket = int(world_position[1] - self.entire_world_area.y) // Buckets._BUCKET_HEIGHT
         return x_bucket, y_bucket
+
+
+# This class provides a way to look up movable entities (such as NPCs) based on their location in the world.
+# In contrast to Buckets, entities are allowed to move: WorldEntity.set_position notifies the hash, which then
+# moves the entity between cells. An entity is stored in every cell that its collision rect overlaps.
+class SpatialHash:
+    _CELL_SIZE = 100
+
+    def __init__(self):
+        self._cells: Dict[Tuple[int, int], List[WorldEntity]] = {}
+        self._cell_range_by_entity: Dict[WorldEntity, Tuple[int, int, int, int]] = {}
+        self._item_by_entity: Dict[WorldEntity, Any] = {}
+
+    def add_entity(self, entity: WorldEntity, item: Any):
+        cell_range = self._cell_range_for_rect(entity.pygame_collision_rect)
+        self._cell_range_by_entity[entity] = cell_range
+        self._item_by_entity[entity] = item
+        self._add_to_cells(entity, cell_range)
+        entity.spatial_hash = self
+
+    def remove_entity(self, entity: WorldEntity):
+        if entity in self._item_by_entity:
+            self._remove_from_cells(entity, self._cell_range_by_entity.pop(entity))
+            del self._item_by_entity[entity]
+            entity.spatial_hash = None
+
+    def update_entity(self, entity: WorldEntity):
+        old_cell_range = self._cell_range_by_entity[entity]
+        new_cell_range = self._cell_range_for_rect(entity.pygame_collision_rect)
+        if new_cell_range != old_cell_range:
+            self._remove_from_cells(entity, old_cell_range)
+            self._add_to_cells(entity, new_cell_range)
+            self._cell_range_by_entity[entity] = new_cell_range
+
+    def get_entities_close_to_rect(self, rect: Rect) -> List[WorldEntity]:
+        x0, y0, x1, y1 = self._cell_range_for_rect(rect)
+        if x0 == x1 and y0 == y1:
+            return list(self._cells.get((x0, y0), []))
+        entities = {}  # Entities that span several cells should only be returned once
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                for entity in self._cells.get((x, y), []):
+                    entities[entity] = True
+        return list(entities)
+
+    def get_items_close_to_rect(self, rect: Rect) -> List[Any]:
+        return [self._item_by_entity[entity] for entity in self.get_entities_close_to_rect(rect)]
+
+    def _add_to_cells(self, entity: WorldEntity, cell_range: Tuple[int, int, int, int]):
+        x0, y0, x1, y1 = cell_range
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                if (x, y) in self._cells:
+                    self._cells[(x, y)].append(entity)
+                else:
+                    self._cells[(x, y)] = [entity]
+
+    def _remove_from_cells(self, entity: WorldEntity, cell_range: Tuple[int, int, int, int]):
+        x0, y0, x1, y1 = cell_range
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                cell = self._cells[(x, y)]
+                cell.remove(entity)
+                if not cell:
+                    del self._cells[(x, y)]
+
+    @staticmethod
+    def _cell_range_for_rect(rect: Rect) -> Tuple[int, int, int, int]:
+        # The right and bottom edges are included, so that rects that only touch a cell border are still found
+        return (rect.x // SpatialHash._CELL_SIZE, rect.y // SpatialHash._CELL_SIZE,
+                rect.right // SpatialHash._CELL_SIZE, rect.bottom // SpatialHash._CELL_SIZE)
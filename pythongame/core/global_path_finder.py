@@ -1,14 +1,25 @@
 # NPC's share a "global path finder" that needs to be initialized before we start creating NPCs.
+from typing import Optional
+
 from pythongame.core.pathfinding.grid_astar_pathfinder import GlobalPathFinder
 
 path_finder = None
 
+# Set this to limit path requests per frame by count instead of by time (see GlobalPathFinder)
+max_path_requests_per_frame: Optional[int] = None
+
 
 def init_global_path_finder():
     global path_finder
-    path_finder = GlobalPathFinder()
+    path_finder = GlobalPathFinder(max_requests_per_frame=max_path_requests_per_frame)
     return path_finder
 
 
 def get_global_path_finder():
     return path_finder
+
+
+# Used when going back to a world that was left earlier, as its NPC's use the path finder that they were created with
+def set_global_path_finder(world_path_finder: GlobalPathFinder):
+    global path_finder
+    path_finder = world_path_finder
@@ -192,14 +192,16 @@ def get_item_affixes_at_level(level: int) -> List[ItemAffixId]:
             <= _item_affix_data_by_id[item_id].level_interval[1]]
 
 
-def randomized_item_id(item_type: ItemType) -> ItemId:
+# Items that are created during gameplay must use the game's RNG (GameState.rng). Items that are created outside of
+# it (starting equipment, shop inventories, the map editor) are passed the global random generator.
+def randomized_item_id(item_type: ItemType, rng: random.Random) -> ItemId:
     data = get_item_data_by_type(item_type)
     name = _build_item_name(item_type, None, None)
-    return ItemId.randomized_base(item_type, name, data.base_stats)
+    return ItemId.randomized_base(item_type, name, data.base_stats, rng)
 
 
 def randomized_affixed_item_id(item_type: ItemType, prefix_id: Optional[ItemAffixId],
-                               suffix_id: Optional[ItemAffixId]) -> ItemId:
+                               suffix_id: Optional[ItemAffixId], rng: random.Random) -> ItemId:
     if prefix_id is None and suffix_id is None:
         raise Exception("Either prefix or suffix must be set!")
     data = get_item_data_by_type(item_type)
@@ -209,17 +211,17 @@ def randomized_affixed_item_id(item_type: ItemType, prefix_id: Optional[ItemAffi
     if suffix_id:
         affix_stats += get_item_affix_data(suffix_id).stats
     name = _build_item_name(item_type, prefix_id, suffix_id)
-    return ItemId.randomized_with_affix(item_type, name, data.base_stats, affix_stats)
+    return ItemId.randomized_with_affix(item_type, name, data.base_stats, affix_stats, rng)
 
 
-def random_item_one_affix(item_level: int) -> ItemId:
-    item_type = random.choice([i for i in get_items_with_level(item_level) if not get_item_data_by_type(i).is_unique])
+def random_item_one_affix(item_level: int, rng: random.Random) -> ItemId:
+    item_type = rng.choice([i for i in get_items_with_level(item_level) if not get_item_data_by_type(i).is_unique])
     affixes_at_level = get_item_affixes_at_level(item_level)
     if affixes_at_level:
-        affix_id = random.choice(affixes_at_level)
+        affix_id = rng.choice(affixes_at_level)
     else:
         print("WARN: No item affix available for level " + str(item_level) + ". Falling back to random affix.")
-        affix_id = random.choice([affix_id for affix_id in ItemAffixId])
+        affix_id = rng.choice([affix_id for affix_id in ItemAffixId])
 
     prefix_id = None
     suffix_id = None
@@ -228,26 +230,26 @@ def random_item_one_affix(item_level: int) -> ItemId:
         prefix_id = affix_id
     else:
         suffix_id = affix_id
-    return randomized_affixed_item_id(item_type, prefix_id, suffix_id)
+    return randomized_affixed_item_id(item_type, prefix_id, suffix_id, rng)
 
 
-def random_item_two_affixes(item_level: int) -> ItemId:
-    item_type = random.choice([i for i in get_items_with_level(item_level) if not get_item_data_by_type(i).is_unique])
+def random_item_two_affixes(item_level: int, rng: random.Random) -> ItemId:
+    item_type = rng.choice([i for i in get_items_with_level(item_level) if not get_item_data_by_type(i).is_unique])
     affixes_at_level = get_item_affixes_at_level(item_level)
     if not affixes_at_level:
         print("ERROR: No item affix available for level " + str(item_level) + ". Falling back to random prefix.")
-        prefix_id = random.choice([affix_id for affix_id in ItemAffixId])
-        return randomized_affixed_item_id(item_type, prefix_id, None)
+        prefix_id = rng.choice([affix_id for affix_id in ItemAffixId])
+        return randomized_affixed_item_id(item_type, prefix_id, None, rng)
 
     # Pick random prefix
-    prefix_id = random.choice([affix_id for affix_id in affixes_at_level
-                               if get_item_affix_data(affix_id).name_prefix])
+    prefix_id = rng.choice([affix_id for affix_id in affixes_at_level
+                            if get_item_affix_data(affix_id).name_prefix])
 
     # pick random suffix that isn't identical to the prefix! (we don't want items like "Vigorous sword of Vigor")
-    suffix_id = random.choice([affix_id for affix_id in affixes_at_level
-                               if get_item_affix_data(affix_id).name_suffix
-                               and affix_id != prefix_id])
-    return randomized_affixed_item_id(item_type, prefix_id, suffix_id)
+    suffix_id = rng.choice([affix_id for affix_id in affixes_at_level
+                            if get_item_affix_data(affix_id).name_suffix
+                            and affix_id != prefix_id])
+    return randomized_affixed_item_id(item_type, prefix_id, suffix_id, rng)
 
 
 def plain_item_id(item_type: ItemType) -> ItemId:
@@ -264,7 +266,9 @@ def register_item_level(item_type: ItemType, item_level: int):
 
 
 def get_items_with_level(item_level: int) -> List[ItemType]:
-    return list(_item_types_grouped_by_level.get(item_level, set()))
+    # Sorted, as the iteration order of a set of enums differs between runs. Random picks from the list must be
+    # reproducible from a seed.
+    return sorted(_item_types_grouped_by_level.get(item_level, set()), key=lambda item_type: item_type.value)
 
 
 def get_items_within_levels(min_level: int, max_level: int) -> List[ItemType]:
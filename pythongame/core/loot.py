@@ -47,7 +47,7 @@ class LootGroup:
 
 class LootTable:
     def generate_loot(self, increased_money_chance: float, increased_rare_or_unique_chance: float,
-                      is_inside_dungeon: bool) -> List[LootEntry]:
+                      is_inside_dungeon: bool, rng: random.Random) -> List[LootEntry]:
         raise Exception("Sub-classes must override this method!")
 
 
@@ -85,46 +85,46 @@ class LeveledLootTable(LootTable):
         self.money_drop_chance = 0.15
 
     def generate_loot(self, increased_money_chance: float, increased_rare_or_unique_chance: float,
-                      is_inside_dungeon: bool) -> List[LootEntry]:
+                      is_inside_dungeon: bool, rng: random.Random) -> List[LootEntry]:
         loot = list(self.guaranteed_drops)
-        if random.random() <= self.item_drop_chance:
-            item_level = random.choices(self.item_levels, weights=self.item_level_weights)[0]
-            rare_or_unique = random.random() <= self.item_rare_or_unique_chance * (1 + increased_rare_or_unique_chance)
+        if rng.random() <= self.item_drop_chance:
+            item_level = rng.choices(self.item_levels, weights=self.item_level_weights)[0]
+            rare_or_unique = rng.random() <= self.item_rare_or_unique_chance * (1 + increased_rare_or_unique_chance)
             # There are 4 classes of items:
             # common: a regular item with no affixes
             # rare-1: a regular item with 1 bonus affix
             # rare-2: a regular item with 2 bonus affixes
             # unique: a unique item
             if rare_or_unique:
-                random_outcome = random.random()
+                random_outcome = rng.random()
                 if random_outcome <= 0.25 and item_level in self.unique_item_types_by_level:
-                    unique_item_type = random.choice(self.unique_item_types_by_level[item_level])
+                    unique_item_type = rng.choice(self.unique_item_types_by_level[item_level])
                     unique_item = ItemLootEntry(unique_item_type)
                     loot.append(unique_item)
                 elif random_outcome <= 0.4:
-                    rare_item_id = random_item_two_affixes(item_level)
+                    rare_item_id = random_item_two_affixes(item_level, rng)
                     rare_item = AffixedItemLootEntry(rare_item_id)
                     loot.append(rare_item)
                 else:
-                    rare_item_id = random_item_one_affix(item_level)
+                    rare_item_id = random_item_one_affix(item_level, rng)
                     rare_item = AffixedItemLootEntry(rare_item_id)
                     loot.append(rare_item)
             else:
-                item_type = random.choice(self.regular_item_types_by_level[item_level])
+                item_type = rng.choice(self.regular_item_types_by_level[item_level])
                 common_item = ItemLootEntry(item_type)
                 loot.append(common_item)
 
-        if random.random() <= self.consumable_drop_chance:
+        if rng.random() <= self.consumable_drop_chance:
             # Warp stone doesn't have a level, but should be dropped across all levels
-            if random.random() < 0.15:
+            if rng.random() < 0.15:
                 consumable_type = ConsumableType.WARP_STONE
             else:
-                consumable_level = random.choices(self.consumable_levels, weights=self.consumable_level_weights)[0]
-                consumable_type = random.choice(self.consumable_types_by_level[consumable_level])
+                consumable_level = rng.choices(self.consumable_levels, weights=self.consumable_level_weights)[0]
+                consumable_type = rng.choice(self.consumable_types_by_level[consumable_level])
             loot.append(ConsumableLootEntry(consumable_type))
-        if random.random() <= self.money_drop_chance:
-            amount = random.randint(1, self.level)
-            if random.random() <= increased_money_chance:  # NOTE: anything above 100% "increased chance" is wasted
+        if rng.random() <= self.money_drop_chance:
+            amount = rng.randint(1, self.level)
+            if rng.random() <= increased_money_chance:  # NOTE: anything above 100% "increased chance" is wasted
                 amount *= 2
             loot.append(MoneyLootEntry(amount))
 
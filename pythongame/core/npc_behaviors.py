@@ -42,8 +42,8 @@ class MeleeEnemyNpcMind(AbstractNpcMind):
                  chance_to_stray_from_path: float, update_path_interval: Millis):
         super().__init__(global_path_finder)
         self._base_attack_interval = attack_interval
-        self._attack_interval = None
-        self.randomize_attack_interval()
+        # The first attack isn't delayed by the interval anyway, so it only needs to be randomized after that
+        self._attack_interval = self._base_attack_interval
         self._time_since_attack = self._attack_interval
         self._update_path_interval = update_path_interval
         self._time_since_updated_path = self._update_path_interval
@@ -55,8 +55,8 @@ class MeleeEnemyNpcMind(AbstractNpcMind):
         self.chance_to_stray_from_path = chance_to_stray_from_path
         self._is_in_melee_with_target = False
 
-    def randomize_attack_interval(self):
-        self._attack_interval = self._base_attack_interval + random.randint(-250, 250)
+    def randomize_attack_interval(self, rng: random.Random):
+        self._attack_interval = self._base_attack_interval + rng.randint(-250, 250)
 
     def control_npc(self, game_state: GameState, npc: NonPlayerCharacter, player_entity: WorldEntity,
                     is_player_invisible: bool, time_passed: Millis):
@@ -86,8 +86,8 @@ class MeleeEnemyNpcMind(AbstractNpcMind):
             if self.next_waypoint:
                 direction = self.pathfinder.get_dir_towards_considering_collisions(
                     game_state, enemy_entity, self.next_waypoint)
-                if random.random() < self.chance_to_stray_from_path and direction:
-                    direction = random.choice(get_perpendicular_directions(direction))
+                if game_state.rng.random() < self.chance_to_stray_from_path and direction:
+                    direction = game_state.rng.choice(get_perpendicular_directions(direction))
                 _move_in_dir(enemy_entity, direction)
             else:
                 enemy_entity.set_not_moving()
@@ -98,7 +98,7 @@ class MeleeEnemyNpcMind(AbstractNpcMind):
                 target_center_pos = target.entity.get_center_position()
                 if is_x_and_y_within_distance(enemy_position, target_center_pos, 80):
                     self._time_since_attack = 0
-                    self.randomize_attack_interval()
+                    self.randomize_attack_interval(game_state.rng)
                     deal_npc_damage(self.damage_amount, DamageType.PHYSICAL, game_state, enemy_entity, npc, target)
 
 
@@ -123,11 +123,13 @@ class EnemySummonTrait(EnemyTrait):
         self._summon_npc_types = summon_npc_types
         self._summon_cd_interval = summon_cd_interval
         self._time_since_summoning = 0
-        self._summoning_cooldown = self._random_summoning_cooldown()
+        self._summoning_cooldown = None  # Randomized on the first update, when the game's RNG is available
         self._alive_summons = []
         self._create_npc = create_npc  # We inject this method as we cannot depend on entity_creation.py from here
 
     def update(self, npc: NonPlayerCharacter, game_state: GameState, time_passed: Millis):
+        if self._summoning_cooldown is None:
+            self._summoning_cooldown = self._random_summoning_cooldown(game_state.rng)
         self._time_since_summoning += time_passed
         if self._time_since_summoning > self._summoning_cooldown:
             necro_center_pos = npc.world_entity.get_center_position()
@@ -135,9 +137,9 @@ class EnemySummonTrait(EnemyTrait):
             self._alive_summons = [summon for summon in self._alive_summons
                                    if summon in game_state.game_world.non_player_characters]
             if len(self._alive_summons) < self._max_summons:
-                relative_pos_from_summoner = (random.randint(-150, 150), random.randint(-150, 150))
+                relative_pos_from_summoner = (game_state.rng.randint(-150, 150), game_state.rng.randint(-150, 150))
                 summon_center_pos = sum_of_vectors(necro_center_pos, relative_pos_from_summoner)
-                summon_type = random.choice(self._summon_npc_types)
+                summon_type = game_state.rng.choice(self._summon_npc_types)
                 summon_size = NON_PLAYER_CHARACTERS[summon_type].size
                 summon_pos = game_state.game_world.get_within_world(
                     get_position_from_center_position(summon_center_pos, summon_size), summon_size)
@@ -147,7 +149,7 @@ class EnemySummonTrait(EnemyTrait):
                 is_position_blocked = game_state.game_world.would_entity_collide_if_new_pos(summon_enemy.world_entity,
                                                                                             summon_pos)
                 if not is_wall_blocking and not is_position_blocked:
-                    self._summoning_cooldown = self._random_summoning_cooldown()
+                    self._summoning_cooldown = self._random_summoning_cooldown(game_state.rng)
                     game_state.game_world.add_non_player_character(summon_enemy)
                     self._alive_summons.append(summon_enemy)
                     game_state.game_world.visual_effects.append(
@@ -159,10 +161,10 @@ class EnemySummonTrait(EnemyTrait):
                     # Failed to summon, so try again without waiting full duration
                     self._summoning_cooldown = 500
             else:
-                self._summoning_cooldown = self._random_summoning_cooldown()
+                self._summoning_cooldown = self._random_summoning_cooldown(game_state.rng)
 
-    def _random_summoning_cooldown(self):
-        return random.randint(self._summon_cd_interval[0], self._summon_cd_interval[1])
+    def _random_summoning_cooldown(self, rng: random.Random):
+        return rng.randint(self._summon_cd_interval[0], self._summon_cd_interval[1])
 
 
 class EnemyRandomWalkTrait(EnemyTrait):
@@ -171,8 +173,8 @@ class EnemyRandomWalkTrait(EnemyTrait):
 
     def update(self, npc: NonPlayerCharacter, game_state: GameState, time_passed: Millis):
         if self._timer.update_and_check_if_ready(time_passed):
-            if random.random() < 0.2:
-                direction = random_direction()
+            if game_state.rng.random() < 0.2:
+                direction = random_direction(game_state.rng)
                 npc.world_entity.set_moving_in_dir(direction)
             else:
                 npc.world_entity.set_not_moving()
@@ -188,17 +190,19 @@ class EnemyShootProjectileTrait(EnemyTrait):
         self._chance_to_shoot_other_direction = chance_to_shoot_other_direction
         self._sound_id = sound_id
         self._time_since_attack = 0
-        self._update_attack_interval()
+        self._attack_interval = None  # Randomized on the first update, when the game's RNG is available
 
     def update(self, npc: NonPlayerCharacter, game_state: GameState, time_passed: Millis):
+        if self._attack_interval is None:
+            self._update_attack_interval(game_state.rng)
         self._time_since_attack += time_passed
         if self._time_since_attack > self._attack_interval:
             self._time_since_attack = 0
-            self._update_attack_interval()
+            self._update_attack_interval(game_state.rng)
             directions_to_player = get_directions_to_position(npc.world_entity,
                                                               game_state.game_world.player_entity.get_position())
             new_direction = directions_to_player[0]
-            if random.random() < self._chance_to_shoot_other_direction and directions_to_player[1] is not None:
+            if game_state.rng.random() < self._chance_to_shoot_other_direction and directions_to_player[1] is not None:
                 new_direction = directions_to_player[1]
             npc.world_entity.direction = new_direction
             npc.world_entity.set_not_moving()
@@ -211,8 +215,8 @@ class EnemyShootProjectileTrait(EnemyTrait):
             game_state.game_world.projectile_entities.append(projectile)
             play_sound(self._sound_id)
 
-    def _update_attack_interval(self):
-        self._attack_interval = random.randint(self._cooldown_interval[0], self._cooldown_interval[1])
+    def _update_attack_interval(self, rng: random.Random):
+        self._attack_interval = rng.randint(self._cooldown_interval[0], self._cooldown_interval[1])
 
 
 class AbstractNpcAction:
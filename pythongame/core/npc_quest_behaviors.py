@@ -138,10 +138,10 @@ class QuestGiverNpcMind(AbstractNpcMind):
                 npc.quest_giver_state = None
 
         if self.timer.update_and_check_if_ready(time_passed):
-            if random.random() < 0.8:
+            if game_state.rng.random() < 0.8:
                 npc.world_entity.set_not_moving()
             else:
-                direction = random.choice(get_all_directions())
+                direction = game_state.rng.choice(get_all_directions())
                 npc.world_entity.set_moving_in_dir(direction)
 
 
@@ -0,0 +1,62 @@
+from typing import List, Tuple, Optional
+
+
+# For every cell in the pathfinder wall grid, the clearance is the size of the largest square (measured in cells)
+# that has its top-left corner in that cell and doesn't contain any walls. An agent that covers NxN cells can stand
+# in a cell if the clearance there is at least N, so checking whether a cell is free is a single lookup regardless of
+# agent size.
+#
+# Clearance values are capped, as they only need to be compared with agent sizes. Thanks to the cap, adding or
+# removing a wall only affects a small area up and to the left of it, which is what allows the map to be kept up to
+# date incrementally (for instance in the map editor).
+class ClearanceMap:
+    MAX_CLEARANCE = 8
+
+    # Computing the clearance of a large map takes a while, so values that were computed earlier for the same wall grid
+    # can be passed in (see world_snapshot.py)
+    def __init__(self, wall_grid: List[List[int]], precomputed_clearance: Optional[List[int]] = None):
+        # The wall grid is indexed as grid[x][y], with 1 == blocked and 0 == free
+        self.width = len(wall_grid)
+        self.height = len(wall_grid[0])
+        self._blocked: List[bool] = [wall_grid[x][y] == 1 for x in range(self.width) for y in range(self.height)]
+        # Clearance values are stored in a flat list, indexed by (x * height + y)
+        if precomputed_clearance is not None:
+            self.clearance: List[int] = list(precomputed_clearance)
+        else:
+            self.clearance: List[int] = [0] * (self.width * self.height)
+            self._recompute_area(0, 0, self.width - 1, self.height - 1)
+        # Incremented on every change, so that data that is derived from the clearance map knows when it's outdated
+        self.version = 0
+
+    def set_blocked(self, cell: Tuple[int, int], blocked: bool):
+        x, y = cell
+        self._blocked[x * self.height + y] = blocked
+        self.version += 1
+        self._recompute_area(x - ClearanceMap.MAX_CLEARANCE, y - ClearanceMap.MAX_CLEARANCE, x, y)
+
+    def get_clearance(self, x: int, y: int) -> int:
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            return 0
+        return self.clearance[x * self.height + y]
+
+    def is_cell_free(self, x: int, y: int, required_clearance: int) -> bool:
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            return False
+        return self.clearance[x * self.height + y] >= required_clearance
+
+    def _recompute_area(self, x0: int, y0: int, x1: int, y1: int):
+        height = self.height
+        blocked = self._blocked
+        clearance = self.clearance
+        max_clearance = ClearanceMap.MAX_CLEARANCE
+        # Cells are visited from the bottom-right, so that the neighbours that a cell depends on are always up to date.
+        # The last column and row of the grid are never considered free, to match the bounds check that agents
+        # previously did when scanning the grid.
+        for x in range(min(x1, self.width - 1), max(x0, 0) - 1, -1):
+            for y in range(min(y1, height - 1), max(y0, 0) - 1, -1):
+                i = x * height + y
+                if blocked[i] or x == self.width - 1 or y == height - 1:
+                    clearance[i] = 0
+                else:
+                    clearance[i] = min(max_clearance, 1 + min(clearance[i + height], clearance[i + 1],
+                                                              clearance[i + height + 1]))
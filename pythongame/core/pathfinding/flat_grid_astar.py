@@ -0,0 +1,108 @@
+from heapq import heappush, heappop
+from typing import Tuple, List, Optional
+
+from pythongame.core.pathfinding.clearance_map import ClearanceMap
+
+
+# A* search that is specialised for the pathfinder grid. In contrast to the generic AStar class, cells are referred
+# to by integer indices (x * height + y) into arrays that are allocated once, up front. Instead of clearing the arrays
+# between searches, every search gets a new "generation" number, and an array entry is only valid if it was written
+# during the current generation. This means that no dicts or node objects need to be allocated per search.
+class FlatGridAStar:
+
+    def __init__(self, clearance_map: ClearanceMap):
+        self._clearance_map = clearance_map
+        self._width = clearance_map.width
+        self._height = clearance_map.height
+        num_cells = self._width * self._height
+        self._g_scores: List[int] = [0] * num_cells
+        self._parents: List[int] = [0] * num_cells
+        self._seen_generations: List[int] = [0] * num_cells
+        self._closed_generations: List[int] = [0] * num_cells
+        self._generation = 0
+
+    # Bounds are inclusive and expressed as (min_x, min_y, max_x, max_y). Cells outside of them are ignored, to save
+    # resources. Returns the cells along the path, including both start and goal.
+    def find_path(self, start_cell: Tuple[int, int], goal_cell: Tuple[int, int], required_clearance: int,
+                  bounds: Tuple[int, int, int, int]) -> Optional[List[Tuple[int, int]]]:
+        if start_cell == goal_cell:
+            return [start_cell]
+
+        width = self._width
+        height = self._height
+        num_cells = width * height
+        min_x = max(bounds[0], 0)
+        min_y = max(bounds[1], 0)
+        max_x = min(bounds[2], width - 1)
+        max_y = min(bounds[3], height - 1)
+        start_x, start_y = start_cell
+        goal_x, goal_y = goal_cell
+        if not (min_x <= start_x <= max_x and min_y <= start_y <= max_y):
+            return None
+        if not (min_x <= goal_x <= max_x and min_y <= goal_y <= max_y):
+            return None
+
+        clearance = self._clearance_map.clearance
+        g_scores = self._g_scores
+        parents = self._parents
+        seen_generations = self._seen_generations
+        closed_generations = self._closed_generations
+        self._generation += 1
+        generation = self._generation
+
+        start_index = start_x * height + start_y
+        goal_index = goal_x * height + goal_y
+        seen_generations[start_index] = generation
+        g_scores[start_index] = 0
+        parents[start_index] = -1
+
+        # Open set entries are encoded as a single int (f-score * num_cells + cell index) to avoid allocating tuples.
+        # Entries are never updated in place: a cell that is found via a shorter route is pushed again, and the
+        # outdated entry is skipped when it's popped (as the cell has been closed by then).
+        open_set = [(abs(start_x - goal_x) + abs(start_y - goal_y)) * num_cells + start_index]
+        while open_set:
+            index = heappop(open_set) % num_cells
+            if closed_generations[index] == generation:
+                continue
+            if index == goal_index:
+                return self._reconstruct_path(goal_index)
+            closed_generations[index] = generation
+            x, y = divmod(index, height)
+            neighbor_g_score = g_scores[index] + 1
+
+            # up, left, right, down
+            if y > min_y:
+                self._visit(index - 1, x, y - 1, index, neighbor_g_score, goal_x, goal_y, required_clearance,
+                            clearance, generation, open_set, num_cells)
+            if x > min_x:
+                self._visit(index - height, x - 1, y, index, neighbor_g_score, goal_x, goal_y, required_clearance,
+                            clearance, generation, open_set, num_cells)
+            if x < max_x:
+                self._visit(index + height, x + 1, y, index, neighbor_g_score, goal_x, goal_y, required_clearance,
+                            clearance, generation, open_set, num_cells)
+            if y < max_y:
+                self._visit(index + 1, x, y + 1, index, neighbor_g_score, goal_x, goal_y, required_clearance,
+                            clearance, generation, open_set, num_cells)
+        return None
+
+    def _visit(self, index: int, x: int, y: int, parent_index: int, g_score: int, goal_x: int, goal_y: int,
+               required_clearance: int, clearance: List[int], generation: int, open_set: List[int], num_cells: int):
+        if self._closed_generations[index] == generation or clearance[index] < required_clearance:
+            return
+        if self._seen_generations[index] == generation and g_score >= self._g_scores[index]:
+            return
+        self._seen_generations[index] = generation
+        self._g_scores[index] = g_score
+        self._parents[index] = parent_index
+        heappush(open_set, (g_score + abs(x - goal_x) + abs(y - goal_y)) * num_cells + index)
+
+    def _reconstruct_path(self, goal_index: int) -> List[Tuple[int, int]]:
+        height = self._height
+        parents = self._parents
+        path = []
+        index = goal_index
+        while index != -1:
+            path.append(divmod(index, height))
+            index = parents[index]
+        path.reverse()
+        return path
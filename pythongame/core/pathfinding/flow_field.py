@@ -0,0 +1,67 @@
+from collections import deque
+from typing import Tuple, Dict, Optional, Callable, List
+
+
+# A flow field tells an agent which neighbouring cell to move to next, to get closer to a target cell. It's computed
+# with one breadth-first search outward from the target, and can then be shared by all agents of the same size that
+# are chasing that target (instead of every agent running its own A* search).
+class FlowField:
+
+    def __init__(self, target_cell: Tuple[int, int], distances: Dict[Tuple[int, int], int],
+                 next_cells: Dict[Tuple[int, int], Optional[Tuple[int, int]]]):
+        self.target_cell = target_cell
+        self._distances = distances
+        self._next_cells = next_cells
+
+    def get_next_cell(self, cell: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        if cell in self._next_cells:
+            return self._next_cells[cell]
+        # The agent may be standing in a cell that isn't considered free for it (for instance if it's partially
+        # overlapping a wall). In that case we step into the best neighbouring cell that is part of the field.
+        x, y = cell
+        best_cell = None
+        best_distance = None
+        for neighbor in [(x, y - 1), (x - 1, y), (x + 1, y), (x, y + 1)]:
+            distance = self._distances.get(neighbor)
+            if distance is not None and (best_distance is None or distance < best_distance):
+                best_cell = neighbor
+                best_distance = distance
+        return best_cell
+
+    def get_distance(self, cell: Tuple[int, int]) -> Optional[int]:
+        return self._distances.get(cell)
+
+
+def compute_flow_field(target_cell: Tuple[int, int], is_cell_free: Callable[[int, int], bool],
+                       max_distance_from_target: int) -> FlowField:
+    x, y = target_cell
+    # The target cell itself may not be free for the agent (its footprint extends to the right and down), so we also
+    # consider the cells right above and left of it. This mirrors the fallbacks in GlobalPathFinder.run
+    seeds: List[Tuple[int, int]] = [cell for cell in [(x, y), (x, y - 1), (x - 1, y)] if is_cell_free(cell[0], cell[1])]
+
+    distances: Dict[Tuple[int, int], int] = {}
+    next_cells: Dict[Tuple[int, int], Optional[Tuple[int, int]]] = {}
+    for seed in seeds:
+        distances[seed] = 0
+        next_cells[seed] = None
+
+    min_x = x - max_distance_from_target
+    max_x = x + max_distance_from_target
+    min_y = y - max_distance_from_target
+    max_y = y + max_distance_from_target
+
+    queue = deque(seeds)
+    while queue:
+        cell = queue.popleft()
+        cell_x, cell_y = cell
+        distance = distances[cell] + 1
+        for neighbor in [(cell_x, cell_y - 1), (cell_x - 1, cell_y), (cell_x + 1, cell_y), (cell_x, cell_y + 1)]:
+            n_x, n_y = neighbor
+            if neighbor in distances or not (min_x <= n_x <= max_x and min_y <= n_y <= max_y):
+                continue
+            if is_cell_free(n_x, n_y):
+                distances[neighbor] = distance
+                next_cells[neighbor] = cell
+                queue.append(neighbor)
+
+    return FlowField(target_cell, distances, next_cells)
@@ -1,19 +1,25 @@
-from typing import Tuple, Dict, List, Any, Optional
+import time
+from collections import OrderedDict
+from typing import Tuple, Dict, List, Optional, Any, Callable
 
 from pythongame.core.pathfinding.astar import AStar
+from pythongame.core.pathfinding.clearance_map import ClearanceMap
+from pythongame.core.pathfinding.flat_grid_astar import FlatGridAStar
+from pythongame.core.pathfinding.flow_field import FlowField, compute_flow_field
+from pythongame.core.pathfinding.hierarchical_pathfinder import HierarchicalPathFinder, AbstractGraphEdges
+from pythongame.core.pathfinding.path_smoothing import smooth_path
 
 
+# Grid search built on the generic AStar class. The game uses FlatGridAStar instead, which is much faster, but this
+# one is kept as a reference implementation (see benchmark_pathfinding.py).
 class GridBasedAStar(AStar):
 
-    def __init__(self, grid, agent_size: Tuple[int, int]):
-        # Grid is a 2d vector with 1s or 0s.
-        # 1 == cell is blocked
-        # 0 == cell is free
-        # We can create the grid based on wall positions
-        # Wall size is (50, 50) and all walls are placed on the (50, 50) grid
-        self.grid = grid
+    def __init__(self, clearance_map: ClearanceMap, agent_size: Tuple[int, int]):
+        # The clearance map is based on a grid of wall positions, where walls are placed on the (25, 25) grid.
+        # A cell is free for the agent if there is a wall-free square at least as large as the agent there.
+        self.clearance_map = clearance_map
         self.agent_size = agent_size
-        self._cache_is_cell_free: Dict[Tuple[int, int], bool] = {}
+        self._required_clearance = max(agent_size)
 
         # Need to be initialized before running pathfinder
         self.min_x = 0
@@ -47,65 +53,167 @@ class GridBasedAStar(AStar):
         # Ignore cells that are too far out, to save resources. If agent strays too far, the path is aborted.
         if not (self.min_x <= x <= self.max_x and self.min_y <= y <= self.max_y):
             return False
+        return self.clearance_map.is_cell_free(x, y, self._required_clearance)
 
-        if (x, y) in self._cache_is_cell_free:
-            return self._cache_is_cell_free[(x, y)]
-        else:
-            is_free = self._compute_is_cell_free(x, y)
-            self._cache_is_cell_free[(x, y)] = is_free
-            return is_free
+    def is_cell_free_for_agent(self, x, y):
+        return self.clearance_map.is_cell_free(x, y, self._required_clearance)
 
-    def _compute_is_cell_free(self, x, y):
-        # Check that all relevant cells are within the map
-        if x < 0 or y < 0 or x + self.agent_size[0] >= len(self.grid) or y + self.agent_size[1] >= len(self.grid[x]):
-            return False
-        for _x in range(x, x + self.agent_size[0]):
-            for _y in range(y, y + self.agent_size[1]):
-                # Check if there is a wall at cell: if so, it's not free
-                if self.grid[_x][_y] == 1:
-                    return False
-        return True
+
+class _QueuedRequest:
+    def __init__(self, priority: float, compute: Callable[[], Any], on_done: Callable[[Any], None]):
+        self.priority = priority
+        self.compute = compute
+        self.on_done = on_done
 
 
 # One instance of this class is shared by all enemies. This should allow for better caching of computations
+#
+# Instead of computing paths right away, agents queue requests that are then handled in process_queued_requests(),
+# which is called once per frame. Only as many requests are handled as fit within the frame budget, so that many
+# agents updating their paths at the same time doesn't cause a hitch. Requests with a lower priority value are handled
+# first.
 class GlobalPathFinder:
-    def __init__(self):
-        self.grid = None  # grid must be set before you can use the pathfinder
-        self.astars_by_entity_size: Dict[Tuple[int, int], GridBasedAStar] = {}
-
-    def set_grid(self, grid):
-        self.grid = grid
-
-    def register_entity_size(self, size: Tuple[int, int]):
-        if not size in self.astars_by_entity_size:
-            self.astars_by_entity_size[size] = GridBasedAStar(self.grid, size)
+    _FLOW_FIELD_MAX_DISTANCE_FROM_TARGET = 30
+    _MAX_NUM_CACHED_FLOW_FIELDS = 16
+
+    def __init__(self, frame_budget_millis: float = 3, max_requests_per_frame: Optional[int] = None):
+        self.clearance_map: ClearanceMap = None  # clearance map must be set before you can use the pathfinder
+        self._grid_astar: FlatGridAStar = None
+        # The abstract graph that hierarchical pathfinding uses depends on agent size, so there's one per size
+        self._hierarchical_path_finders: Dict[int, HierarchicalPathFinder] = {}
+        self._precomputed_abstract_graph_edges: Dict[int, AbstractGraphEdges] = {}
+        # Flow fields are cached by (entity size, target cell), so that they only need to be recomputed when the
+        # target moves to a new cell. The least recently used ones are thrown away.
+        self._flow_fields: Dict[Tuple[Tuple[int, int], Tuple[int, int]], FlowField] = OrderedDict()
+        # The version of the clearance map that the cached flow fields were computed for
+        self._flow_fields_clearance_map_version = None
+        self.frame_budget_millis = frame_budget_millis
+        # If set, this replaces the time budget. That makes the game deterministic, which a time budget isn't.
+        self.max_requests_per_frame = max_requests_per_frame
+        # Each requester has at most one queued request. A new request from the same requester replaces the old one.
+        self._queued_requests: Dict[Any, _QueuedRequest] = {}
+
+    # Abstract graphs that were built earlier for the same clearance map can be passed in, by required clearance
+    def set_clearance_map(self, clearance_map: ClearanceMap,
+                          precomputed_abstract_graph_edges: Optional[Dict[int, AbstractGraphEdges]] = None):
+        self.clearance_map = clearance_map
+        self._grid_astar = FlatGridAStar(clearance_map)
+        self._hierarchical_path_finders.clear()
+        self._precomputed_abstract_graph_edges = dict(precomputed_abstract_graph_edges or {})
+        self._flow_fields.clear()
+        self._flow_fields_clearance_map_version = clearance_map.version
+        self.cancel_queued_requests()
+
+    # Precomputing is optional, but avoids a hitch the first time that an agent of a new size requests a path
+    def precompute_for_entity_sizes(self, entity_sizes: List[Tuple[int, int]]):
+        for entity_size in entity_sizes:
+            self._get_hierarchical_path_finder(entity_size)
+
+    # The abstract graphs that have been built so far (or were passed in), by required clearance
+    def get_abstract_graph_edges(self) -> Dict[int, AbstractGraphEdges]:
+        return {required_clearance: path_finder.get_abstract_graph_edges()
+                for required_clearance, path_finder in self._hierarchical_path_finders.items()}
+
+    def _get_hierarchical_path_finder(self, entity_size: Tuple[int, int]) -> HierarchicalPathFinder:
+        required_clearance = max(entity_size)
+        if required_clearance not in self._hierarchical_path_finders:
+            self._hierarchical_path_finders[required_clearance] = HierarchicalPathFinder(
+                self.clearance_map, self._grid_astar, required_clearance,
+                self._precomputed_abstract_graph_edges.get(required_clearance))
+        return self._hierarchical_path_finders[required_clearance]
+
+    def request_path(self, requester: Any, priority: float, entity_size: Tuple[int, int],
+                     start_cell: Tuple[int, int], goal_cell: Tuple[int, int],
+                     on_path_found: Callable[[Optional[List[Tuple[int, int]]]], None]):
+        self._queue_request(requester, _QueuedRequest(
+            priority, lambda: self.run(entity_size, start_cell, goal_cell), on_path_found))
+
+    def request_flow_field(self, requester: Any, priority: float, entity_size: Tuple[int, int],
+                           target_cell: Tuple[int, int], on_flow_field_ready: Callable[[FlowField], None]):
+        self._drop_outdated_flow_fields()
+        key = (entity_size, target_cell)
+        if key in self._flow_fields:
+            # No need to wait for a cached flow field
+            self._queued_requests.pop(requester, None)
+            on_flow_field_ready(self.get_flow_field(entity_size, target_cell))
+            return
+        self._queue_request(requester, _QueuedRequest(
+            priority, lambda: self.get_flow_field(entity_size, target_cell), on_flow_field_ready))
+
+    def _queue_request(self, requester: Any, request: _QueuedRequest):
+        # Remove first, so that the new request ends up last among requests that have the same priority
+        self._queued_requests.pop(requester, None)
+        self._queued_requests[requester] = request
+
+    def process_queued_requests(self):
+        if not self._queued_requests:
+            return
+        start_time = time.perf_counter()
+        requesters = sorted(self._queued_requests, key=lambda r: self._queued_requests[r].priority)
+        num_handled_requests = 0
+        for requester in requesters:
+            request = self._queued_requests.pop(requester, None)
+            if request is None:
+                continue
+            # Callbacks may queue new requests, but those are handled next frame at the earliest
+            request.on_done(request.compute())
+            num_handled_requests += 1
+            # At least one request is always handled, so that the queue keeps moving even if the budget is tiny
+            if self.max_requests_per_frame is not None:
+                if num_handled_requests >= self.max_requests_per_frame:
+                    break
+            elif (time.perf_counter() - start_time) * 1000 >= self.frame_budget_millis:
+                break
+
+    def cancel_queued_requests(self):
+        self._queued_requests.clear()
+
+    # Called when the requester is removed from the world, so that no time is spent on paths that nobody will use
+    def cancel_request(self, requester: Any):
+        self._queued_requests.pop(requester, None)
+
+    def get_num_queued_requests(self) -> int:
+        return len(self._queued_requests)
 
     def run(self, entity_size: Tuple[int, int], start_cell: Tuple[int, int], goal_cell: Tuple[int, int]) \
-            -> Optional[List[Any]]:
+            -> Optional[List[Tuple[int, int]]]:
 
-        astar = self.astars_by_entity_size[entity_size]
-        path_max_distance_from_start = 20
-        astar.set_pathfinding_bounds(start_cell[0] - path_max_distance_from_start,
-                                     start_cell[1] - path_max_distance_from_start,
-                                     start_cell[0] + path_max_distance_from_start,
-                                     start_cell[1] + path_max_distance_from_start)
-        result = astar.astar(start_cell, goal_cell)
+        path_finder = self._get_hierarchical_path_finder(entity_size)
+        result = path_finder.find_path(start_cell, goal_cell)
 
         # TODO: Handle this in a better way
         # HACK:
         if result is None:
             # print("Couldn't find path. Trying with position right above player instead.")
             goal_cell_2 = (goal_cell[0], goal_cell[1] - 1)
-            result = astar.astar(start_cell, goal_cell_2)
+            result = path_finder.find_path(start_cell, goal_cell_2)
             if result is None:
                 goal_cell_3 = (goal_cell[0] - 1, goal_cell[1])
-                result = astar.astar(start_cell, goal_cell_3)
+                result = path_finder.find_path(start_cell, goal_cell_3)
 
         if result is None:
             return None
-
-        path_list = []
-        for x in result:
-            path_list.append(x)
-
-        return path_list
+        # Agents only need to know where to turn, not every cell along the way
+        return smooth_path(result, self.clearance_map, max(entity_size))
+
+    def get_flow_field(self, entity_size: Tuple[int, int], target_cell: Tuple[int, int]) -> FlowField:
+        self._drop_outdated_flow_fields()
+        key = (entity_size, target_cell)
+        if key in self._flow_fields:
+            self._flow_fields.move_to_end(key)
+            return self._flow_fields[key]
+        required_clearance = max(entity_size)
+        flow_field = compute_flow_field(target_cell,
+                                        lambda x, y: self.clearance_map.is_cell_free(x, y, required_clearance),
+                                        GlobalPathFinder._FLOW_FIELD_MAX_DISTANCE_FROM_TARGET)
+        self._flow_fields[key] = flow_field
+        if len(self._flow_fields) > GlobalPathFinder._MAX_NUM_CACHED_FLOW_FIELDS:
+            self._flow_fields.popitem(last=False)
+        return flow_field
+
+    # Walls that are added or removed (in the map editor) change the clearance map, which makes cached flow fields
+    # outdated
+    def _drop_outdated_flow_fields(self):
+        if self._flow_fields_clearance_map_version != self.clearance_map.version:
+            self._flow_fields.clear()
+            self._flow_fields_clearance_map_version = self.clearance_map.version
@@ -0,0 +1,276 @@
+from collections import deque
+from heapq import heappush, heappop
+from typing import Tuple, List, Optional, Dict
+
+from pythongame.core.pathfinding.clearance_map import ClearanceMap
+from pythongame.core.pathfinding.flat_grid_astar import FlatGridAStar
+
+_START_NODE = -1
+_GOAL_NODE = -2
+
+# For each abstract node (entrance cell), the nodes that it's connected to and the distance to them
+AbstractGraphEdges = Dict[int, List[Tuple[int, int]]]
+
+
+# Hierarchical pathfinding (HPA*). The grid is split into square clusters. Wherever two neighbouring clusters are
+# connected, "entrance" cells are placed on both sides of the border, and the distances between all entrances of a
+# cluster are precomputed. Those entrances and distances form a small abstract graph, that long paths are searched in
+# first. The abstract path is then refined into cells, with grid searches that never leave a single cluster.
+#
+# The abstract graph depends on the agent size (i.e. the required clearance), so one instance is needed per agent size.
+# Building the graph for a large map takes a while, so a graph that was built earlier for the same clearance map can
+# be passed in (see world_snapshot.py).
+class HierarchicalPathFinder:
+    CLUSTER_SIZE = 10
+    # Longer openings between clusters get one entrance at each end instead of one in the middle
+    _MIN_OPENING_LENGTH_FOR_TWO_ENTRANCES = 6
+
+    def __init__(self, clearance_map: ClearanceMap, grid_astar: FlatGridAStar, required_clearance: int,
+                 precomputed_edges: Optional[AbstractGraphEdges] = None):
+        self._clearance_map = clearance_map
+        self._grid_astar = grid_astar
+        self._required_clearance = required_clearance
+        self._width = clearance_map.width
+        self._height = clearance_map.height
+        self._num_clusters_x = (self._width + self.CLUSTER_SIZE - 1) // self.CLUSTER_SIZE
+        self._num_clusters_y = (self._height + self.CLUSTER_SIZE - 1) // self.CLUSTER_SIZE
+        # Abstract nodes are entrance cells, represented by flat cell indices (x * height + y)
+        self._edges: AbstractGraphEdges = {}
+        self._nodes_by_cluster: Dict[Tuple[int, int], List[int]] = {}
+        # Nodes that are connected to each other share the same component number. This lets us reject unreachable
+        # goals right away, instead of searching through the entire abstract graph.
+        self._components: Dict[int, int] = {}
+        self._clearance_map_version = None
+        if precomputed_edges is not None:
+            self._clearance_map_version = clearance_map.version
+            self._set_edges(precomputed_edges)
+        else:
+            self._build_abstract_graph()
+
+    # The graph is never modified after it's been built (it's replaced when it needs to be rebuilt), so it can be shared
+    def get_abstract_graph_edges(self) -> AbstractGraphEdges:
+        return self._edges
+
+    def find_path(self, start_cell: Tuple[int, int], goal_cell: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        if self._clearance_map_version != self._clearance_map.version:
+            # Walls have been added or removed since the graph was built (this only happens in the map editor)
+            self._build_abstract_graph()
+
+        if start_cell == goal_cell:
+            return [start_cell]
+        if not (0 <= start_cell[0] < self._width and 0 <= start_cell[1] < self._height):
+            return None
+        if not self._is_free(goal_cell[0], goal_cell[1]):
+            return None
+
+        # Short paths are cheaper (and more accurate) to find with a plain grid search.
+        if abs(start_cell[0] - goal_cell[0]) <= self.CLUSTER_SIZE and \
+                abs(start_cell[1] - goal_cell[1]) <= self.CLUSTER_SIZE:
+            margin = self.CLUSTER_SIZE // 2
+            bounds = (min(start_cell[0], goal_cell[0]) - margin, min(start_cell[1], goal_cell[1]) - margin,
+                      max(start_cell[0], goal_cell[0]) + margin, max(start_cell[1], goal_cell[1]) + margin)
+            path = self._grid_astar.find_path(start_cell, goal_cell, self._required_clearance, bounds)
+            if path is not None:
+                return path
+
+        abstract_path = self._find_abstract_path(start_cell, goal_cell)
+        if abstract_path is None:
+            return None
+        return self._refine_abstract_path(abstract_path)
+
+    def _find_abstract_path(self, start_cell: Tuple[int, int], goal_cell: Tuple[int, int]) -> Optional[List[int]]:
+        height = self._height
+        start_index = start_cell[0] * height + start_cell[1]
+        goal_index = goal_cell[0] * height + goal_cell[1]
+        start_cluster = self._get_cluster(start_cell[0], start_cell[1])
+        goal_cluster = self._get_cluster(goal_cell[0], goal_cell[1])
+
+        # Connect start and goal temporarily to the entrances of their clusters
+        start_distances = self._get_distances_within_cluster(start_index, start_cluster)
+        goal_distances = self._get_distances_within_cluster(goal_index, goal_cluster)
+        start_edges = [(node, start_distances[node]) for node in self._nodes_by_cluster.get(start_cluster, [])
+                       if node in start_distances]
+        goal_edges_by_node = {node: goal_distances[node] for node in self._nodes_by_cluster.get(goal_cluster, [])
+                              if node in goal_distances}
+        if start_cluster == goal_cluster and goal_index in start_distances:
+            start_edges.append((_GOAL_NODE, start_distances[goal_index]))
+        elif not {self._components[node] for node, _ in start_edges} & \
+                 {self._components[node] for node in goal_edges_by_node}:
+            return None
+
+        goal_x, goal_y = goal_cell
+        g_scores: Dict[int, int] = {_START_NODE: 0}
+        parents: Dict[int, int] = {}
+        closed = set()
+        open_set = [(0, 0, _START_NODE)]
+        tie_breaker = 0
+        while open_set:
+            _, _, node = heappop(open_set)
+            if node in closed:
+                continue
+            if node == _GOAL_NODE:
+                return self._reconstruct_abstract_path(parents, start_index, goal_index)
+            closed.add(node)
+            edges = start_edges if node == _START_NODE else self._edges[node]
+            if node in goal_edges_by_node:
+                edges = edges + [(_GOAL_NODE, goal_edges_by_node[node])]
+            for neighbor, cost in edges:
+                if neighbor in closed:
+                    continue
+                g_score = g_scores[node] + cost
+                if neighbor in g_scores and g_score >= g_scores[neighbor]:
+                    continue
+                g_scores[neighbor] = g_score
+                parents[neighbor] = node
+                if neighbor == _GOAL_NODE:
+                    h_score = 0
+                else:
+                    x, y = divmod(neighbor, height)
+                    h_score = abs(x - goal_x) + abs(y - goal_y)
+                tie_breaker += 1
+                heappush(open_set, (g_score + h_score, tie_breaker, neighbor))
+        return None
+
+    @staticmethod
+    def _reconstruct_abstract_path(parents: Dict[int, int], start_index: int, goal_index: int) -> List[int]:
+        path = [goal_index]
+        node = parents[_GOAL_NODE]
+        while node != _START_NODE:
+            path.append(node)
+            node = parents[node]
+        path.append(start_index)
+        path.reverse()
+        return path
+
+    def _refine_abstract_path(self, abstract_path: List[int]) -> Optional[List[Tuple[int, int]]]:
+        height = self._height
+        path = [divmod(abstract_path[0], height)]
+        for i in range(len(abstract_path) - 1):
+            from_cell = divmod(abstract_path[i], height)
+            to_cell = divmod(abstract_path[i + 1], height)
+            if from_cell == to_cell:
+                continue
+            from_cluster = self._get_cluster(from_cell[0], from_cell[1])
+            if from_cluster != self._get_cluster(to_cell[0], to_cell[1]):
+                # Entrances on opposite sides of a cluster border are adjacent
+                path.append(to_cell)
+                continue
+            segment = self._grid_astar.find_path(from_cell, to_cell, self._required_clearance,
+                                                 self._get_cluster_bounds(from_cluster))
+            if segment is None:
+                return None
+            path += segment[1:]
+        return path
+
+    def _build_abstract_graph(self):
+        self._clearance_map_version = self._clearance_map.version
+        self._edges = {}
+        self._nodes_by_cluster = {}
+
+        for cluster_x in range(self._num_clusters_x):
+            for cluster_y in range(self._num_clusters_y):
+                min_x, min_y, max_x, max_y = self._get_cluster_bounds((cluster_x, cluster_y))
+                if max_x + 1 < self._width:
+                    # Border towards the cluster to the right
+                    self._add_entrances([((max_x, y), (max_x + 1, y)) for y in range(min_y, max_y + 1)])
+                if max_y + 1 < self._height:
+                    # Border towards the cluster below
+                    self._add_entrances([((x, max_y), (x, max_y + 1)) for x in range(min_x, max_x + 1)])
+
+        for cluster, nodes in self._nodes_by_cluster.items():
+            for node in nodes:
+                distances = self._get_distances_within_cluster(node, cluster)
+                for other_node in nodes:
+                    if other_node != node and other_node in distances:
+                        self._edges[node].append((other_node, distances[other_node]))
+
+        self._set_components()
+
+    def _set_edges(self, edges: AbstractGraphEdges):
+        self._edges = edges
+        # Nodes are listed in the same order as when the graph was built, as that order affects which path is found
+        self._nodes_by_cluster = {}
+        height = self._height
+        for node in edges:
+            x, y = divmod(node, height)
+            self._nodes_by_cluster.setdefault(self._get_cluster(x, y), []).append(node)
+        self._set_components()
+
+    def _set_components(self):
+        self._components = {}
+        num_components = 0
+        for node in self._edges:
+            if node in self._components:
+                continue
+            component = num_components
+            num_components += 1
+            self._components[node] = component
+            queue = deque([node])
+            while queue:
+                for neighbor, _ in self._edges[queue.popleft()]:
+                    if neighbor not in self._components:
+                        self._components[neighbor] = component
+                        queue.append(neighbor)
+
+    def _add_entrances(self, cell_pairs_along_border: List[Tuple[Tuple[int, int], Tuple[int, int]]]):
+        opening = []
+        for cell_pair in cell_pairs_along_border + [None]:
+            if cell_pair is not None and self._is_free(*cell_pair[0]) and self._is_free(*cell_pair[1]):
+                opening.append(cell_pair)
+            elif opening:
+                if len(opening) >= self._MIN_OPENING_LENGTH_FOR_TWO_ENTRANCES:
+                    self._add_entrance(opening[0])
+                    self._add_entrance(opening[-1])
+                else:
+                    self._add_entrance(opening[len(opening) // 2])
+                opening = []
+
+    def _add_entrance(self, cell_pair: Tuple[Tuple[int, int], Tuple[int, int]]):
+        height = self._height
+        node_1 = cell_pair[0][0] * height + cell_pair[0][1]
+        node_2 = cell_pair[1][0] * height + cell_pair[1][1]
+        for node, cell in [(node_1, cell_pair[0]), (node_2, cell_pair[1])]:
+            if node not in self._edges:
+                self._edges[node] = []
+                self._nodes_by_cluster.setdefault(self._get_cluster(cell[0], cell[1]), []).append(node)
+        self._edges[node_1].append((node_2, 1))
+        self._edges[node_2].append((node_1, 1))
+
+    # Breadth-first search that doesn't leave the cluster. The start cell itself doesn't need to be free.
+    def _get_distances_within_cluster(self, start_index: int, cluster: Tuple[int, int]) -> Dict[int, int]:
+        height = self._height
+        clearance = self._clearance_map.clearance
+        required_clearance = self._required_clearance
+        min_x, min_y, max_x, max_y = self._get_cluster_bounds(cluster)
+        distances = {start_index: 0}
+        queue = deque([start_index])
+        while queue:
+            index = queue.popleft()
+            x, y = divmod(index, height)
+            distance = distances[index] + 1
+            neighbors = []
+            if y > min_y:
+                neighbors.append(index - 1)
+            if x > min_x:
+                neighbors.append(index - height)
+            if x < max_x:
+                neighbors.append(index + height)
+            if y < max_y:
+                neighbors.append(index + 1)
+            for neighbor in neighbors:
+                if neighbor not in distances and clearance[neighbor] >= required_clearance:
+                    distances[neighbor] = distance
+                    queue.append(neighbor)
+        return distances
+
+    def _get_cluster(self, x: int, y: int) -> Tuple[int, int]:
+        return x // self.CLUSTER_SIZE, y // self.CLUSTER_SIZE
+
+    def _get_cluster_bounds(self, cluster: Tuple[int, int]) -> Tuple[int, int, int, int]:
+        min_x = cluster[0] * self.CLUSTER_SIZE
+        min_y = cluster[1] * self.CLUSTER_SIZE
+        return min_x, min_y, min(min_x + self.CLUSTER_SIZE, self._width) - 1, \
+               min(min_y + self.CLUSTER_SIZE, self._height) - 1
+
+    def _is_free(self, x: int, y: int) -> bool:
+        return self._clearance_map.is_cell_free(x, y, self._required_clearance)
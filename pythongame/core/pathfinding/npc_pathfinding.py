@@ -1,10 +1,12 @@
-from typing import Tuple, Optional, List
+from collections import deque
+from typing import Tuple, Optional, List, Deque
 
 from pygame.rect import Rect
 
 from pythongame.core.common import Millis, Direction
 from pythongame.core.game_state import GRID_CELL_WIDTH, GameState
 from pythongame.core.math import get_directions_to_position, get_opposite_direction, is_x_and_y_within_distance
+from pythongame.core.pathfinding.flow_field import FlowField
 from pythongame.core.pathfinding.grid_astar_pathfinder import GlobalPathFinder
 from pythongame.core.visual_effects import VisualLine, VisualRect
 from pythongame.core.world_entity import WorldEntity
@@ -12,34 +14,65 @@ from pythongame.core.world_entity import WorldEntity
 DEBUG_RENDER_PATHFINDING = False
 DEBUG_PATHFINDER_INTERVAL = 900
 
+# If enabled, agents follow flow fields that are shared between all agents of the same size chasing the same target,
+# rather than running their own A* search
+USE_FLOW_FIELDS = True
+
 
 class NpcPathfinder:
 
     def __init__(self, global_path_finder: GlobalPathFinder):
-        self.path: List[Tuple[int, int]] = None  # This is expressed in game world coordinates (can be negative)
+        self.path: Deque[Tuple[int, int]] = None  # This is expressed in game world coordinates (can be negative)
         self.global_path_finder: GlobalPathFinder = global_path_finder
+        self.flow_field: FlowField = None  # Only used if USE_FLOW_FIELDS is enabled
+        self._entire_world_area: Rect = None
 
+    # The new path (or flow field) is computed by the global path finder when there's time for it, which may be a few
+    # frames later. Until then, the agent keeps following its old one.
     def update_path_towards_target(self, agent_entity: WorldEntity, game_state: GameState, target_entity: WorldEntity):
-        agent_cell = _translate_world_position_to_cell(agent_entity.get_position(),
-                                                       game_state.game_world.entire_world_area)
-        target_cell = _translate_world_position_to_cell(target_entity.get_position(),
-                                                        game_state.game_world.entire_world_area)
-
-        agent_cell_size = (agent_entity.pygame_collision_rect.w // GRID_CELL_WIDTH + 1,
-                           agent_entity.pygame_collision_rect.h // GRID_CELL_WIDTH + 1)
-        self.global_path_finder.register_entity_size(agent_cell_size)
-        path_with_cells = self.global_path_finder.run(agent_cell_size, agent_cell, target_cell)
-        if path_with_cells:
-            # Note: Cells are expressed in non-negative values (and need to be translated to game world coordinates)
-            path = [_translate_cell_to_world_position(cell, game_state.game_world.entire_world_area) for cell in
-                    path_with_cells]
-            if DEBUG_RENDER_PATHFINDING:
-                _add_visual_lines_along_path(game_state, path)
-            self.path = path
-        else:
-            self.path = None
+        entire_world_area = game_state.game_world.entire_world_area
+        agent_cell = _translate_world_position_to_cell(agent_entity.get_position(), entire_world_area)
+        target_cell = _translate_world_position_to_cell(target_entity.get_position(), entire_world_area)
+
+        agent_cell_size = get_agent_cell_size(agent_entity)
+
+        # Agents that the player can see get their paths first
+        priority = _get_distance_squared_to_camera(agent_entity, game_state)
+
+        def on_path_found(path_with_cells: Optional[List[Tuple[int, int]]]):
+            if path_with_cells:
+                # Note: Cells are expressed in non-negative values (and need to be translated to game world coordinates)
+                path = [_translate_cell_to_world_position(cell, entire_world_area) for cell in path_with_cells]
+                if DEBUG_RENDER_PATHFINDING:
+                    _add_visual_lines_along_path(game_state, path)
+                self.path = deque(path)
+            else:
+                self.path = None
+
+        if USE_FLOW_FIELDS:
+            def on_flow_field_ready(flow_field: FlowField):
+                self.flow_field = flow_field
+                self._entire_world_area = entire_world_area
+                if flow_field.get_next_cell(agent_cell) is None and flow_field.get_distance(agent_cell) is None:
+                    # Flow fields only cover the area around the target. Agents that are further away than that need
+                    # a path of their own, to get there.
+                    self.global_path_finder.request_path(self, priority, agent_cell_size, agent_cell, target_cell,
+                                                         on_path_found)
+                else:
+                    self.path = None
+
+            self.global_path_finder.request_flow_field(self, priority, agent_cell_size, target_cell,
+                                                       on_flow_field_ready)
+            return
+
+        self.global_path_finder.request_path(self, priority, agent_cell_size, agent_cell, target_cell, on_path_found)
+
+    def cancel_requests(self):
+        self.global_path_finder.cancel_request(self)
 
     def get_next_waypoint_along_path(self, agent_entity: WorldEntity) -> Optional[Tuple[int, int]]:
+        if USE_FLOW_FIELDS and not self.path:
+            return self._get_next_waypoint_from_flow_field(agent_entity)
         if self.path:
             # -----------------------------------------------
             # 1: Remove first waypoint if close enough to it
@@ -48,7 +81,7 @@ class NpcPathfinder:
             closeness_margin = 50
             if is_x_and_y_within_distance(agent_entity.get_position(), self.path[0], closeness_margin):
                 # print("Popping " + str(self.path[0]) + " as I'm so close to it.")
-                self.path.pop(0)
+                self.path.popleft()
                 if self.path:
                     # print("After popping, returning " + str(self.path[0]))
                     return self.path[0]
@@ -64,16 +97,24 @@ class NpcPathfinder:
                 dir_to_waypoint_1 = get_directions_to_position(agent_entity, self.path[1])[0]
                 if dir_to_waypoint_0 == get_opposite_direction(dir_to_waypoint_1):
                     # print("Not gonna go back. Popping " + str(self.path[0]))
-                    self.path.pop(0)
+                    self.path.popleft()
                     # print("Popped first position. Next waypoint: " + str(self.path[0]))
                     return self.path[0]
-                if self.path:
-                    return self.path[0]
+            # With smoothed paths, the last waypoint is often far away, so it must be followed even when it's the
+            # only one left
+            return self.path[0]
         else:
             # print("no path found. stopping.")
             return None
-        # print("Leaked through. returning none")
-        return None
+
+    def _get_next_waypoint_from_flow_field(self, agent_entity: WorldEntity) -> Optional[Tuple[int, int]]:
+        if self.flow_field is None:
+            return None
+        agent_cell = _translate_world_position_to_cell(agent_entity.get_position(), self._entire_world_area)
+        next_cell = self.flow_field.get_next_cell(agent_cell)
+        if next_cell is None:
+            return None
+        return _translate_cell_to_world_position(next_cell, self._entire_world_area)
 
     @staticmethod
     def get_dir_towards_considering_collisions(game_state: GameState, agent_entity: WorldEntity,
@@ -100,6 +141,15 @@ class NpcPathfinder:
         return None
 
 
+# The size of the agent's collision box, expressed in pathfinder grid cells
+def get_agent_cell_size(agent_entity: WorldEntity) -> Tuple[int, int]:
+    return get_cell_size_for_agent_size(agent_entity.pygame_collision_rect.size)
+
+
+def get_cell_size_for_agent_size(agent_size: Tuple[int, int]) -> Tuple[int, int]:
+    return agent_size[0] // GRID_CELL_WIDTH + 1, agent_size[1] // GRID_CELL_WIDTH + 1
+
+
 def _add_visual_line_to_next_waypoint(destination, agent_entity: WorldEntity, game_state: GameState):
     start = _get_middle_of_cell_from_position(agent_entity.get_position())
     end = _get_middle_of_cell_from_position(destination)
@@ -126,6 +176,12 @@ def _get_middle_of_cell_from_position(world_position: Tuple[int, int]) -> Tuple[
            world_position[1] + GRID_CELL_WIDTH // 2
 
 
+def _get_distance_squared_to_camera(agent_entity: WorldEntity, game_state: GameState) -> int:
+    camera_center = game_state.camera_world_area.center
+    agent_center = agent_entity.get_center_position()
+    return (agent_center[0] - camera_center[0]) ** 2 + (agent_center[1] - camera_center[1]) ** 2
+
+
 def _would_collide_with_dir(direction: Direction, agent_entity: WorldEntity, game_state: GameState):
     # TODO Is this too naive to work?
     future_time = Millis(100)
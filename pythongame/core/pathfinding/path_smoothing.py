@@ -0,0 +1,47 @@
+from typing import Tuple, List
+
+from pythongame.core.pathfinding.clearance_map import ClearanceMap
+
+# Limits how much area a single straight segment may cover, to keep the visibility checks cheap. Segments that are
+# aligned with an axis only cover a thin strip, so in practice this only restricts diagonal shortcuts.
+_MAX_SEGMENT_AREA = 200
+
+
+# Paths from the grid pathfinders take one cell at a time. This reduces them to the corners where the direction
+# actually needs to change ("string pulling"): a waypoint is skipped whenever the agent can move straight from the
+# waypoint before it to the waypoint after it.
+def smooth_path(path: List[Tuple[int, int]], clearance_map: ClearanceMap, required_clearance: int) \
+        -> List[Tuple[int, int]]:
+    if len(path) <= 2:
+        return path
+    smoothed_path = [path[0]]
+    anchor = path[0]
+    for i in range(2, len(path)):
+        if not is_segment_free(anchor, path[i], clearance_map, required_clearance):
+            anchor = path[i - 1]
+            smoothed_path.append(anchor)
+    smoothed_path.append(path[-1])
+    return smoothed_path
+
+
+# Agents can only move along the axes, and they only reconsider their direction every now and then. Heading towards
+# a waypoint that isn't straight up/down/left/right, they may take any "staircase" route towards it, so we require the
+# whole rectangle between the two cells to be free (rather than just the cells along a line between them).
+def is_segment_free(from_cell: Tuple[int, int], to_cell: Tuple[int, int], clearance_map: ClearanceMap,
+                    required_clearance: int) -> bool:
+    min_x = min(from_cell[0], to_cell[0])
+    max_x = max(from_cell[0], to_cell[0])
+    min_y = min(from_cell[1], to_cell[1])
+    max_y = max(from_cell[1], to_cell[1])
+    if (max_x - min_x + 1) * (max_y - min_y + 1) > _MAX_SEGMENT_AREA:
+        return False
+    if min_x < 0 or min_y < 0 or max_x >= clearance_map.width or max_y >= clearance_map.height:
+        return False
+    height = clearance_map.height
+    clearance = clearance_map.clearance
+    for x in range(min_x, max_x + 1):
+        column_start = x * height
+        for y in range(min_y, max_y + 1):
+            if clearance[column_start + y] < required_clearance:
+                return False
+    return True
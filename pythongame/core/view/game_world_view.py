@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Dict, List, Tuple, Optional, Union
+from typing import Dict, List, Tuple, Optional, Union, Any
 
 import pygame
 from pygame.rect import Rect
@@ -7,9 +7,11 @@ from pygame.rect import Rect
 from pythongame.core.common import Direction, Sprite
 from pythongame.core.game_data import ENTITY_SPRITE_INITIALIZERS, CHANNELING_BUFFS
 from pythongame.core.game_state import DecorationEntity, NonPlayerCharacter, BuffWithDuration, \
-    QuestGiverState
-from pythongame.core.view.image_loading import ImageWithRelativePosition
+    QuestGiverState, WallsState, DecorationsState, GameWorldState
+from pythongame.core.math import sum_of_vectors
+from pythongame.core.view.image_loading import ImageWithRelativePosition, LazyImagesBySprite
 from pythongame.core.view.render_util import DrawableArea, split_text_into_lines
+from pythongame.core.view.static_layer_cache import StaticLayerCache
 from pythongame.core.visual_effects import VisualLine, VisualCircle, VisualRect, VisualText, VisualSprite, VisualCross, \
     VisualParticleSystem
 from pythongame.core.world_entity import WorldEntity
@@ -17,6 +19,7 @@ from pythongame.core.world_entity import WorldEntity
 COLOR_BACKGROUND = (88 + 30, 72 + 30, 40 + 30)
 COLOR_BACKGROUND_LINES = (93 + 30, 77 + 30, 45 + 30)
 COLOR_RED = (250, 0, 0)
+GROUND_GRID_WIDTH = 35
 RENDER_WORLD_COORDINATES = False
 DIR_FONTS = './resources/fonts/'
 
@@ -41,7 +44,7 @@ class EntityActionText:
 class GameWorldView:
 
     def __init__(self, pygame_screen, camera_size: Tuple[int, int], screen_size: Tuple[int, int],
-                 images_by_sprite: Dict[Sprite, Dict[Direction, List[ImageWithRelativePosition]]]):
+                 images_by_sprite: LazyImagesBySprite):
         pygame.font.init()
         self.screen_render = DrawableArea(pygame_screen)
         self.ui_render = DrawableArea(pygame_screen, self._translate_ui_position_to_screen)
@@ -58,11 +61,27 @@ class GameWorldView:
         self.font_visual_text_large = pygame.font.Font(DIR_FONTS + 'Courier New Bold.ttf', 16)
         self.font_quest_giver_mark = pygame.font.Font(DIR_FONTS + 'Courier New Bold.ttf', 28)
 
-        self.images_by_sprite: Dict[Sprite, Dict[Direction, List[ImageWithRelativePosition]]] = images_by_sprite
+        self.images_by_sprite: LazyImagesBySprite = images_by_sprite
+        self.static_layer_cache = StaticLayerCache(images_by_sprite)
+        self._ground_surface = None
+        self._ground_surface_camera_size: Optional[Tuple[int, int]] = None
+        # Entities in the order they were rendered last frame. See _sort_by_depth.
+        self._render_order: List[WorldEntity] = []
 
         # This is updated every time the view is called
         self.camera_world_area = None
 
+    # Loading images while playing can cause stutters, so the images of all the entities that are in the world when it's
+    # entered are loaded up front. Images of other sprites (projectiles, summons, etc) are still loaded on demand.
+    def preload_images_for_world(self, game_world: GameWorldState):
+        entities = game_world.get_renderable_non_wall_entities() + \
+                   [wall.world_entity for wall in game_world.walls_state.walls] + \
+                   game_world.decorations_state.decoration_entities
+        sprites = {entity.sprite for entity in entities if entity is not None}
+        if game_world.region_streamer is not None:
+            sprites |= game_world.region_streamer.get_sprites()
+        self.images_by_sprite.preload(sprites)
+
     # ------------------------------------
     #         TRANSLATING COORDINATES
     # ------------------------------------
@@ -91,42 +110,50 @@ class GameWorldView:
     # ------------------------------------
 
     def _world_ground(self, entire_world_area: Rect):
-        grid_width = 35
-        # TODO num squares should depend on map size. Ideally this dumb looping logic should change.
-        num_squares = 200
-        column_screen_y_0 = self._translate_world_y_to_screen(self.camera_world_area.y)
-        column_screen_y_1 = self._translate_world_y_to_screen(
-            min(entire_world_area.y + entire_world_area.h, self.camera_world_area.y + self.camera_world_area.h))
-        for i_col in range(num_squares):
-            world_x = entire_world_area.x + i_col * grid_width
-            if entire_world_area.x < world_x < entire_world_area.x + entire_world_area.w:
-                screen_x = self._translate_world_x_to_screen(world_x)
-                self.screen_render.line(COLOR_BACKGROUND_LINES, (screen_x, column_screen_y_0),
-                                        (screen_x, column_screen_y_1),
-                                        1)
-        row_screen_x_0 = self._translate_world_x_to_screen(self.camera_world_area.x)
-        row_screen_x_1 = self._translate_world_x_to_screen(
-            min(entire_world_area.x + entire_world_area.w, self.camera_world_area.x + self.camera_world_area.w))
-        for i_row in range(num_squares):
-            world_y = entire_world_area.y + i_row * grid_width
-            if entire_world_area.y < world_y < entire_world_area.y + entire_world_area.h:
-                screen_y = self._translate_world_y_to_screen(world_y)
-                self.screen_render.line(COLOR_BACKGROUND_LINES, (row_screen_x_0, screen_y), (row_screen_x_1, screen_y),
-                                        1)
+        # The ground is covered by a grid of lines. Rather than drawing the lines every frame, a surface with the grid
+        # is prepared once. It's larger than the camera by one grid square, so that it can be offset to line up with
+        # the world. Only the part of the camera that's within the world area gets the grid.
+        camera_size = self.camera_world_area.size
+        if self._ground_surface is None or self._ground_surface_camera_size != camera_size:
+            self._ground_surface = self._create_ground_surface(camera_size)
+            self._ground_surface_camera_size = camera_size
+        grid_area = Rect(entire_world_area.x + 1, entire_world_area.y + 1, entire_world_area.w,
+                         entire_world_area.h).clip(self.camera_world_area)
+        if grid_area.w > 0 and grid_area.h > 0:
+            screen_x = self._translate_world_x_to_screen(grid_area.x)
+            screen_y = self._translate_world_y_to_screen(grid_area.y)
+            offset_x = (self.camera_world_area.x - entire_world_area.x) % GROUND_GRID_WIDTH
+            offset_y = (self.camera_world_area.y - entire_world_area.y) % GROUND_GRID_WIDTH
+            self.screen_render.screen.blit(self._ground_surface, (screen_x, screen_y),
+                                           Rect(screen_x + offset_x, screen_y + offset_y, grid_area.w, grid_area.h))
 
         if RENDER_WORLD_COORDINATES:
+            num_squares = 200
             for i_col in range(num_squares):
                 for i_row in range(num_squares):
                     if i_col % 4 == 0 and i_row % 4 == 0:
-                        world_x = entire_world_area.x + i_col * grid_width
+                        world_x = entire_world_area.x + i_col * GROUND_GRID_WIDTH
                         screen_x = self._translate_world_x_to_screen(world_x)
-                        world_y = entire_world_area.y + i_row * grid_width
+                        world_y = entire_world_area.y + i_row * GROUND_GRID_WIDTH
                         screen_y = self._translate_world_y_to_screen(world_y)
                         self.screen_render.text(self.font_debug_info, str(world_x) + "," + str(world_y),
                                                 (screen_x, screen_y),
                                                 (250, 250, 250))
 
-    def _world_entity(self, entity: Union[WorldEntity, DecorationEntity]):
+    @staticmethod
+    def _create_ground_surface(camera_size: Tuple[int, int]):
+        surface = pygame.Surface((camera_size[0] + GROUND_GRID_WIDTH, camera_size[1] + GROUND_GRID_WIDTH))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        surface.fill(COLOR_BACKGROUND)
+        for x in range(0, surface.get_width(), GROUND_GRID_WIDTH):
+            pygame.draw.line(surface, COLOR_BACKGROUND_LINES, (x, 0), (x, surface.get_height()), 1)
+        for y in range(0, surface.get_height(), GROUND_GRID_WIDTH):
+            pygame.draw.line(surface, COLOR_BACKGROUND_LINES, (0, y), (surface.get_width(), y), 1)
+        return surface
+
+    # Rather than being blitted right away, the entity's image is added to a list of blits that are done in one batch
+    def _world_entity(self, entity: Union[WorldEntity, DecorationEntity], blits: List[Tuple[Any, Tuple[int, int]]]):
         if not entity.visible:
             return
         if entity.sprite is None:
@@ -134,7 +161,8 @@ class GameWorldView:
         elif entity.sprite in self.images_by_sprite:
             image_with_relative_position = self._get_image_for_sprite(
                 entity.sprite, entity.direction, entity.movement_animation_progress)
-            self.world_render.image_with_relative_pos(image_with_relative_position, entity.get_position())
+            position = sum_of_vectors(entity.get_position(), image_with_relative_position.position_relative_to_entity)
+            blits.append((image_with_relative_position.image, self._translate_world_position_to_screen(position)))
         elif entity.sprite == Sprite.NONE:
             # This value is used by entities that don't use sprites. They might have other graphics (like VisualEffects)
             pass
@@ -261,8 +289,22 @@ class GameWorldView:
         self.world_render.text(self.font_quest_giver_mark, mark, (entity_pos[0] - 8, entity_pos[1] - 64), (0, 0, 0))
         self.world_render.text(self.font_quest_giver_mark, mark, (entity_pos[0] - 9, entity_pos[1] - 65), color)
 
-    def render_world(self, all_entities_to_render: List[WorldEntity], decorations_to_render: List[DecorationEntity],
-                     camera_world_area, non_player_characters: List[NonPlayerCharacter], is_player_invisible: bool,
+    # Entities only move a little between frames, so last frame's render order is almost sorted already. Entities that
+    # are no longer rendered leave the order, new ones join it at the end, and then it's sorted again. Python's sort
+    # (Timsort) finds the sorted runs in the list, so this costs little more than one pass over the entities.
+    def _sort_by_depth(self, entities: List[WorldEntity]) -> List[WorldEntity]:
+        entities_to_render = dict.fromkeys(entities)
+        render_order = [e for e in self._render_order if e in entities_to_render]
+        for entity in render_order:
+            del entities_to_render[entity]
+        render_order += entities_to_render
+        render_order.sort(key=lambda entity: (-entity.view_z, entity.y))
+        self._render_order = render_order
+        return render_order
+
+    def render_world(self, all_entities_to_render: List[WorldEntity], walls_state: WallsState,
+                     decorations_state: DecorationsState, camera_world_area,
+                     non_player_characters: List[NonPlayerCharacter], is_player_invisible: bool,
                      player_active_buffs: List[BuffWithDuration],
                      player_entity: WorldEntity, visual_effects, render_hit_and_collision_boxes, player_health,
                      player_max_health, entire_world_area: Rect, entity_action_text: Optional[EntityActionText]):
@@ -271,15 +313,21 @@ class GameWorldView:
         self.screen_render.fill(COLOR_BACKGROUND)
         self._world_ground(entire_world_area)
 
-        all_entities_to_render.sort(key=lambda entry: (-entry.view_z, entry.y))
-
-        for decoration_entity in decorations_to_render:
-            self._world_entity(decoration_entity)
+        # Decorations and flat walls are rendered from pre-rendered chunks rather than one by one
+        self.static_layer_cache.set_world(walls_state, decorations_state)
+        self.static_layer_cache.render(self.screen_render.screen, camera_world_area)
+        dynamic_entities = self._sort_by_depth(
+            [e for e in all_entities_to_render if not self.static_layer_cache.is_baked(e)])
 
-        for entity in all_entities_to_render:
-            self._world_entity(entity)
+        # Blitting all the entities with one call is cheaper than calling blit for each of them
+        blits = []
+        for entity in dynamic_entities:
+            self._world_entity(entity, blits)
             if entity == player_entity and is_player_invisible:
+                self.screen_render.screen.blits(blits, False)
+                blits = []
                 self.world_render.rect((200, 100, 250), player_entity.rect(), 2)
+        self.screen_render.screen.blits(blits, False)
 
         player_sprite_y_relative_to_entity = \
             ENTITY_SPRITE_INITIALIZERS[player_entity.sprite][Direction.DOWN].position_relative_to_entity[1]
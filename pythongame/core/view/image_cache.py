@@ -0,0 +1,100 @@
+import json
+import os
+import struct
+from typing import List, Optional, Any, Tuple
+
+import pygame
+
+CACHE_DIRECTORY = "image_cache"
+CACHE_FORMAT_VERSION = 1
+
+# Decoding image files, cutting frames out of sprite sheets and scaling them is the bulk of the work when starting the
+# game. The resulting pixels are stored on disk, so that the next startup can read them as they are. Each cache file
+# holds a group of images (all the frames of a sprite, or all UI icons of a given size) and starts with a header that
+# describes where the images came from. If a source file has been modified, or the images are scaled to a different
+# size, the header won't match and the images are loaded from their source files again.
+#
+# File layout: header length (4 bytes), header (JSON), and then the RGBA pixels of each image, one after the other.
+
+# Where an image comes from: the source file, the area of the file (None for the entire file), and the scaled size
+ImageSource = Tuple[str, Optional[Tuple[int, int, int, int]], Tuple[int, int]]
+
+use_image_cache = True
+
+
+def load_images_from_cache(cache_name: str, sources: List[ImageSource]) -> Optional[List[Any]]:
+    if not use_image_cache:
+        return None
+    try:
+        with open(_get_cache_file_path(cache_name), 'rb') as file:
+            data = file.read()
+        header_length = struct.unpack_from("<I", data, 0)[0]
+        header = json.loads(data[4:4 + header_length].decode("utf-8"))
+        if header["key"] != _get_cache_key(sources):
+            return None
+        images = []
+        offset = 4 + header_length
+        for width, height, colorkey in header["images"]:
+            num_bytes = width * height * 4
+            image = pygame.image.frombuffer(data[offset:offset + num_bytes], (width, height), "RGBA").convert_alpha()
+            if colorkey is not None:
+                image.set_colorkey(tuple(colorkey), pygame.RLEACCEL)
+            images.append(image)
+            offset += num_bytes
+        return images
+    except (OSError, ValueError, KeyError, struct.error):
+        # A missing or broken cache file just means that the images need to be loaded from their sources
+        return None
+
+
+def save_images_to_cache(cache_name: str, sources: List[ImageSource], images: List[Any]):
+    if not use_image_cache:
+        return
+    header = {
+        "key": _get_cache_key(sources),
+        "images": [[image.get_width(), image.get_height(), image.get_colorkey()] for image in images]
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    file_path = _get_cache_file_path(cache_name)
+    try:
+        if not os.path.exists(CACHE_DIRECTORY):
+            os.makedirs(CACHE_DIRECTORY)
+        # The file is written under a temporary name first, so that an interrupted write can't leave a broken cache
+        # file
+        with open(file_path + ".tmp", 'wb') as file:
+            file.write(struct.pack("<I", len(header_bytes)))
+            file.write(header_bytes)
+            for image in images:
+                file.write(_get_pixels_ignoring_colorkey(image))
+        os.replace(file_path + ".tmp", file_path)
+    except OSError as e:
+        # The cache is only there to make startup faster, so the game works fine without it (in a read-only directory,
+        # for example)
+        print("WARN: Failed to save images to cache: " + str(e))
+
+
+def _get_pixels_ignoring_colorkey(image) -> bytes:
+    # Pixels that match the colorkey would otherwise be given an alpha of 0. (Copying the image first doesn't work, as
+    # the copy has the same problem.)
+    colorkey = image.get_colorkey()
+    if colorkey is None:
+        return pygame.image.tostring(image, "RGBA")
+    image.set_colorkey(None)
+    pixels = pygame.image.tostring(image, "RGBA")
+    image.set_colorkey(colorkey, pygame.RLEACCEL)
+    return pixels
+
+
+def _get_cache_key(sources: List[ImageSource]) -> List[Any]:
+    # The key is compared with the one from a JSON file, so it's built from lists rather than tuples
+    modification_times = {}
+    key = [CACHE_FORMAT_VERSION]
+    for file_path, area, scaling_size in sources:
+        if file_path not in modification_times:
+            modification_times[file_path] = os.path.getmtime(file_path)
+        key.append([file_path, modification_times[file_path], list(area) if area else None, list(scaling_size)])
+    return key
+
+
+def _get_cache_file_path(cache_name: str) -> str:
+    return os.path.join(CACHE_DIRECTORY, cache_name + ".bin")
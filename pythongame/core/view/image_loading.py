@@ -1,9 +1,15 @@
-from typing import Tuple, Optional, List, Any, Dict
+from collections import OrderedDict
+from typing import Tuple, Optional, List, Any, Dict, Iterable, Union, Callable
 
 import pygame
 from pygame.rect import Rect
 
+from pythongame.core.asset_loader import AssetLoader
 from pythongame.core.common import Direction, Sprite, UiIconSprite, PortraitIconSprite
+from pythongame.core.view.image_cache import ImageSource, load_images_from_cache, save_images_to_cache
+
+# All the entity sprites in the game take up less than 10MB when loaded, so normally nothing needs to be thrown away
+SPRITE_IMAGES_MAX_NUM_BYTES = 32 * 1024 * 1024
 
 
 class SpriteInitializer:
@@ -64,30 +70,61 @@ def load_and_scale_sprite(sprite_initializer: SpriteInitializer):
 
 
 def load_and_scale_directional_sprites(
-        animations_by_dir: Dict[Direction, Animation]) -> Dict[Direction, List[ImageWithRelativePosition]]:
-    images: Dict[Direction, List[ImageWithRelativePosition]] = {}
+        animations_by_dir: Dict[Direction, Animation],
+        cache_name: Optional[str] = None) -> Dict[Direction, List[ImageWithRelativePosition]]:
+    # All the frames of all directions are loaded (or read from the cache) as one flat list
+    frame_initializers: List[Union[SpriteInitializer, SpriteMapInitializer]] = []
     for direction in animations_by_dir:
         animation = animations_by_dir[direction]
-        images_for_dir: List[ImageWithRelativePosition] = []
         if animation.sprite_initializers:
-            for sprite_init in animation.sprite_initializers:
-                scaled_image = load_and_scale_sprite(sprite_init)
-                images_for_dir.append(ImageWithRelativePosition(scaled_image, animation.position_relative_to_entity))
+            frame_initializers += animation.sprite_initializers
         elif animation.sprite_map_initializers:
-            for sprite_map_init in animation.sprite_map_initializers:
-                sprite_sheet = sprite_map_init.sprite_sheet
-                index_position_within_map = sprite_map_init.index_position_within_map
-                original_sprite_size = sprite_map_init.original_sprite_size
-                rectangle = Rect(index_position_within_map[0] * original_sprite_size[0],
-                                 index_position_within_map[1] * original_sprite_size[1],
-                                 original_sprite_size[0],
-                                 original_sprite_size[1])
-                image = sprite_sheet.image_at(rectangle)
-                scaled_image = pygame.transform.scale(image, sprite_map_init.scaling_size)
-                images_for_dir.append(ImageWithRelativePosition(scaled_image, animation.position_relative_to_entity))
+            frame_initializers += animation.sprite_map_initializers
         else:
             raise Exception("Invalid animation: " + str(animation))
-        images[direction] = images_for_dir
+    scaled_images = _load_images_with_cache(cache_name, [_get_image_source(init) for init in frame_initializers],
+                                            lambda: [_load_frame(init) for init in frame_initializers])
+
+    images: Dict[Direction, List[ImageWithRelativePosition]] = {}
+    for direction in animations_by_dir:
+        animation = animations_by_dir[direction]
+        num_frames = len(animation.sprite_initializers or animation.sprite_map_initializers)
+        images[direction] = [ImageWithRelativePosition(scaled_image, animation.position_relative_to_entity)
+                             for scaled_image in scaled_images[:num_frames]]
+        scaled_images = scaled_images[num_frames:]
+    return images
+
+
+def _load_frame(initializer: Union[SpriteInitializer, SpriteMapInitializer]):
+    if isinstance(initializer, SpriteInitializer):
+        return load_and_scale_sprite(initializer)
+    image = initializer.sprite_sheet.image_at(_get_rect_within_sprite_map(initializer))
+    return pygame.transform.scale(image, initializer.scaling_size)
+
+
+def _get_rect_within_sprite_map(sprite_map_init: SpriteMapInitializer) -> Rect:
+    index_position_within_map = sprite_map_init.index_position_within_map
+    original_sprite_size = sprite_map_init.original_sprite_size
+    return Rect(index_position_within_map[0] * original_sprite_size[0],
+                index_position_within_map[1] * original_sprite_size[1],
+                original_sprite_size[0],
+                original_sprite_size[1])
+
+
+def _get_image_source(initializer: Union[SpriteInitializer, SpriteMapInitializer]) -> ImageSource:
+    if isinstance(initializer, SpriteInitializer):
+        return initializer.image_file_path, None, initializer.scaling_size
+    rect = _get_rect_within_sprite_map(initializer)
+    return initializer.sprite_sheet.file_path, (rect.x, rect.y, rect.w, rect.h), initializer.scaling_size
+
+
+def _load_images_with_cache(cache_name: Optional[str], sources: List[ImageSource],
+                            load_images: Callable[[], List[Any]]) -> List[Any]:
+    images = load_images_from_cache(cache_name, sources) if cache_name else None
+    if images is None:
+        images = load_images()
+        if cache_name:
+            save_images_to_cache(cache_name, sources, images)
     return images
 
 
@@ -96,17 +133,92 @@ def _load_and_scale_sprite(image_file_path: str, scaling_size: Tuple[int, int]):
     return pygame.transform.scale(image, scaling_size)
 
 
-def load_images_by_sprite(dictionary: Dict[Sprite, Dict[Direction, Animation]]) \
-        -> Dict[Sprite, Dict[Direction, List[ImageWithRelativePosition]]]:
-    return {sprite: load_and_scale_directional_sprites(dictionary[sprite]) for sprite in dictionary}
+# The images of a sprite are loaded and scaled the first time that they are needed, rather than for all sprites at
+# startup. When the loaded images take up more memory than allowed, the least recently used sprites are thrown away
+# (and they'll be loaded again if they are needed later).
+class LazyImagesBySprite:
+    def __init__(self, animations_by_sprite: Dict[Sprite, Dict[Direction, Animation]], max_num_bytes: int):
+        self._animations_by_sprite = animations_by_sprite
+        self._max_num_bytes = max_num_bytes
+        self._images_by_sprite: Dict[Sprite, Dict[Direction, List[ImageWithRelativePosition]]] = OrderedDict()
+        self._num_bytes_by_sprite: Dict[Sprite, int] = {}
+        self.num_bytes = 0
+        self.num_loads = 0
+
+    def __contains__(self, sprite: Sprite) -> bool:
+        return sprite in self._animations_by_sprite
+
+    def __getitem__(self, sprite: Sprite) -> Dict[Direction, List[ImageWithRelativePosition]]:
+        images = self._images_by_sprite.get(sprite)
+        if images is not None:
+            self._images_by_sprite.move_to_end(sprite)
+            return images
+        images = load_and_scale_directional_sprites(self._animations_by_sprite[sprite], "sprite_" + sprite.name)
+        self.num_loads += 1
+        self._images_by_sprite[sprite] = images
+        self._num_bytes_by_sprite[sprite] = sum(_get_num_bytes(image.image)
+                                                for images_for_dir in images.values() for image in images_for_dir)
+        self.num_bytes += self._num_bytes_by_sprite[sprite]
+        # The sprite that was just loaded is never thrown away, even if it alone is larger than the limit
+        while self.num_bytes > self._max_num_bytes and len(self._images_by_sprite) > 1:
+            evicted_sprite, _ = self._images_by_sprite.popitem(last=False)
+            self.num_bytes -= self._num_bytes_by_sprite.pop(evicted_sprite)
+        return images
+
+    def get(self, sprite: Sprite, default=None) -> Optional[Dict[Direction, List[ImageWithRelativePosition]]]:
+        return self[sprite] if sprite in self else default
+
+    def preload(self, sprites: Iterable[Sprite]):
+        for sprite in sprites:
+            if sprite in self:
+                self[sprite]
+
+    def num_loaded_sprites(self) -> int:
+        return len(self._images_by_sprite)
+
+
+def _get_num_bytes(image) -> int:
+    return image.get_width() * image.get_height() * image.get_bytesize()
 
 
 def load_images_by_ui_sprite(dictionary: Dict[UiIconSprite, str], icon_size: Tuple[int, int]) \
         -> Dict[UiIconSprite, Any]:
-    return {sprite: load_and_scale_sprite(SpriteInitializer(dictionary[sprite], icon_size)) for sprite in dictionary
-            }
+    return start_loading_images_by_ui_sprite(AssetLoader(num_workers=0), dictionary, icon_size)()
 
 
 def load_images_by_portrait_sprite(dictionary: Dict[PortraitIconSprite, str], icon_size: Tuple[int, int]) \
         -> Dict[PortraitIconSprite, Any]:
-    return {sprite: load_and_scale_sprite(SpriteInitializer(dictionary[sprite], icon_size)) for sprite in dictionary}
+    return start_loading_images_by_portrait_sprite(AssetLoader(num_workers=0), dictionary, icon_size)()
+
+
+# The image files are decoded by the asset loader. Once it's done, the returned function should be called on the main
+# thread, to finish loading the images.
+def start_loading_images_by_ui_sprite(asset_loader: AssetLoader, dictionary: Dict[UiIconSprite, str],
+                                      icon_size: Tuple[int, int]) -> Callable[[], Dict[UiIconSprite, Any]]:
+    return _start_loading_icons(asset_loader, "ui_icons_%ix%i" % icon_size, dictionary, icon_size)
+
+
+def start_loading_images_by_portrait_sprite(asset_loader: AssetLoader, dictionary: Dict[PortraitIconSprite, str],
+                                            icon_size: Tuple[int, int]) -> Callable[[], Dict[PortraitIconSprite, Any]]:
+    return _start_loading_icons(asset_loader, "portraits_%ix%i" % icon_size, dictionary, icon_size)
+
+
+def _start_loading_icons(asset_loader: AssetLoader, cache_name: str, file_paths_by_sprite: Dict[Any, str],
+                         icon_size: Tuple[int, int]) -> Callable[[], Dict[Any, Any]]:
+    sprites = list(file_paths_by_sprite.keys())
+    sources = [(file_paths_by_sprite[sprite], None, icon_size) for sprite in sprites]
+    # Reading images from the cache is fast, so that isn't worth doing in the background
+    cached_images = load_images_from_cache(cache_name, sources)
+    if cached_images is not None:
+        return lambda: dict(zip(sprites, cached_images))
+
+    decoded_images = [asset_loader.submit(pygame.image.load, file_paths_by_sprite[sprite]) for sprite in sprites]
+
+    def finish_loading() -> Dict[Any, Any]:
+        # Converting requires the display, so it can't be done by the asset loader
+        images = [pygame.transform.scale(decoded_image.result().convert_alpha(), icon_size)
+                  for decoded_image in decoded_images]
+        save_images_to_cache(cache_name, sources, images)
+        return dict(zip(sprites, images))
+
+    return finish_loading
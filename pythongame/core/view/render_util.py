@@ -1,4 +1,5 @@
-from typing import Tuple, Callable, List, Optional
+from collections import OrderedDict
+from typing import Tuple, Callable, List, Optional, Dict, Any
 
 import pygame
 from pygame.rect import Rect
@@ -7,6 +8,69 @@ from pythongame.core.math import sum_of_vectors
 from pythongame.core.view.image_loading import ImageWithRelativePosition
 
 COLOR_WHITE = (250, 250, 250)
+TEXT_SURFACE_CACHE_SIZE = 512
+TRANSPARENT_RECT_CACHE_SIZE = 256
+
+
+# Surfaces that are expensive to create and are needed again frame after frame are kept around and reused, by a key
+# that describes them. The least recently used ones are thrown away.
+class SurfaceCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._surfaces: Dict[Any, pygame.Surface] = OrderedDict()
+        self.num_hits = 0
+        self.num_misses = 0
+
+    def _get_or_create(self, key: Any, create_surface: Callable[[], pygame.Surface]) -> pygame.Surface:
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.num_hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+        self.num_misses += 1
+        surface = create_surface()
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_size:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def hit_ratio(self) -> float:
+        num_lookups = self.num_hits + self.num_misses
+        return self.num_hits / num_lookups if num_lookups > 0 else 0
+
+    def clear(self):
+        self._surfaces.clear()
+        self.num_hits = 0
+        self.num_misses = 0
+
+
+# Rasterizing text is slow compared to blitting a surface, and the same strings (damage numbers, labels, tooltips, etc)
+# are rendered every frame, so rendered texts are reused
+class TextSurfaceCache(SurfaceCache):
+    def render(self, font, text: str, color, antialias: bool = True) -> pygame.Surface:
+        return self._get_or_create((font, text, tuple(color), antialias), lambda: font.render(text, antialias, color))
+
+
+text_surface_cache = TextSurfaceCache(TEXT_SURFACE_CACHE_SIZE)
+
+
+# Transparent rectangles (particles, text backgrounds, tooltips, etc) need a surface of their own to be blitted from.
+# Instead of allocating and filling a new one for each rectangle every frame, the surfaces are reused for rectangles
+# with the same size, color and alpha.
+class TransparentRectCache(SurfaceCache):
+    def get_surface(self, size: Tuple[int, int], color, alpha: int) -> pygame.Surface:
+        return self._get_or_create((size[0], size[1], tuple(color), alpha),
+                                   lambda: _create_transparent_surface(size, color, alpha))
+
+
+def _create_transparent_surface(size: Tuple[int, int], color, alpha: int) -> pygame.Surface:
+    surface = pygame.Surface(size)
+    surface.set_alpha(alpha)
+    surface.fill(color)
+    return surface
+
+
+transparent_rect_cache = TransparentRectCache(TRANSPARENT_RECT_CACHE_SIZE)
 
 
 class DrawableArea:
@@ -25,9 +89,7 @@ class DrawableArea:
 
     def rect_transparent(self, rect: Rect, alpha: int, color):
         # Using a separate surface is the only way to render a transparent rectangle
-        surface = pygame.Surface((rect[2], rect[3]))
-        surface.set_alpha(alpha)
-        surface.fill(color)
+        surface = transparent_rect_cache.get_surface((int(rect[2]), int(rect[3])), color, alpha)
         self.screen.blit(surface, self._translate_pos((rect[0], rect[1])))
 
     def line(self, color, start_pos: Tuple[int, int], end_pos: Tuple[int, int], line_width: int):
@@ -44,7 +106,7 @@ class DrawableArea:
         self.rect_filled(color, Rect(x, y, max(w * ratio_filled, 0), h))
 
     def text(self, font, text: str, pos: Tuple[int, int], color=COLOR_WHITE):
-        self.screen.blit(font.render(text, True, color), self._translate_pos(pos))
+        self.screen.blit(text_surface_cache.render(font, text, color), self._translate_pos(pos))
 
     def text_centered(self, font, text: str, center_pos: Tuple[int, int], color=COLOR_WHITE):
         width = font.size(text)[0]
@@ -0,0 +1,171 @@
+from collections import OrderedDict
+from typing import Dict, Tuple, Optional, Set, Union, List
+
+import pygame
+from pygame.rect import Rect
+
+from pythongame.core.common import Direction, Sprite
+from pythongame.core.game_state import DecorationEntity, WallsState, DecorationsState, Wall
+from pythongame.core.view.image_loading import ImageWithRelativePosition, LazyImagesBySprite
+from pythongame.core.world_entity import WorldEntity
+
+CHUNK_SIZE = 512
+MAX_NUM_CACHED_CHUNKS = 32  # Each chunk is 1MB, and the camera rarely covers more than 6 chunks at once
+
+# Sprites of decorations and walls may be drawn some distance away from their entity's position. Entities this far
+# outside of a chunk are still considered when the chunk is built.
+_CHUNK_MARGIN = 128
+
+
+# Decorations and walls never move, so instead of blitting each of them every frame, they are pre-rendered into
+# fixed-size chunks of the world. The chunks are built lazily when they come into view and the least recently used
+# ones are thrown away. Adding or removing a wall or a decoration (as in the map editor) invalidates the chunks that
+# it touches.
+#
+# Walls with sprites that reach above the wall's own position (pillars, statues, etc) can be in front of or behind
+# other entities depending on where they stand, so those are not part of the static layer but are rendered together
+# with the other entities, sorted by depth.
+class StaticLayerCache:
+
+    def __init__(self, images_by_sprite: LazyImagesBySprite):
+        self.images_by_sprite = images_by_sprite
+        self._chunks: Dict[Tuple[int, int], pygame.Surface] = OrderedDict()
+        self._walls_state: Optional[WallsState] = None
+        self._decorations_state: Optional[DecorationsState] = None
+        self._baked_wall_entities: Set[WorldEntity] = set()
+        self._is_flat_by_sprite: Dict[Sprite, bool] = {}
+
+    def set_world(self, walls_state: WallsState, decorations_state: DecorationsState):
+        if walls_state is self._walls_state and decorations_state is self._decorations_state:
+            return
+        self._walls_state = walls_state
+        self._decorations_state = decorations_state
+        self._chunks.clear()
+        self._baked_wall_entities = {w.world_entity for w in walls_state.walls if self._is_flat(w.world_entity)}
+        # Observers can't be unregistered, so they ignore notifications from a world that is no longer rendered
+        walls_state.wall_was_added.register_observer(
+            lambda wall: self._on_wall_added(walls_state, wall))
+        walls_state.wall_was_removed.register_observer(
+            lambda wall: self._on_wall_removed(walls_state, wall))
+        decorations_state.decoration_was_added.register_observer(
+            lambda decoration: self._on_decoration_changed(decorations_state, decoration))
+        decorations_state.decoration_was_removed.register_observer(
+            lambda decoration: self._on_decoration_changed(decorations_state, decoration))
+        walls_state.walls_were_streamed_in.register_observer(
+            lambda walls: self._on_walls_streamed_in(walls_state, walls))
+        walls_state.walls_were_streamed_out.register_observer(
+            lambda walls: self._on_walls_streamed_out(walls_state, walls))
+        decorations_state.decorations_were_streamed_in.register_observer(
+            lambda decorations: self._on_decorations_streamed_in(decorations_state, decorations))
+
+    def is_baked(self, entity: WorldEntity) -> bool:
+        return entity in self._baked_wall_entities
+
+    def render(self, screen, camera_world_area: Rect):
+        x0 = camera_world_area.x // CHUNK_SIZE
+        x1 = (camera_world_area.x + camera_world_area.w - 1) // CHUNK_SIZE
+        y0 = camera_world_area.y // CHUNK_SIZE
+        y1 = (camera_world_area.y + camera_world_area.h - 1) // CHUNK_SIZE
+        for chunk_x in range(x0, x1 + 1):
+            for chunk_y in range(y0, y1 + 1):
+                surface = self._get_chunk((chunk_x, chunk_y))
+                chunk_world_area = Rect(chunk_x * CHUNK_SIZE, chunk_y * CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE)
+                # Only the part that is within the camera is blitted, so that nothing is drawn under the UI
+                visible_world_area = chunk_world_area.clip(camera_world_area)
+                screen.blit(surface, (visible_world_area.x - camera_world_area.x,
+                                      visible_world_area.y - camera_world_area.y),
+                            visible_world_area.move(-chunk_world_area.x, -chunk_world_area.y))
+
+    def _get_chunk(self, chunk: Tuple[int, int]) -> pygame.Surface:
+        if chunk in self._chunks:
+            self._chunks.move_to_end(chunk)
+            return self._chunks[chunk]
+        surface = self._build_chunk(chunk)
+        self._chunks[chunk] = surface
+        if len(self._chunks) > MAX_NUM_CACHED_CHUNKS:
+            self._chunks.popitem(last=False)
+        return surface
+
+    def _build_chunk(self, chunk: Tuple[int, int]) -> pygame.Surface:
+        surface = pygame.Surface((CHUNK_SIZE, CHUNK_SIZE), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        surface.fill((0, 0, 0, 0))
+        chunk_x = chunk[0] * CHUNK_SIZE
+        chunk_y = chunk[1] * CHUNK_SIZE
+        area = Rect(chunk_x - _CHUNK_MARGIN, chunk_y - _CHUNK_MARGIN, CHUNK_SIZE + _CHUNK_MARGIN * 2,
+                    CHUNK_SIZE + _CHUNK_MARGIN * 2)
+        walls = [w for w in self._walls_state.get_walls_in_camera(area) if w in self._baked_wall_entities]
+        walls.sort(key=lambda w: w.y)
+        for entity in self._decorations_state.get_decorations_in_camera(area) + walls:
+            if entity.visible and entity.sprite in self.images_by_sprite:
+                image = self._get_image(entity.sprite)
+                surface.blit(image.image, (entity.x + image.position_relative_to_entity[0] - chunk_x,
+                                           entity.y + image.position_relative_to_entity[1] - chunk_y))
+        return surface
+
+    def _get_image(self, sprite: Sprite) -> ImageWithRelativePosition:
+        images = self.images_by_sprite[sprite]
+        if Direction.DOWN in images:
+            return images[Direction.DOWN][0]
+        return next(iter(images.values()))[0]
+
+    # A wall is flat if its sprite doesn't reach above it, so that nothing can stand behind it
+    def _is_flat(self, entity: WorldEntity) -> bool:
+        if entity.sprite not in self._is_flat_by_sprite:
+            images = self.images_by_sprite.get(entity.sprite)
+            self._is_flat_by_sprite[entity.sprite] = images is not None and all(
+                image.position_relative_to_entity[1] >= 0 for frames in images.values() for image in frames)
+        return self._is_flat_by_sprite[entity.sprite]
+
+    def _on_wall_added(self, walls_state: WallsState, wall: Wall):
+        if walls_state is self._walls_state and self._is_flat(wall.world_entity):
+            self._baked_wall_entities.add(wall.world_entity)
+            self._invalidate_chunks_touched_by(wall.world_entity)
+
+    def _on_wall_removed(self, walls_state: WallsState, wall: Wall):
+        if walls_state is self._walls_state and wall.world_entity in self._baked_wall_entities:
+            self._baked_wall_entities.remove(wall.world_entity)
+            self._invalidate_chunks_touched_by(wall.world_entity)
+
+    def _on_decoration_changed(self, decorations_state: DecorationsState, decoration: DecorationEntity):
+        if decorations_state is self._decorations_state:
+            self._invalidate_chunks_touched_by(decoration)
+
+    # Regions are streamed in before they come into view (see map_streaming.py), so there are rarely any chunks to
+    # invalidate. Streamed out walls and decorations are far from the camera, and won't be drawn into new chunks.
+    def _on_walls_streamed_in(self, walls_state: WallsState, walls: List[Wall]):
+        if walls_state is self._walls_state:
+            flat_wall_entities = [w.world_entity for w in walls if self._is_flat(w.world_entity)]
+            self._baked_wall_entities.update(flat_wall_entities)
+            self._invalidate_chunks_in_area_of(flat_wall_entities)
+
+    def _on_walls_streamed_out(self, walls_state: WallsState, walls: List[Wall]):
+        if walls_state is self._walls_state:
+            self._baked_wall_entities.difference_update(w.world_entity for w in walls)
+
+    def _on_decorations_streamed_in(self, decorations_state: DecorationsState, decorations: List[DecorationEntity]):
+        if decorations_state is self._decorations_state:
+            self._invalidate_chunks_in_area_of(decorations)
+
+    def _invalidate_chunks_in_area_of(self, entities: List[Union[WorldEntity, DecorationEntity]]):
+        if not entities:
+            return
+        x0 = (min(e.x for e in entities) - _CHUNK_MARGIN) // CHUNK_SIZE
+        x1 = (max(e.x for e in entities) + _CHUNK_MARGIN) // CHUNK_SIZE
+        y0 = (min(e.y for e in entities) - _CHUNK_MARGIN) // CHUNK_SIZE
+        y1 = (max(e.y for e in entities) + _CHUNK_MARGIN) // CHUNK_SIZE
+        for chunk in list(self._chunks.keys()):
+            if x0 <= chunk[0] <= x1 and y0 <= chunk[1] <= y1:
+                del self._chunks[chunk]
+
+    def _invalidate_chunks_touched_by(self, entity: Union[WorldEntity, DecorationEntity]):
+        if entity.sprite not in self.images_by_sprite:
+            return
+        image = self._get_image(entity.sprite)
+        x = entity.x + image.position_relative_to_entity[0]
+        y = entity.y + image.position_relative_to_entity[1]
+        w, h = image.image.get_size()
+        for chunk_x in range(int(x) // CHUNK_SIZE, int(x + w) // CHUNK_SIZE + 1):
+            for chunk_y in range(int(y) // CHUNK_SIZE, int(y + h) // CHUNK_SIZE + 1):
+                self._chunks.pop((chunk_x, chunk_y), None)
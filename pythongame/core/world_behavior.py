@@ -9,6 +9,7 @@ from pythongame.core.game_data import HEROES
 from pythongame.core.game_state import GameState
 from pythongame.core.item_data import randomized_item_id
 from pythongame.core.sound_player import play_sound
+from pythongame.core.world_instances import SuspendedWorld, world_instance_manager
 from pythongame.scenes.scene_factory import AbstractSceneFactory
 from pythongame.scenes.scenes_game.game_engine import GameEngine
 from pythongame.scenes.scenes_game.game_ui_view import InfoMessage, GameUiView
@@ -58,13 +59,13 @@ class DungeonBehavior(AbstractWorldBehavior):
 
     def __init__(self,
                  scene_factory: AbstractSceneFactory,
-                 game_state_before_entering_dungeon: GameState,
+                 main_world: SuspendedWorld,
                  game_engine: GameEngine,
                  ui_view: GameUiView,
                  character_file: str,
                  total_time_played_on_character: Millis):
         self.scene_factory = scene_factory
-        self.game_state_before_entering_dungeon = game_state_before_entering_dungeon
+        self.main_world = main_world
         self.game_engine = game_engine
         self.game_state = game_engine.game_state
         self.ui_view = ui_view
@@ -118,8 +119,9 @@ class DungeonBehavior(AbstractWorldBehavior):
         )
         return SceneTransition(scene)
 
-    def _recreate_main_world_engine_and_behavior(self, _: GameEngine) -> Tuple[GameEngine, AbstractWorldBehavior]:
-        game_state = self.game_state_before_entering_dungeon
+    def _recreate_main_world_engine_and_behavior(self, dungeon_engine: GameEngine) \
+            -> Tuple[GameEngine, AbstractWorldBehavior]:
+        game_state = world_instance_manager.resume(self.main_world, dungeon_engine.game_state)
         engine = GameEngine(game_state, self.ui_view.info_message)
         behavior = StoryBehavior(self.scene_factory, engine, game_state, self.ui_view)
         return engine, behavior
@@ -154,8 +156,9 @@ class ChallengeBehavior(AbstractWorldBehavior):
                            ConsumableType.POWER]
             for consumable_type in consumables:
                 self.game_state.player_state.consumable_inventory.add_consumable(consumable_type)
-            items = [randomized_item_id(ItemType.LEATHER_COWL), randomized_item_id(ItemType.LEATHER_ARMOR),
-                     randomized_item_id(ItemType.PRACTICE_SWORD), randomized_item_id(ItemType.WOODEN_SHIELD)]
+            rng = self.game_state.rng
+            items = [randomized_item_id(ItemType.LEATHER_COWL, rng), randomized_item_id(ItemType.LEATHER_ARMOR, rng),
+                     randomized_item_id(ItemType.PRACTICE_SWORD, rng), randomized_item_id(ItemType.WOODEN_SHIELD, rng)]
             for item_type in items:
                 self._equip_item_on_startup(item_type)
 
@@ -22,6 +22,7 @@ class WorldEntity:
         self.view_z = 0  # increasing Z values = moving into the screen
         self.movement_changed: Observable = None  # space optimization: Only allocate when needed (i.e. for player entity)
         self.position_changed: Observable = None  # space optimization: Only allocate when needed (i.e. for player entity)
+        self.spatial_hash = None  # Set when the entity is tracked by a SpatialHash (i.e. for NPCs)
 
     def set_moving_in_dir(self, direction: Direction):
         if direction is None:
@@ -89,6 +90,8 @@ class WorldEntity:
         self.y = new_position[1]
         self.pygame_collision_rect.x = self.x
         self.pygame_collision_rect.y = self.y
+        if self.spatial_hash is not None:
+            self.spatial_hash.update_entity(self)
         self.notify_position_observers()
 
     def rotate_right(self):
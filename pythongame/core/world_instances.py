@@ -0,0 +1,145 @@
+import pickle
+import tempfile
+from typing import List, Optional, Any, Callable
+
+from pythongame.core.common import Observable
+from pythongame.core.game_state import GameState
+from pythongame.core.global_path_finder import get_global_path_finder, set_global_path_finder
+from pythongame.core.pathfinding.grid_astar_pathfinder import GlobalPathFinder
+
+SUSPENDED_WORLDS_MAX_NUM_BYTES = 64 * 1024 * 1024
+
+# Rough memory use of a world, measured with tracemalloc (map1 uses ~20MB)
+_NUM_BYTES_PER_ENTITY = 1000
+_NUM_BYTES_PER_PATHFINDER_CELL = 30
+_NUM_BYTES_PER_ABSTRACT_GRAPH_EDGE = 70
+
+
+# A world that the player has left (like the main world, while the player is in a dungeon). Its NPC's keep using the
+# path finder that they were created with, so that is suspended together with the game state.
+class SuspendedWorld:
+    def __init__(self, game_state: GameState, path_finder: GlobalPathFinder, num_bytes: int):
+        self.game_state: Optional[GameState] = game_state  # None while the world is stored on disk
+        self.path_finder: Optional[GlobalPathFinder] = path_finder
+        self.num_bytes = num_bytes
+        self.file = None  # Only set while the world is stored on disk
+
+
+# Keeps worlds that the player has left, so that they can be resumed as they were, without being set up again. If the
+# suspended worlds would use more memory than allowed, the ones that were suspended first are stored on disk until
+# they're resumed.
+#
+# The player state and the random generator are shared by all worlds (see create_dungeon_game_state), so they are
+# not part of a world that is stored on disk. The world that's being resumed gets them back from the current world.
+# Observers that belong to the UI are not stored either. The scene that switches between worlds registers them again
+# (see SwitchingGameWorldScene).
+class WorldInstanceManager:
+
+    def __init__(self, max_num_bytes: int):
+        self.max_num_bytes = max_num_bytes
+        self._worlds_in_memory: List[SuspendedWorld] = []
+        self.num_bytes = 0
+        self.num_worlds_stored_on_disk = 0
+
+    # Must be called before the global path finder is replaced by the next world's
+    def suspend(self, game_state: GameState) -> SuspendedWorld:
+        path_finder = get_global_path_finder()
+        world = SuspendedWorld(game_state, path_finder, _estimate_num_bytes(game_state, path_finder))
+        self._worlds_in_memory.append(world)
+        self.num_bytes += world.num_bytes
+        for world_to_store in list(self._worlds_in_memory):
+            if self.num_bytes <= self.max_num_bytes:
+                break
+            self._store_on_disk(world_to_store)
+        return world
+
+    def resume(self, world: SuspendedWorld, current_game_state: GameState) -> GameState:
+        if world.file is not None:
+            self._load_from_disk(world, current_game_state)
+        else:
+            self._worlds_in_memory.remove(world)
+            self.num_bytes -= world.num_bytes
+        game_state = world.game_state
+        set_global_path_finder(world.path_finder)
+        world.game_state = None
+        world.path_finder = None
+        return game_state
+
+    def _store_on_disk(self, world: SuspendedWorld):
+        # Queued path requests can't be stored, but agents request new paths regularly anyway
+        world.path_finder.cancel_queued_requests()
+        file = tempfile.TemporaryFile()
+        try:
+            _WorldPickler(file, world.game_state).dump((world.game_state, world.path_finder))
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            print("WARN: Failed to store suspended world on disk, keeping it in memory: " + str(e))
+            file.close()
+            return
+        self._worlds_in_memory.remove(world)
+        self.num_bytes -= world.num_bytes
+        self.num_worlds_stored_on_disk += 1
+        world.file = file
+        world.game_state = None
+        world.path_finder = None
+
+    def _load_from_disk(self, world: SuspendedWorld, current_game_state: GameState):
+        world.file.seek(0)
+        world.game_state, world.path_finder = _WorldUnpickler(world.file, current_game_state).load()
+        world.file.close()
+        world.file = None
+        self.num_worlds_stored_on_disk -= 1
+
+
+class _WorldPickler(pickle.Pickler):
+    def __init__(self, file, game_state: GameState):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self._game_state = game_state
+
+    def persistent_id(self, obj: Any) -> Optional[str]:
+        if obj is self._game_state.player_state:
+            return "player_state"
+        if obj is self._game_state.rng:
+            return "rng"
+        return None
+
+    # Only the game state's own observers are kept (the others belong to the UI and are registered again)
+    def reducer_override(self, obj: Any):
+        if isinstance(obj, Observable):
+            observers = [o for o in obj._observers if getattr(o, "__self__", None) is self._game_state]
+            return _create_observable, (observers,)
+        return NotImplemented
+
+
+class _WorldUnpickler(pickle.Unpickler):
+    def __init__(self, file, current_game_state: GameState):
+        super().__init__(file)
+        self._current_game_state = current_game_state
+
+    def persistent_load(self, pid: str) -> Any:
+        if pid == "player_state":
+            return self._current_game_state.player_state
+        if pid == "rng":
+            return self._current_game_state.rng
+        raise pickle.UnpicklingError("Unknown persistent id: " + str(pid))
+
+
+def _create_observable(observers: List[Callable[[Any], Any]]) -> Observable:
+    observable = Observable()
+    for observer in observers:
+        observable.register_observer(observer)
+    return observable
+
+
+def _estimate_num_bytes(game_state: GameState, path_finder: GlobalPathFinder) -> int:
+    game_world = game_state.game_world
+    num_entities = len(game_world.walls_state.walls) + len(game_world.decorations_state.decoration_entities) + \
+                   len(game_world.get_renderable_non_wall_entities())
+    clearance_map = game_state.pathfinder_clearance_map
+    num_abstract_graph_edges = sum(len(node_edges) for edges in path_finder.get_abstract_graph_edges().values()
+                                   for node_edges in edges.values())
+    return num_entities * _NUM_BYTES_PER_ENTITY + \
+           clearance_map.width * clearance_map.height * _NUM_BYTES_PER_PATHFINDER_CELL + \
+           num_abstract_graph_edges * _NUM_BYTES_PER_ABSTRACT_GRAPH_EDGE
+
+
+world_instance_manager = WorldInstanceManager(SUSPENDED_WORLDS_MAX_NUM_BYTES)
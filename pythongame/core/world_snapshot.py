@@ -0,0 +1,139 @@
+import json
+import os
+import struct
+from typing import Dict, List, Optional, Any
+
+from pythongame.core.game_state import GRID_CELL_WIDTH
+from pythongame.core.pathfinding.clearance_map import ClearanceMap
+from pythongame.core.pathfinding.grid_astar_pathfinder import GlobalPathFinder
+from pythongame.core.pathfinding.hierarchical_pathfinder import HierarchicalPathFinder, AbstractGraphEdges
+
+SNAPSHOT_DIRECTORY = "world_snapshots"
+SNAPSHOT_FORMAT_VERSION = 1  # Must be increased whenever the pathfinding data is computed differently
+
+# Setting up the pathfinding data for a world (the clearance map and the abstract graphs that hierarchical pathfinding
+# uses) takes much longer than loading the map itself. That data only depends on the walls of the map, so once it's
+# been computed, it's kept in memory for the rest of the session and stored on disk, keyed by the hash of the map file.
+# The next time the same map is loaded (starting a new game, loading a character, or restarting a challenge, in this
+# session or a later one), only the entities are created from the map file.
+#
+# File layout: header length (4 bytes), header (JSON), clearance values (one byte per cell), and then for each
+# abstract graph: its nodes, the number of edges of each node, and (neighbor, distance) for each edge (all int32).
+
+use_world_snapshots = True
+
+
+# The parts of a world that only depend on the map file. The snapshot of a world that hasn't been loaded before is
+# empty (see get_world_snapshot).
+class WorldSnapshot:
+    def __init__(self, map_hash: Optional[str], pathfinder_clearance: Optional[List[int]],
+                 abstract_graph_edges: Dict[int, AbstractGraphEdges]):
+        self.map_hash = map_hash
+        self.pathfinder_clearance = pathfinder_clearance
+        # Abstract graphs for hierarchical pathfinding, by required clearance
+        self.abstract_graph_edges = abstract_graph_edges
+
+
+_snapshots_by_map_hash: Dict[str, WorldSnapshot] = {}
+
+
+def get_world_snapshot(map_hash: Optional[str]) -> WorldSnapshot:
+    if use_world_snapshots and map_hash is not None:
+        if map_hash not in _snapshots_by_map_hash:
+            snapshot = _load_snapshot_from_file(map_hash)
+            if snapshot is None:
+                return WorldSnapshot(map_hash, None, {})
+            _snapshots_by_map_hash[map_hash] = snapshot
+        return _snapshots_by_map_hash[map_hash]
+    return WorldSnapshot(map_hash, None, {})
+
+
+# Called once the world has been set up, so that anything that wasn't part of the snapshot is added to it. Nothing
+# is stored if the world is unchanged since the map was loaded (as the map editor could have modified it).
+def update_world_snapshot(snapshot: WorldSnapshot, clearance_map: ClearanceMap, path_finder: GlobalPathFinder):
+    if not use_world_snapshots or snapshot.map_hash is None or clearance_map.version != 0:
+        return
+    abstract_graph_edges = dict(snapshot.abstract_graph_edges)
+    abstract_graph_edges.update(path_finder.get_abstract_graph_edges())
+    if snapshot.pathfinder_clearance is not None and abstract_graph_edges.keys() == \
+            snapshot.abstract_graph_edges.keys():
+        return
+    pathfinder_clearance = snapshot.pathfinder_clearance or list(clearance_map.clearance)
+    updated_snapshot = WorldSnapshot(snapshot.map_hash, pathfinder_clearance, abstract_graph_edges)
+    _snapshots_by_map_hash[snapshot.map_hash] = updated_snapshot
+    _save_snapshot_to_file(updated_snapshot, clearance_map.width, clearance_map.height)
+
+
+def _load_snapshot_from_file(map_hash: str) -> Optional[WorldSnapshot]:
+    try:
+        with open(_get_snapshot_file_path(map_hash), 'rb') as file:
+            data = file.read()
+        header_length = struct.unpack_from("<I", data, 0)[0]
+        header = json.loads(data[4:4 + header_length].decode("utf-8"))
+        if header["key"] != _get_snapshot_key(map_hash):
+            return None
+        offset = 4 + header_length
+        num_cells = header["width"] * header["height"]
+        pathfinder_clearance = list(data[offset:offset + num_cells])
+        offset += num_cells
+        abstract_graph_edges = {}
+        for required_clearance, num_nodes, num_edges in header["abstract_graphs"]:
+            nodes = struct.unpack_from("<%di" % num_nodes, data, offset)
+            offset += num_nodes * 4
+            edge_counts = struct.unpack_from("<%di" % num_nodes, data, offset)
+            offset += num_nodes * 4
+            edge_values = struct.unpack_from("<%di" % (num_edges * 2), data, offset)
+            offset += num_edges * 8
+            edges = {}
+            i = 0
+            for node, edge_count in zip(nodes, edge_counts):
+                edges[node] = [(edge_values[j], edge_values[j + 1]) for j in range(i, i + edge_count * 2, 2)]
+                i += edge_count * 2
+            abstract_graph_edges[required_clearance] = edges
+        return WorldSnapshot(map_hash, pathfinder_clearance, abstract_graph_edges)
+    except (OSError, ValueError, KeyError, struct.error):
+        # A missing or broken snapshot file just means that the pathfinding data needs to be computed
+        return None
+
+
+def _save_snapshot_to_file(snapshot: WorldSnapshot, width: int, height: int):
+    graph_descriptions = []
+    graph_bytes = []
+    for required_clearance, edges in snapshot.abstract_graph_edges.items():
+        edge_values = [value for node_edges in edges.values() for edge in node_edges for value in edge]
+        graph_descriptions.append([required_clearance, len(edges), len(edge_values) // 2])
+        graph_bytes.append(struct.pack("<%di" % len(edges), *edges.keys()))
+        graph_bytes.append(struct.pack("<%di" % len(edges), *[len(node_edges) for node_edges in edges.values()]))
+        graph_bytes.append(struct.pack("<%di" % len(edge_values), *edge_values))
+    header = {
+        "key": _get_snapshot_key(snapshot.map_hash),
+        "width": width,
+        "height": height,
+        "abstract_graphs": graph_descriptions
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    file_path = _get_snapshot_file_path(snapshot.map_hash)
+    try:
+        if not os.path.exists(SNAPSHOT_DIRECTORY):
+            os.makedirs(SNAPSHOT_DIRECTORY)
+        # The file is written under a temporary name first, so that an interrupted write can't leave a broken file
+        with open(file_path + ".tmp", 'wb') as file:
+            file.write(struct.pack("<I", len(header_bytes)))
+            file.write(header_bytes)
+            file.write(bytes(snapshot.pathfinder_clearance))
+            for data in graph_bytes:
+                file.write(data)
+        os.replace(file_path + ".tmp", file_path)
+    except OSError as e:
+        # The snapshot is still kept in memory for the rest of the session
+        print("WARN: Failed to save world snapshot to file: " + str(e))
+
+
+# Besides the map itself, the snapshot depends on the parameters that the pathfinding data is computed with
+def _get_snapshot_key(map_hash: str) -> List[Any]:
+    return [SNAPSHOT_FORMAT_VERSION, map_hash, GRID_CELL_WIDTH, ClearanceMap.MAX_CLEARANCE,
+            HierarchicalPathFinder.CLUSTER_SIZE]
+
+
+def _get_snapshot_file_path(map_hash: str) -> str:
+    return os.path.join(SNAPSHOT_DIRECTORY, map_hash + ".bin")
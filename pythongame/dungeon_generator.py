@@ -1,5 +1,4 @@
 import random
-from ast import literal_eval
 from enum import Enum
 from typing import List, Tuple, Callable, Optional
 
@@ -8,7 +7,13 @@ from pygame.rect import Rect
 from pythongame.core.common import WallType, Sprite
 from pythongame.core.entity_creation import create_wall, create_decoration_entity
 from pythongame.core.game_state import DecorationEntity, Wall, NonPlayerCharacter
-from pythongame.map_file import MapJson
+from pythongame.map_file import MapJson, encode_grid, decode_grid
+
+try:
+    import numpy
+except ImportError:
+    # NumPy is optional. Without it, the slower ListGrid is used.
+    numpy = None
 
 MAX_ROOM_ATTEMPTS = 100
 
@@ -21,26 +26,35 @@ class CellType(Enum):
     WALL = 3
 
 
-class Grid:
+_CELL_TYPES_BY_VALUE = {cell_type.value: cell_type for cell_type in CellType}
+_NONE = CellType.NONE.value
+_FLOOR = CellType.FLOOR.value
+_WALL = CellType.WALL.value
+
+
+# The grid that dungeons and "smart" floor tiles in the map editor are created from. Non-floor cells that are next to
+# a floor cell (diagonally too) are walls, except thin wall segments that are surrounded by floor (see
+# _prune_bad_walls). Cells are indexed [x][y].
+#
+# This is the pure Python version of the grid, which is used when NumPy isn't installed (see NumpyGrid).
+class ListGrid:
     def __init__(self, grid: List[List[CellType]], size: Tuple[int, int]):
         self._grid = grid
         self.size = size
-        self._floor_cells = set()
 
     @staticmethod
     def create_from_rects(map_size: Tuple[int, int], walkable_areas: List[Rect]):
 
         print("Creating grid (%i, %i) from %i rects ..." % (map_size[0], map_size[1], len(walkable_areas)))
         _grid = []
-        grid = Grid(_grid, map_size)
+        grid = ListGrid(_grid, map_size)
         for y in range(map_size[0]):
             _grid.append([CellType.NONE] * map_size[1])
 
         for rect in walkable_areas:
-            for y in range(rect.y, rect.y + rect.h):
-                for x in range(rect.x, rect.x + rect.w):
+            for y in range(max(0, rect.y), min(rect.y + rect.h, map_size[1])):
+                for x in range(max(0, rect.x), min(rect.x + rect.w, map_size[0])):
                     _grid[x][y] = CellType.FLOOR
-                    grid._floor_cells.add((x, y))
 
         grid._update_wall_cells(range(0, grid.size[0]), range(0, grid.size[1]))
         grid._prune_bad_walls(range(0, grid.size[0]), range(0, grid.size[1]))
@@ -50,6 +64,12 @@ class Grid:
         return grid
 
     def add_floor_cells(self, cells: List[Tuple[int, int]]):
+        self._set_cells(cells, CellType.FLOOR)
+
+    def remove_floor_cells(self, cells: List[Tuple[int, int]]):
+        self._set_cells(cells, CellType.NONE)
+
+    def _set_cells(self, cells: List[Tuple[int, int]], cell_type: CellType):
         if not cells:
             return
 
@@ -59,21 +79,7 @@ class Grid:
         ymax = max([cell[1] for cell in cells]) + 2
 
         for cell in cells:
-            self._grid[cell[0]][cell[1]] = CellType.FLOOR
-            self._floor_cells.add(cell)
-        self._update_wall_cells(range(xmin, xmax), range(ymin, ymax))
-        self._prune_bad_walls(range(xmin, xmax), range(ymin, ymax))
-
-    def remove_floor_cells(self, cells: List[Tuple[int, int]]):
-        xmin = min([cell[0] for cell in cells]) - 1
-        xmax = max([cell[0] for cell in cells]) + 2
-        ymin = min([cell[1] for cell in cells]) - 1
-        ymax = max([cell[1] for cell in cells]) + 2
-
-        for cell in cells:
-            self._grid[cell[0]][cell[1]] = CellType.NONE
-            if cell in self._floor_cells:
-                self._floor_cells.remove(cell)
+            self._grid[cell[0]][cell[1]] = cell_type
         self._update_wall_cells(range(xmin, xmax), range(ymin, ymax))
         self._prune_bad_walls(range(xmin, xmax), range(ymin, ymax))
 
@@ -96,71 +102,171 @@ class Grid:
                 return self._grid[x][y] == target
         return False
 
-    def _is_within_grid(self, cell: Tuple[int, int]):
-        return 0 <= cell[0] < self.size[0] and 0 <= cell[1] < self.size[1]
-
     def is_wall(self, cell: Tuple[int, int]):
         return self._is_cell(cell, CellType.WALL)
 
     def is_floor(self, cell: Tuple[int, int]):
         return self._is_cell(cell, CellType.FLOOR)
 
+    # Cells that are next to a floor cell become walls, and walls that aren't next to one are removed
     def _update_wall_cells(self, xrange, yrange):
-        # print("Updating wall cells...")
-
-        cells_that_have_floor_neighbours = set()
-
-        for (x, y) in self._floor_cells:
-            cells_that_have_floor_neighbours.add((x, y - 1))
-            cells_that_have_floor_neighbours.add((x + 1, y - 1))
-            cells_that_have_floor_neighbours.add((x + 1, y))
-            cells_that_have_floor_neighbours.add((x + 1, y + 1))
-            cells_that_have_floor_neighbours.add((x, y + 1))
-            cells_that_have_floor_neighbours.add((x - 1, y + 1))
-            cells_that_have_floor_neighbours.add((x - 1, y))
-            cells_that_have_floor_neighbours.add((x - 1, y - 1))
-
-        xmin = min(xrange)
-        xmax = max(xrange)
-        ymin = min(yrange)
-        ymax = max(yrange)
-
-        for x in range(max(0, xmin), min(xmax + 1, self.size[0])):
-            for y in range(max(0, ymin), min(ymax + 1, self.size[1])):
-                cell = self._grid[x][y]
-                if cell == CellType.FLOOR:
-                    continue
-                has_floor_neighbour = (x, y) in cells_that_have_floor_neighbours
-                if has_floor_neighbour and cell == CellType.NONE:
-                    self._grid[x][y] = CellType.WALL
-                elif not has_floor_neighbour and cell == CellType.WALL:
-                    self._grid[x][y] = CellType.NONE
-        # print("done.")
-
+        w, h = self.size
+        x0, x1 = max(0, min(xrange)), min(max(xrange) + 1, w)
+        y0, y1 = max(0, min(yrange)), min(max(yrange) + 1, h)
+        if x0 >= x1 or y0 >= y1:
+            return
+        floor = CellType.FLOOR
+        # For each column around the window: which of the cells y0..y1 have a floor cell above, below, or at them
+        floor_nearby_by_column = {}
+        for x in range(max(0, x0 - 1), min(x1 + 1, w)):
+            column = self._grid[x]
+            is_floor = [0 <= y < h and column[y] is floor for y in range(y0 - 1, y1 + 1)]
+            floor_nearby_by_column[x] = [is_floor[i] or is_floor[i + 1] or is_floor[i + 2] for i in range(y1 - y0)]
+        no_floor_nearby = [False] * (y1 - y0)
+        for x in range(x0, x1):
+            column = self._grid[x]
+            left = floor_nearby_by_column.get(x - 1, no_floor_nearby)
+            middle = floor_nearby_by_column[x]
+            right = floor_nearby_by_column.get(x + 1, no_floor_nearby)
+            for i in range(y1 - y0):
+                if column[y0 + i] is not floor:
+                    column[y0 + i] = CellType.WALL if left[i] or middle[i] or right[i] else CellType.NONE
+
+    # Thin wall segments that are "inside" walkable areas, cannot be rendered in a good way given the sprites we are
+    # using, so we remove any such segments. Removing one can leave a neighboring wall as thin, so this is repeated
+    # until no such segments are left.
     def _prune_bad_walls(self, xrange, yrange):
-        # print("Pruning wall cells...")
-        for x in xrange:
-            for y in yrange:
-                # Thin wall segments that are "inside" walkable areas, cannot be rendered in a good way given the
-                # sprites we are using, so we remove any such segments.
-                is_wall = self.is_wall((x, y))
-                if is_wall and (
-                        (self.is_floor((x - 1, y)) and self.is_floor((x + 1, y)))
-                        or
-                        (self.is_floor((x, y - 1)) and self.is_floor((x, y + 1)))
-                ):
-                    self._grid[x][y] = CellType.FLOOR
-        # print("done.")
+        w, h = self.size
+        floor = CellType.FLOOR
+        wall = CellType.WALL
+        xs = [x for x in xrange if 0 <= x < w]
+        ys = [y for y in yrange if 0 <= y < h]
+        has_pruned_walls = True
+        while has_pruned_walls:
+            has_pruned_walls = False
+            for x in xs:
+                column = self._grid[x]
+                left = self._grid[x - 1] if x > 0 else None
+                right = self._grid[x + 1] if x < w - 1 else None
+                for y in ys:
+                    if column[y] is wall and (
+                            (left is not None and right is not None and left[y] is floor and right[y] is floor)
+                            or
+                            (0 < y < h - 1 and column[y - 1] is floor and column[y + 1] is floor)
+                    ):
+                        column[y] = floor
+                        has_pruned_walls = True
 
     def serialize(self) -> str:
-        return str([[cell.value for cell in row] for row in self._grid])
+        return encode_grid(self.size, bytes(cell.value for column in self._grid for cell in column))
 
     @staticmethod
     def deserialize(string: str):
-        grid = [[CellType(cell) for cell in row] for row in literal_eval(string)]
-        w = len(grid)
-        h = len(grid[0])
-        return Grid(grid, (w, h))
+        (w, h), cells = decode_grid(string)
+        return ListGrid([[_CELL_TYPES_BY_VALUE[cell] for cell in cells[x * h:(x + 1) * h]] for x in range(w)], (w, h))
+
+
+# The same grid as ListGrid, stored in a NumPy array, so that rooms are filled in and walls are derived with array
+# operations instead of cell by cell. The array has a border of NONE cells around the grid, so that the neighbors of
+# any cell in the grid can be read without bounds checks.
+#
+# Edits (from the map editor) only update the cells around the edited ones, which keeps them fast on large maps.
+class NumpyGrid:
+    def __init__(self, cells: "numpy.ndarray"):
+        self._cells = cells  # CellType values, indexed [x + 1, y + 1]
+        self.size = (cells.shape[0] - 2, cells.shape[1] - 2)
+
+    @staticmethod
+    def create_from_rects(map_size: Tuple[int, int], walkable_areas: List[Rect]):
+        print("Creating grid (%i, %i) from %i rects ..." % (map_size[0], map_size[1], len(walkable_areas)))
+        grid = NumpyGrid(numpy.zeros((map_size[0] + 2, map_size[1] + 2), dtype=numpy.uint8))
+        for rect in walkable_areas:
+            x0, y0 = max(0, rect.x), max(0, rect.y)
+            x1, y1 = min(rect.x + rect.w, map_size[0]), min(rect.y + rect.h, map_size[1])
+            grid._cells[x0 + 1:x1 + 1, y0 + 1:y1 + 1] = _FLOOR
+        grid._update_wall_cells((0, map_size[0]), (0, map_size[1]))
+        grid._prune_bad_walls((0, map_size[0]), (0, map_size[1]))
+        print("Grid created")
+        return grid
+
+    def add_floor_cells(self, cells: List[Tuple[int, int]]):
+        self._set_cells(cells, CellType.FLOOR)
+
+    def remove_floor_cells(self, cells: List[Tuple[int, int]]):
+        self._set_cells(cells, CellType.NONE)
+
+    def _set_cells(self, cells: List[Tuple[int, int]], cell_type: CellType):
+        if not cells:
+            return
+        indices = numpy.array(cells) + 1
+        self._cells[indices[:, 0], indices[:, 1]] = cell_type.value
+        xrange = (max(0, min([cell[0] for cell in cells]) - 1), min(self.size[0], max([cell[0] for cell in cells]) + 2))
+        yrange = (max(0, min([cell[1] for cell in cells]) - 1), min(self.size[1], max([cell[1] for cell in cells]) + 2))
+        self._update_wall_cells(xrange, yrange)
+        self._prune_bad_walls(xrange, yrange)
+
+    def print(self):
+        for y in range(self.size[1]):
+            for x in range(self.size[0]):
+                value = self._cells.item(x + 1, y + 1)
+                print("* " if value == _FLOOR else ("x " if value == _WALL else "  "), end='')
+            print()
+
+    def cell(self, x: int, y: int):
+        return _CELL_TYPES_BY_VALUE[self._cells.item(x + 1, y + 1)]
+
+    def is_wall(self, cell: Tuple[int, int]):
+        x, y = cell
+        return 0 <= x < self.size[0] and 0 <= y < self.size[1] and self._cells.item(x + 1, y + 1) == _WALL
+
+    def is_floor(self, cell: Tuple[int, int]):
+        x, y = cell
+        return 0 <= x < self.size[0] and 0 <= y < self.size[1] and self._cells.item(x + 1, y + 1) == _FLOOR
+
+    # The cells within the given ranges (grid coordinates, end exclusive), together with the border of cells around
+    # them, as a view into the array
+    def _get_cells_with_border(self, xrange: Tuple[int, int], yrange: Tuple[int, int]) -> "numpy.ndarray":
+        return self._cells[xrange[0]:xrange[1] + 2, yrange[0]:yrange[1] + 2]
+
+    # Cells that are next to a floor cell become walls, and walls that aren't next to one are removed
+    def _update_wall_cells(self, xrange: Tuple[int, int], yrange: Tuple[int, int]):
+        cells = self._get_cells_with_border(xrange, yrange)
+        is_floor = cells == _FLOOR
+        w, h = cells.shape[0] - 2, cells.shape[1] - 2
+        has_floor_neighbour = numpy.zeros((w, h), dtype=bool)
+        for dx in range(3):
+            for dy in range(3):
+                has_floor_neighbour |= is_floor[dx:dx + w, dy:dy + h]
+        inner_cells = cells[1:-1, 1:-1]
+        inner_cells[:] = numpy.where(is_floor[1:-1, 1:-1], _FLOOR,
+                                     numpy.where(has_floor_neighbour, _WALL, _NONE))
+
+    # Thin wall segments that are "inside" walkable areas, cannot be rendered in a good way given the sprites we are
+    # using, so we remove any such segments. Removing one can leave a neighboring wall as thin, so this is repeated
+    # until no such segments are left.
+    def _prune_bad_walls(self, xrange: Tuple[int, int], yrange: Tuple[int, int]):
+        cells = self._get_cells_with_border(xrange, yrange)
+        inner_cells = cells[1:-1, 1:-1]
+        while True:
+            is_floor = cells == _FLOOR
+            is_bad_wall = (inner_cells == _WALL) & (
+                    (is_floor[:-2, 1:-1] & is_floor[2:, 1:-1]) | (is_floor[1:-1, :-2] & is_floor[1:-1, 2:]))
+            if not is_bad_wall.any():
+                break
+            inner_cells[is_bad_wall] = _FLOOR
+
+    def serialize(self) -> str:
+        return encode_grid(self.size, self._cells[1:-1, 1:-1].tobytes())
+
+    @staticmethod
+    def deserialize(string: str):
+        (w, h), cells = decode_grid(string)
+        grid = NumpyGrid(numpy.zeros((w + 2, h + 2), dtype=numpy.uint8))
+        grid._cells[1:-1, 1:-1] = numpy.frombuffer(cells, dtype=numpy.uint8).reshape((w, h))
+        return grid
+
+
+Grid = NumpyGrid if numpy is not None else ListGrid
 
 
 class GeneratedDungeon:
@@ -177,13 +283,14 @@ class DungeonGenerator:
 
     def __init__(self, world_size: Tuple[int, int], max_num_rooms: int, room_allowed_width: Tuple[int, int],
                  room_allowed_height: Tuple[int, int], corridor_allowed_width: Tuple[int, int],
-                 generate_npc: Callable[[int, int], Optional[NonPlayerCharacter]]):
+                 generate_npc: Callable[[int, int], Optional[NonPlayerCharacter]], rng: random.Random):
         self.world_size = world_size
         self.max_num_rooms = max_num_rooms
         self.room_allowed_width = room_allowed_width
         self.room_allowed_height = room_allowed_height
         self.corridor_allowed_width = corridor_allowed_width
         self.generate_npc = generate_npc
+        self.rng = rng
 
     def generate_random_grid(self) -> Tuple[Grid, List[Rect]]:
         rooms, corridors = self._generate_rooms_and_corridors(self.world_size)
@@ -200,23 +307,23 @@ class DungeonGenerator:
     def generate_random_dungeon_from_grid(self, grid: Grid, rooms: List[Rect]) -> GeneratedDungeon:
         decorations, walls = self._create_floor_tiles_and_walls_from_grid(grid, (0, grid.size[0]), (0, grid.size[1]))
         world_area = Rect(0, 0, grid.size[0] * CELL_SIZE, grid.size[1] * CELL_SIZE)
-        start_room = random.choice(rooms)
+        start_room = self.rng.choice(rooms)
         player_position = self._get_room_center(start_room)
         npcs = self._generate_npcs(rooms, start_room)
         return GeneratedDungeon(decorations, walls, world_area, player_position, npcs)
 
     def _generate_room(self, map_size: Tuple[int, int]) -> Rect:
-        w = random.randint(self.room_allowed_width[0], self.room_allowed_width[1] + 1)
-        h = random.randint(self.room_allowed_height[0], self.room_allowed_height[1] + 1)
-        x = random.randint(1, map_size[0] - w - 3)
-        y = random.randint(1, map_size[1] - h - 3)
+        w = self.rng.randint(self.room_allowed_width[0], self.room_allowed_width[1] + 1)
+        h = self.rng.randint(self.room_allowed_height[0], self.room_allowed_height[1] + 1)
+        x = self.rng.randint(1, map_size[0] - w - 3)
+        y = self.rng.randint(1, map_size[1] - h - 3)
         return Rect(x, y, w, h)
 
     def _generate_corridor_between_rooms(self, room1: Rect, room2: Rect) -> List[Rect]:
         x1, y1 = room1.x + room1.w // 2, room1.y + room1.h // 2
         x2, y2 = room2.x + room2.w // 2, room2.y + room2.h // 2
 
-        width = random.randint(self.corridor_allowed_width[0], self.corridor_allowed_width[1] + 1)
+        width = self.rng.randint(self.corridor_allowed_width[0], self.corridor_allowed_width[1] + 1)
 
         ver_rect = Rect(x1 - (width - 1) // 2, min(y1, y2) - (width - 1) // 2, width, abs(y1 - y2) + width)
         hor_rect = Rect(min(x1, x2) - (width - 1) // 2, y2 - (width - 1) // 2, abs(x1 - x2) + width, width)
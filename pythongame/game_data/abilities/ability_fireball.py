@@ -1,4 +1,3 @@
-import random
 from typing import Tuple
 
 from pythongame.core.abilities import AbilityData, ABILITIES, register_ability_data
@@ -53,7 +52,7 @@ class ProjectileController(AbstractProjectileController):
         super().__init__(1500)
 
     def apply_enemy_collision(self, npc: NonPlayerCharacter, game_state: GameState, projectile: Projectile):
-        damage_amount: float = MIN_DMG + random.random() * (MAX_DMG - MIN_DMG)
+        damage_amount: float = MIN_DMG + game_state.rng.random() * (MAX_DMG - MIN_DMG)
         deal_player_damage_to_enemy(game_state, npc, damage_amount, DamageType.MAGIC)
         _create_visual_splash(npc.world_entity.get_center_position(), game_state)
         has_burn_upgrade = game_state.player_state.has_upgrade(HeroUpgradeId.ABILITY_FIREBALL_BURN)
@@ -1,5 +1,3 @@
-import random
-
 from pythongame.core.abilities import AbilityData, register_ability_data
 from pythongame.core.ability_effects import register_ability_effect, AbilityWasUsedSuccessfully, AbilityResult
 from pythongame.core.buff_effects import get_buff_effect, AbstractBuffEffect, register_buff_effect
@@ -57,7 +55,7 @@ class ChannelingStomp(AbstractBuffEffect):
         game_state.game_world.visual_effects.append(
             VisualRect((250, 250, 0), hero_center_pos, distance, distance * 2, Millis(100), 4, None))
         for enemy in affected_enemies:
-            damage: float = MIN_DMG + random.random() * (MAX_DMG - MIN_DMG)
+            damage: float = MIN_DMG + game_state.rng.random() * (MAX_DMG - MIN_DMG)
             deal_player_damage_to_enemy(game_state, enemy, damage, DamageType.PHYSICAL)
             enemy.gain_buff_effect(get_buff_effect(STUNNED_BY_STOMP), STUN_DURATION)
         game_state.player_state.gain_buff_effect(get_buff_effect(BuffType.RECOVERING_AFTER_ABILITY), Millis(300))
@@ -1,5 +1,3 @@
-import random
-
 from pygame.rect import Rect
 
 from pythongame.core.abilities import AbilityData, ABILITIES, register_ability_data
@@ -40,7 +38,7 @@ def _apply_ability(game_state: GameState) -> AbilityResult:
         if has_aoe_upgrade and hit_multiple_enemies:
             damage: float = MAX_DMG
         else:
-            damage: float = MIN_DMG + random.random() * (MAX_DMG - MIN_DMG)
+            damage: float = MIN_DMG + game_state.rng.random() * (MAX_DMG - MIN_DMG)
         deal_player_damage_to_enemy(game_state, enemy, damage, DamageType.PHYSICAL)
 
     game_state.game_world.visual_effects.append(
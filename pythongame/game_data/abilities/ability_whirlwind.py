@@ -1,5 +1,3 @@
-import random
-
 from pythongame.core.abilities import AbilityData, register_ability_data
 from pythongame.core.ability_effects import register_ability_effect, AbilityWasUsedSuccessfully, AbilityResult
 from pythongame.core.buff_effects import AbstractBuffEffect, get_buff_effect, register_buff_effect
@@ -48,10 +46,12 @@ class ProjectileController(AbstractProjectileController):
         self.damage_timer = PeriodicTimer(PROJECTILE_DAMAGE_INTERVAL)
         self.direction_change_timer = PeriodicTimer(Millis(250))
         self._relative_direction = 0
-        self._rotation_motion = random.choice([-1, 1])
+        self._rotation_motion = None  # Randomized on the first update, when the game's RNG is available
 
     def notify_time_passed(self, game_state: GameState, projectile: Projectile, time_passed: Millis):
         super().notify_time_passed(game_state, projectile, time_passed)
+        if self._rotation_motion is None:
+            self._rotation_motion = game_state.rng.choice([-1, 1])
         projectile_entity = projectile.world_entity
 
         if self.damage_timer.update_and_check_if_ready(time_passed):
@@ -60,13 +60,13 @@ class ProjectileController(AbstractProjectileController):
                 damage_was_dealt = deal_player_damage_to_enemy(game_state, enemy, damage_amount, DamageType.MAGIC)
                 if damage_was_dealt:
                     has_stun_upgrade = game_state.player_state.has_upgrade(HeroUpgradeId.ABILITY_WHIRLWIND_STUN)
-                    if has_stun_upgrade and random.random() < 0.2:
+                    if has_stun_upgrade and game_state.rng.random() < 0.2:
                         enemy.gain_buff_effect(get_buff_effect(BUFF_TYPE), WHIRLWIND_TALENT_STUN_DURATION)
 
         if self.direction_change_timer.update_and_check_if_ready(time_passed):
             should_rotate = True
             # keep going straight ahead sometimes
-            if self._relative_direction == 0 and random.random() < 0.5:
+            if self._relative_direction == 0 and game_state.rng.random() < 0.5:
                 should_rotate = False
 
             if should_rotate:
@@ -56,7 +56,7 @@ class NpcMind(AbstractNpcMind):
         self._attack_interval = 1000
         self._time_since_attack = self._attack_interval
         self._update_path_interval = 900
-        self._time_since_updated_path = random.randint(0, self._update_path_interval)
+        self._time_since_updated_path = None  # Randomized on the first update, when the game's RNG is available
         self.pathfinder = NpcPathfinder(global_path_finder)
         self.next_waypoint = None
         self._reevaluate_next_waypoint_direction_interval = 1000
@@ -64,6 +64,9 @@ class NpcMind(AbstractNpcMind):
 
     def control_npc(self, game_state: GameState, npc: NonPlayerCharacter, player_entity: WorldEntity,
                     is_player_invisible: bool, time_passed: Millis):
+        if self._time_since_updated_path is None:
+            # Spread out the path updates of NPCs that were created at the same time
+            self._time_since_updated_path = game_state.rng.randint(0, self._update_path_interval)
         self._time_since_updated_path += time_passed
         self._time_since_reevaluated += time_passed
         self._time_since_attack += time_passed
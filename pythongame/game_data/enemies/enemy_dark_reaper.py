@@ -1,5 +1,3 @@
-import random
-
 from pythongame.core.buff_effects import AbstractBuffEffect, register_buff_effect, get_buff_effect
 from pythongame.core.common import Millis, NpcType, Sprite, Direction, BuffType, LootTableId
 from pythongame.core.damage_interactions import deal_damage_to_player, DamageType
@@ -24,7 +22,7 @@ class NpcMind(AbstractNpcMind):
         self._attack_interval = 1000
         self._time_since_attack = self._attack_interval
         self._update_path_interval = 900
-        self._time_since_updated_path = random.randint(0, self._update_path_interval)
+        self._time_since_updated_path = None  # Randomized on the first update, when the game's RNG is available
         self.pathfinder = NpcPathfinder(global_path_finder)
         self.next_waypoint = None
         self._reevaluate_next_waypoint_direction_interval = 1000
@@ -38,6 +36,9 @@ class NpcMind(AbstractNpcMind):
         if npc.stun_status.is_stunned():
             return
         self._time_since_attack += time_passed
+        if self._time_since_updated_path is None:
+            # Spread out the path updates of NPCs that were created at the same time
+            self._time_since_updated_path = game_state.rng.randint(0, self._update_path_interval)
         self._time_since_updated_path += time_passed
         self._time_since_reevaluated += time_passed
         self._time_since_shield += time_passed
@@ -60,8 +61,8 @@ class NpcMind(AbstractNpcMind):
             if self.next_waypoint:
                 direction = self.pathfinder.get_dir_towards_considering_collisions(
                     game_state, enemy_entity, self.next_waypoint)
-                if random.random() < 0.1 and direction:
-                    direction = random.choice(get_perpendicular_directions(direction))
+                if game_state.rng.random() < 0.1 and direction:
+                    direction = game_state.rng.choice(get_perpendicular_directions(direction))
                 _move_in_dir(enemy_entity, direction)
             else:
                 enemy_entity.set_not_moving()
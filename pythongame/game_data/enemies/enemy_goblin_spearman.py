@@ -16,17 +16,19 @@ SPRINT_MAX_COOLDOWN = Millis(10000)
 class NpcMind(MeleeEnemyNpcMind):
     def __init__(self, global_path_finder: GlobalPathFinder):
         super().__init__(global_path_finder, Millis(1000), 4, 0, Millis(900))
-        self.sprint_cooldown_remaining = self.random_cooldown()
+        self.sprint_cooldown_remaining = None  # Randomized on the first update, when the game's RNG is available
 
     @staticmethod
-    def random_cooldown():
-        return random.randint(SPRINT_MAX_COOLDOWN // 2, SPRINT_MAX_COOLDOWN)
+    def random_cooldown(rng: random.Random):
+        return rng.randint(SPRINT_MAX_COOLDOWN // 2, SPRINT_MAX_COOLDOWN)
 
     def control_npc(self, game_state: GameState, npc: NonPlayerCharacter, player_entity: WorldEntity,
                     is_player_invisible: bool, time_passed: Millis):
         if npc.stun_status.is_stunned():
             return
         super().control_npc(game_state, npc, player_entity, is_player_invisible, time_passed)
+        if self.sprint_cooldown_remaining is None:
+            self.sprint_cooldown_remaining = self.random_cooldown(game_state.rng)
         self.sprint_cooldown_remaining -= time_passed
         sprint_distance_limit = 250
         if self.sprint_cooldown_remaining <= 0:
@@ -34,7 +36,7 @@ class NpcMind(MeleeEnemyNpcMind):
                 npc.world_entity.get_position(), player_entity.get_position()) > sprint_distance_limit
             if is_far_away:
                 npc.gain_buff_effect(get_buff_effect(BuffType.ENEMY_GOBLIN_SPEARMAN_SPRINT), Millis(2500))
-                self.sprint_cooldown_remaining = self.random_cooldown()
+                self.sprint_cooldown_remaining = self.random_cooldown(game_state.rng)
 
 
 def register_goblin_spearman_enemy():
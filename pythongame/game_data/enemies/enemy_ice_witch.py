@@ -27,8 +27,8 @@ class NpcMind(AbstractNpcMind):
     def __init__(self, global_path_finder: GlobalPathFinder):
         super().__init__(global_path_finder)
         self._base_attack_interval = 4000
-        self._attack_interval = None
-        self.randomize_attack_interval()
+        # The first attack isn't delayed by the interval anyway, so it only needs to be randomized after that
+        self._attack_interval = self._base_attack_interval
         self._time_since_attack = self._attack_interval
         self._update_path_interval = 600
         self._time_since_updated_path = self._update_path_interval
@@ -37,8 +37,8 @@ class NpcMind(AbstractNpcMind):
         self._reevaluate_next_waypoint_direction_interval = 1000
         self._time_since_reevaluated = self._reevaluate_next_waypoint_direction_interval
 
-    def randomize_attack_interval(self):
-        self._attack_interval = self._base_attack_interval + random.randint(-250, 250)
+    def randomize_attack_interval(self, rng: random.Random):
+        self._attack_interval = self._base_attack_interval + rng.randint(-250, 250)
 
     def control_npc(self, game_state: GameState, npc: NonPlayerCharacter, player_entity: WorldEntity,
                     is_player_invisible: bool, time_passed: Millis):
@@ -78,16 +78,16 @@ class NpcMind(AbstractNpcMind):
                 target_center_pos = target.entity.get_center_position()
                 if is_x_and_y_within_distance(enemy_position, target_center_pos, 200):
                     self._time_since_attack = 0
-                    self.randomize_attack_interval()
+                    self.randomize_attack_interval(game_state.rng)
                     play_sound(SoundId.ENEMY_ATTACK_ICE_WITCH)
-                    damage = random.randint(DAMAGE_MIN, DAMAGE_MAX)
+                    damage = game_state.rng.randint(DAMAGE_MIN, DAMAGE_MAX)
                     deal_npc_damage(damage, DamageType.MAGIC, game_state, enemy_entity, npc, target)
                     game_state.game_world.visual_effects += [
                         (VisualLine((100, 100, 200), enemy_position, target_center_pos, Millis(120), 3)),
                         (VisualLine((150, 150, 250), enemy_position, target_center_pos, Millis(240), 2))]
                     chance_to_resist_slow = game_state.player_state.get_effective_movement_impairing_resist_chance()
                     # TODO It's error-prone that we have to check this for every negative debuff that can slow player
-                    if random.random() > chance_to_resist_slow:
+                    if game_state.rng.random() > chance_to_resist_slow:
                         game_state.player_state.gain_buff_effect(get_buff_effect(SLOW_BUFF_TYPE), Millis(1500))
 
 
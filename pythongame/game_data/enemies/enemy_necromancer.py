@@ -25,9 +25,9 @@ class NpcMind(AbstractNpcMind):
     def __init__(self, global_path_finder: GlobalPathFinder):
         super().__init__(global_path_finder)
         self._time_since_healing = 0
-        self._healing_cooldown = self._random_healing_cooldown()
+        self._healing_cooldown = None  # Randomized on the first update, when the game's RNG is available
         self._time_since_shoot = 0
-        self._shoot_cooldown = self._random_shoot_cooldown()
+        self._shoot_cooldown = None
         self._summon_trait = EnemySummonTrait(3, [NpcType.ZOMBIE, NpcType.MUMMY], (Millis(500), Millis(5500)),
                                               create_npc)
         self._random_walk_trait = EnemyRandomWalkTrait(Millis(750))
@@ -36,6 +36,9 @@ class NpcMind(AbstractNpcMind):
                     _is_player_invisible: bool, time_passed: Millis):
         if npc.stun_status.is_stunned():
             return
+        if self._healing_cooldown is None:
+            self._healing_cooldown = self._random_healing_cooldown(game_state.rng)
+            self._shoot_cooldown = self._random_shoot_cooldown(game_state.rng)
 
         self._summon_trait.update(npc, game_state, time_passed)
         self._random_walk_trait.update(npc, game_state, time_passed)
@@ -45,7 +48,7 @@ class NpcMind(AbstractNpcMind):
 
         if self._time_since_healing > self._healing_cooldown:
             self._time_since_healing = 0
-            self._healing_cooldown = self._random_healing_cooldown()
+            self._healing_cooldown = self._random_healing_cooldown(game_state.rng)
             necro_center_pos = npc.world_entity.get_center_position()
             nearby_hurt_enemies = [
                 e for e in game_state.game_world.non_player_characters
@@ -63,7 +66,7 @@ class NpcMind(AbstractNpcMind):
 
         if self._time_since_shoot > self._shoot_cooldown:
             self._time_since_shoot = 0
-            self._shoot_cooldown = self._random_shoot_cooldown()
+            self._shoot_cooldown = self._random_shoot_cooldown(game_state.rng)
             npc.world_entity.direction = get_directions_to_position(npc.world_entity, player_entity.get_position())[0]
             npc.world_entity.set_not_moving()
             center_position = npc.world_entity.get_center_position()
@@ -79,12 +82,12 @@ class NpcMind(AbstractNpcMind):
             play_sound(SoundId.ENEMY_ATTACK_NECRO)
 
     @staticmethod
-    def _random_healing_cooldown():
-        return random.randint(1000, 9000)
+    def _random_healing_cooldown(rng: random.Random):
+        return rng.randint(1000, 9000)
 
     @staticmethod
-    def _random_shoot_cooldown():
-        return random.randint(2000, 10_000)
+    def _random_shoot_cooldown(rng: random.Random):
+        return rng.randint(2000, 10_000)
 
 
 class ProjectileController(AbstractProjectileController):
@@ -105,7 +108,7 @@ class ProjectileController(AbstractProjectileController):
             game_state.game_world.visual_effects += [head, tail]
 
     def apply_player_collision(self, game_state: GameState, projectile: Projectile):
-        damage = random.randint(self._min_damage, self._max_damage)
+        damage = game_state.rng.randint(self._min_damage, self._max_damage)
         deal_damage_to_player(game_state, damage, DamageType.MAGIC, None)
         game_state.game_world.visual_effects.append(
             VisualCircle(self._color, game_state.game_world.player_entity.get_center_position(),
@@ -113,7 +116,7 @@ class ProjectileController(AbstractProjectileController):
         projectile.has_collided_and_should_be_removed = True
 
     def apply_player_summon_collision(self, npc: NonPlayerCharacter, game_state: GameState, projectile: Projectile):
-        damage = random.randint(self._min_damage, self._max_damage)
+        damage = game_state.rng.randint(self._min_damage, self._max_damage)
         deal_npc_damage_to_npc(game_state, npc, damage)
         game_state.game_world.visual_effects.append(
             VisualCircle(self._color, npc.world_entity.get_center_position(), 25, 50, Millis(100), 0))
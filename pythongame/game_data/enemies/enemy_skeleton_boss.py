@@ -65,7 +65,7 @@ class NpcMind(MeleeEnemyNpcMind):
                 self._time_since_fired -= NpcMind.FIRE_COOLDOWN
                 directions_to_player = get_directions_to_position(npc.world_entity, player_entity.get_position())
                 new_direction = directions_to_player[0]
-                if random.random() < 0.1 and directions_to_player[1] is not None:
+                if game_state.rng.random() < 0.1 and directions_to_player[1] is not None:
                     new_direction = directions_to_player[1]
                 npc.world_entity.direction = new_direction
                 npc.world_entity.set_not_moving()
@@ -106,7 +106,7 @@ class ProjectileController(AbstractProjectileController):
             game_state.game_world.visual_effects += [head, tail]
 
     def apply_player_collision(self, game_state: GameState, projectile: Projectile):
-        damage = random.randint(self._min_damage, self._max_damage)
+        damage = game_state.rng.randint(self._min_damage, self._max_damage)
         deal_damage_to_player(game_state, damage, DamageType.MAGIC, None)
         game_state.game_world.visual_effects.append(
             VisualCircle(self._color, game_state.game_world.player_entity.get_center_position(),
@@ -114,7 +114,7 @@ class ProjectileController(AbstractProjectileController):
         projectile.has_collided_and_should_be_removed = True
 
     def apply_player_summon_collision(self, npc: NonPlayerCharacter, game_state: GameState, projectile: Projectile):
-        damage = random.randint(self._min_damage, self._max_damage)
+        damage = game_state.rng.randint(self._min_damage, self._max_damage)
         deal_npc_damage_to_npc(game_state, npc, damage)
         game_state.game_world.visual_effects.append(
             VisualCircle(self._color, npc.world_entity.get_center_position(), 25, 35, Millis(100), 0))
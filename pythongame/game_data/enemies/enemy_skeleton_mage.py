@@ -29,7 +29,7 @@ class NpcMind(AbstractNpcMind):
         super().__init__(global_path_finder)
         self._random_walk_trait = EnemyRandomWalkTrait(Millis(750))
         self._time_since_healing = 0
-        self._healing_cooldown = self._random_healing_cooldown()
+        self._healing_cooldown = None  # Randomized on the first update, when the game's RNG is available
         self._shoot_fireball_trait = EnemyShootProjectileTrait(
             create_projectile=create_projectile,
             projectile_size=PROJECTILE_SIZE,
@@ -41,12 +41,14 @@ class NpcMind(AbstractNpcMind):
                     _is_player_invisible: bool, time_passed: Millis):
         if npc.stun_status.is_stunned():
             return
+        if self._healing_cooldown is None:
+            self._healing_cooldown = self._random_healing_cooldown(game_state.rng)
         self._time_since_healing += time_passed
         if self._time_since_healing > self._healing_cooldown:
             self._time_since_healing = 0
-            self._healing_cooldown = self._random_healing_cooldown()
+            self._healing_cooldown = self._random_healing_cooldown(game_state.rng)
             if not npc.health_resource.is_at_max():
-                healing_amount = random.randint(10, 20)
+                healing_amount = game_state.rng.randint(10, 20)
                 npc.health_resource.gain(healing_amount)
                 circle_effect = VisualCircle((80, 200, 150), npc.world_entity.get_center_position(), 30, 50,
                                              Millis(350), 3)
@@ -59,8 +61,8 @@ class NpcMind(AbstractNpcMind):
         self._random_walk_trait.update(npc, game_state, time_passed)
 
     @staticmethod
-    def _random_healing_cooldown():
-        return random.randint(4000, 9000)
+    def _random_healing_cooldown(rng: random.Random):
+        return rng.randint(4000, 9000)
 
 
 class ProjectileController(AbstractProjectileController):
@@ -82,7 +84,7 @@ class ProjectileController(AbstractProjectileController):
             game_state.game_world.visual_effects += [head, tail]
 
     def apply_player_collision(self, game_state: GameState, projectile: Projectile):
-        damage = random.randint(self._min_damage, self._max_damage)
+        damage = game_state.rng.randint(self._min_damage, self._max_damage)
         deal_damage_to_player(game_state, damage, DamageType.MAGIC, None)
         game_state.game_world.visual_effects.append(
             VisualCircle(self._color, game_state.game_world.player_entity.get_center_position(),
@@ -90,7 +92,7 @@ class ProjectileController(AbstractProjectileController):
         projectile.has_collided_and_should_be_removed = True
 
     def apply_player_summon_collision(self, npc: NonPlayerCharacter, game_state: GameState, projectile: Projectile):
-        damage = random.randint(self._min_damage, self._max_damage)
+        damage = game_state.rng.randint(self._min_damage, self._max_damage)
         deal_npc_damage_to_npc(game_state, npc, damage)
         game_state.game_world.visual_effects.append(
             VisualCircle(self._color, npc.world_entity.get_center_position(), 25, 35, Millis(100), 0))
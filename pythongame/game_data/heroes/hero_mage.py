@@ -1,3 +1,5 @@
+import random
+
 from pythongame.core.common import HeroId, PortraitIconSprite, PLAYER_ENTITY_SIZE, HeroUpgradeId, UiIconSprite, \
     ItemType
 from pythongame.core.game_data import Sprite, Direction, AbilityType, register_entity_sprite_map, \
@@ -103,4 +105,4 @@ def _get_initial_player_state_mage() -> InitialPlayerStateData:
     block_chance = 0.1
     return InitialPlayerStateData(
         health, mana, mana_regen, consumable_slots, abilities, new_level_abilities, HERO_ID, armor, dodge_chance,
-        level_bonus, talents_state, block_chance, [randomized_item_id(ItemType.NOVICE_WAND)])
+        level_bonus, talents_state, block_chance, [randomized_item_id(ItemType.NOVICE_WAND, random)])
@@ -1,3 +1,5 @@
+import random
+
 from pythongame.core.buff_effects import register_buff_effect, StatModifyingBuffEffect, get_buff_effect
 from pythongame.core.common import HeroId, PortraitIconSprite, PLAYER_ENTITY_SIZE, HeroUpgradeId, UiIconSprite, \
     ItemType, \
@@ -137,5 +139,5 @@ def _get_initial_player_state_warrior() -> InitialPlayerStateData:
     block_chance = 0.2
     return InitialPlayerStateData(
         health, mana, mana_regen, consumable_slots, abilities, new_level_abilities, HERO_ID, armor, dodge_chance,
-        level_bonus, talents_state, block_chance, [randomized_item_id(ItemType.PRACTICE_SWORD),
-                                                   randomized_item_id(ItemType.WOODEN_SHIELD)])
+        level_bonus, talents_state, block_chance, [randomized_item_id(ItemType.PRACTICE_SWORD, random),
+                                                   randomized_item_id(ItemType.WOODEN_SHIELD, random)])
@@ -1,5 +1,3 @@
-import random
-
 from pythongame.core.buff_effects import get_buff_effect, StatModifyingBuffEffect, register_buff_effect
 from pythongame.core.common import ItemType, Sprite, StatModifierInterval, HeroStat, Millis, BuffType
 from pythongame.core.damage_interactions import player_receive_healing
@@ -23,7 +21,7 @@ class ItemEffect(AbstractItemEffect):
 
     def item_handle_event(self, event: Event, game_state: GameState):
         if isinstance(event, EnemyDiedEvent):
-            if random.random() < PROC_CHANCE:
+            if game_state.rng.random() < PROC_CHANCE:
                 game_state.player_state.gain_buff_effect(get_buff_effect(BUFF_TYPE), DURATION)
                 player_receive_healing(HEALTH_ON_KILL_AMOUNT, game_state)
 
@@ -1,5 +1,3 @@
-import random
-
 from pythongame.core.buff_effects import get_buff_effect, register_buff_effect, AbstractBuffEffect
 from pythongame.core.common import ItemType, Sprite, UiIconSprite, HeroStat, BuffType, Millis, PeriodicTimer, \
     StatModifierInterval
@@ -25,7 +23,7 @@ class ItemEffect(AbstractItemEffect):
     def item_handle_event(self, event: Event, game_state: GameState):
         if isinstance(event, PlayerDamagedEnemy):
             if event.damage_source != DAMAGE_SOURCE:  # the bleed shouldn't trigger new bleeds
-                if random.random() < PROC_CHANCE:
+                if game_state.rng.random() < PROC_CHANCE:
                     event.enemy_npc.gain_buff_effect(get_buff_effect(BUFF_TYPE), BUFF_DURATION)
 
 
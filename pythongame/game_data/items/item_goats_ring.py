@@ -1,5 +1,3 @@
-import random
-
 from pythongame.core.buff_effects import get_buff_effect, register_buff_effect, AbstractBuffEffect
 from pythongame.core.common import ItemType, Sprite, BuffType, Millis, PeriodicTimer
 from pythongame.core.damage_interactions import deal_player_damage_to_enemy, DamageType
@@ -28,7 +26,7 @@ class ItemEffect(AbstractItemEffect):
 
     def item_handle_event(self, event: Event, game_state: GameState):
         if isinstance(event, PlayerDamagedEnemy):
-            if random.random() < self._proc_chance:
+            if game_state.rng.random() < self._proc_chance:
                 # Compare "source" to prevent the debuff from renewing itself indefinitely
                 if event.damage_source != DAMAGE_SOURCE:
                     event.enemy_npc.gain_buff_effect(get_buff_effect(BUFF_TYPE), DURATION)
@@ -1,5 +1,3 @@
-import random
-
 from pythongame.core.abilities import AbilityData, register_ability_data
 from pythongame.core.ability_effects import AbilityResult, AbilityWasUsedSuccessfully, register_ability_effect
 from pythongame.core.common import ItemType, Millis, Sprite, UiIconSprite, PeriodicTimer, AbilityType
@@ -25,7 +23,7 @@ def strike_enemies(game_state: GameState, num_enemies: int):
     close_enemies = game_state.game_world.get_enemies_within_x_y_distance_of(140, player_center_position)
     # TODO: sound effect
     for enemy in close_enemies[0: num_enemies]:
-        damage_amount: float = MIN_DMG + random.random() * (MAX_DMG - MIN_DMG)
+        damage_amount: float = MIN_DMG + game_state.rng.random() * (MAX_DMG - MIN_DMG)
         deal_player_damage_to_enemy(game_state, enemy, damage_amount, DamageType.MAGIC)
         enemy_center_position = enemy.world_entity.get_center_position()
         game_state.game_world.visual_effects.append(
@@ -1,5 +1,3 @@
-import random
-
 from pythongame.core.buff_effects import register_buff_effect, get_buff_effect, \
     StatModifyingBuffEffect
 from pythongame.core.common import ItemType, Sprite, Millis, PeriodicTimer, BuffType, HeroStat
@@ -21,7 +19,7 @@ class ItemEffect(AbstractItemEffect):
 
     def item_handle_event(self, event: Event, game_state: GameState):
         if isinstance(event, EnemyDiedEvent):
-            if random.random() < PROC_CHANCE:
+            if game_state.rng.random() < PROC_CHANCE:
                 game_state.player_state.gain_buff_effect(get_buff_effect(BUFF_TYPE), BUFF_DURATION)
 
 
@@ -20,10 +20,10 @@ class NpcMind(AbstractNpcMind):
     def control_npc(self, game_state: GameState, npc: NonPlayerCharacter, player_entity: WorldEntity,
                     is_player_invisible: bool, time_passed: Millis):
         if self.timer.update_and_check_if_ready(time_passed):
-            if random.random() < 0.8:
+            if game_state.rng.random() < 0.8:
                 npc.world_entity.set_not_moving()
             else:
-                direction = random.choice(get_all_directions())
+                direction = game_state.rng.choice(get_all_directions())
                 npc.world_entity.set_moving_in_dir(direction)
 
 
@@ -37,11 +37,11 @@ def register_challenge_starter_npc():
     register_npc_behavior(npc_type, NpcMind)
 
     dialog_options = [
-        buy_item_option(randomized_item_id(ItemType.GLADIATOR_ARMOR), 20),
-        buy_item_option(randomized_item_id(ItemType.HEALING_WAND), 20),
-        buy_item_option(randomized_item_id(ItemType.ZULS_AEGIS), 20),
-        buy_item_option(randomized_item_id(ItemType.WARLOCKS_COWL), 20),
-        buy_item_option(randomized_item_id(ItemType.DRUIDS_RING), 20),
+        buy_item_option(randomized_item_id(ItemType.GLADIATOR_ARMOR, random), 20),
+        buy_item_option(randomized_item_id(ItemType.HEALING_WAND, random), 20),
+        buy_item_option(randomized_item_id(ItemType.ZULS_AEGIS, random), 20),
+        buy_item_option(randomized_item_id(ItemType.WARLOCKS_COWL, random), 20),
+        buy_item_option(randomized_item_id(ItemType.DRUIDS_RING, random), 20),
         DialogOptionData("\"Good bye\"", "cancel", None)]
     dialog_text_body = "Choose wisely."
     dialog_data = DialogData("Vendor", portrait_icon_sprite, dialog_text_body, dialog_options)
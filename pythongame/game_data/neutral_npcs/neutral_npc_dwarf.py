@@ -62,5 +62,5 @@ def register_dwarf_npc():
                           "deal!",
         dialog_during_quest="Hey! Any luck with the orb?",
         dialog_after_completed="Hi old friend! Got any more good stuff?",
-        reward_item_id=lambda _: random_item_two_affixes(5)
+        reward_item_id=lambda game_state: random_item_two_affixes(5, game_state.rng)
     )
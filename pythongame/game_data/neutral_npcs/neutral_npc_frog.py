@@ -23,10 +23,10 @@ class NpcMind(AbstractNpcMind):
     def control_npc(self, game_state: GameState, npc: NonPlayerCharacter, player_entity: WorldEntity,
                     is_player_invisible: bool, time_passed: Millis):
         if self.timer.update_and_check_if_ready(time_passed):
-            if random.random() < 0.8:
+            if game_state.rng.random() < 0.8:
                 npc.world_entity.set_not_moving()
             else:
-                direction = random.choice(get_all_directions())
+                direction = game_state.rng.choice(get_all_directions())
                 npc.world_entity.set_moving_in_dir(direction)
 
 
@@ -62,10 +62,10 @@ def _register_dialog():
         portrait_icon_sprite=UI_ICON_SPRITE,
         text_body="Ribbit! I mean hi! I have been cursed! Once I was a wealthy salesman, but now I have to "
                   "hide out here. Please help a poor frog by buying some of my goods?",
-        options=[buy_item_option(random_item_one_affix(4), 15),
-                 buy_item_option(random_item_one_affix(5), 25),
-                 buy_item_option(random_item_one_affix(6), 35),
-                 buy_item_option(random_item_one_affix(7), 50),
+        options=[buy_item_option(random_item_one_affix(4, random), 15),
+                 buy_item_option(random_item_one_affix(5, random), 25),
+                 buy_item_option(random_item_one_affix(6, random), 35),
+                 buy_item_option(random_item_one_affix(7, random), 50),
                  bye_option],
     )
 
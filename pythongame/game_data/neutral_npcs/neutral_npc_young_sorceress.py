@@ -25,13 +25,13 @@ class NpcMind(QuestGiverNpcMind):
 def _get_reward_for_hero(game_state: GameState) -> ItemId:
     hero_id = game_state.player_state.hero_id
     if hero_id == HeroId.MAGE:
-        return randomized_item_id(ItemType.STAFF_OF_FIRE)
+        return randomized_item_id(ItemType.STAFF_OF_FIRE, game_state.rng)
     elif hero_id == HeroId.ROGUE:
-        return randomized_item_id(ItemType.THIEFS_MASK)
+        return randomized_item_id(ItemType.THIEFS_MASK, game_state.rng)
     elif hero_id == HeroId.WARRIOR:
-        return randomized_item_id(ItemType.CLEAVER)
+        return randomized_item_id(ItemType.CLEAVER, game_state.rng)
     else:
-        return randomized_item_id(ItemType.LEATHER_ARMOR)
+        return randomized_item_id(ItemType.LEATHER_ARMOR, game_state.rng)
 
 
 def register_young_sorceress_npc():
@@ -75,8 +75,8 @@ def _register_buff(buff_type: BuffType, buff_class: Type[AbstractBuffEffect], bu
     register_buff_text(buff_type, buff_text)
 
 
-def _get_random() -> Tuple[AbstractBuffEffect, str]:
-    return random.choice(
+def _get_random(rng: random.Random) -> Tuple[AbstractBuffEffect, str]:
+    return rng.choice(
         [
             (get_buff_effect(BUFF_DAMAGE), "You feel powerful! (Damage increased)"),
             (get_buff_effect(BUFF_ARMOR), "You feel protected! (Armor increased)"),
@@ -86,7 +86,7 @@ def _get_random() -> Tuple[AbstractBuffEffect, str]:
     )
 
 
-def apply_shrine_buff_to_player(player_state: PlayerState):
-    buff_effect, text = _get_random()
+def apply_shrine_buff_to_player(player_state: PlayerState, rng: random.Random):
+    buff_effect, text = _get_random(rng)
     player_state.gain_buff_effect(buff_effect, SHRINE_BUFF_DURATION)
     return text
@@ -0,0 +1,171 @@
+import random
+import time
+from typing import Optional, List, Any
+
+from pythongame.core import global_path_finder
+from pythongame.core import sound_player
+from pythongame.core.buff_effects import get_buff_effect
+from pythongame.core.common import HeroId, Millis, EngineEvent, BuffType, ConsumableType
+from pythongame.core.entity_creation import create_hero_world_entity, create_player_state_as_initial
+from pythongame.core.game_data import HEROES
+from pythongame.core.game_state import GameState, LootableOnGround, Portal, WarpPoint, Chest, Shrine
+from pythongame.core.global_path_finder import init_global_path_finder
+from pythongame.core.pathfinding.npc_pathfinding import get_agent_cell_size
+from pythongame.core.user_input import ActionTryUseAbility, ActionTryUsePotion, ActionMoveInDirection, \
+    ActionStopMoving, ActionPressSpaceKey
+from pythongame.core.world_snapshot import get_world_snapshot, update_world_snapshot
+from pythongame.input_recording import InputRecording, load_recording_from_file, \
+    PATH_REQUESTS_PER_FRAME_WHEN_DETERMINISTIC
+from pythongame.map_file import load_map_from_file
+from pythongame.register_game_data import register_all_game_data
+from pythongame.scenes.scenes_game.game_engine import GameEngine
+from pythongame.scenes.scenes_game.game_ui_view import InfoMessage
+from pythongame.scenes.scenes_game.player_environment_interactions import PlayerInteractionsState
+
+CAMERA_SIZE = (800, 430)  # Same as in the game. NPC's only act when they are close to the camera.
+
+register_all_game_data()
+
+
+class HeadlessRunStats:
+    def __init__(self, num_ticks: int, tick_duration: Millis, wall_clock_seconds: float, num_npcs: int,
+                 engine_events: List[EngineEvent]):
+        self.num_ticks = num_ticks
+        self.tick_duration = tick_duration
+        self.wall_clock_seconds = wall_clock_seconds
+        self.num_npcs = num_npcs
+        self.engine_events = engine_events
+
+    def ticks_per_second(self) -> float:
+        return self.num_ticks / self.wall_clock_seconds if self.wall_clock_seconds > 0 else float('inf')
+
+    def realtime_factor(self) -> float:
+        # How many times faster than real-time the simulation ran
+        return self.ticks_per_second() * self.tick_duration / 1000
+
+
+# Runs the game engine without a window, sounds, UI or rendering, with a fixed time step per tick. This is useful for
+# measuring the performance of the simulation itself.
+class HeadlessRunner:
+
+    def __init__(self, map_file_path: str, hero_id: HeroId, rng: Optional[random.Random] = None):
+        sound_player.muted = True
+
+        # NPC's share a "global path finder" that needs to be initialized before we start creating NPCs.
+        path_finder = init_global_path_finder()
+        map_data = load_map_from_file(map_file_path)
+        world_snapshot = get_world_snapshot(map_data.source_hash)
+        game_world = map_data.game_world
+        game_world.player_entity = create_hero_world_entity(hero_id, map_data.player_position)
+        enabled_portals = {portal.portal_id: portal.world_entity.sprite for portal in game_world.portals
+                           if portal.is_enabled}
+        self.game_state = GameState(game_world=game_world,
+                                    camera_size=CAMERA_SIZE,
+                                    player_state=create_player_state_as_initial(hero_id, enabled_portals),
+                                    is_dungeon=False,
+                                    player_spawn_position=map_data.player_position,
+                                    rng=rng,
+                                    pathfinder_clearance=world_snapshot.pathfinder_clearance)
+        path_finder.set_clearance_map(self.game_state.pathfinder_clearance_map, world_snapshot.abstract_graph_edges)
+        path_finder.precompute_for_entity_sizes(
+            list({get_agent_cell_size(npc.world_entity) for npc in game_world.non_player_characters}))
+        update_world_snapshot(world_snapshot, self.game_state.pathfinder_clearance_map, path_finder)
+        self.game_state.center_camera_on_player()
+
+        self.game_engine = GameEngine(self.game_state, InfoMessage())
+        self.game_engine.on_abilities_updated()
+        self.player_interactions_state = PlayerInteractionsState()
+
+    def run(self, num_ticks: int, tick_duration: Millis) -> HeadlessRunStats:
+        engine_events = []
+        start_time = time.perf_counter()
+        for _ in range(num_ticks):
+            engine_events += self.game_engine.run_one_frame(tick_duration)
+        wall_clock_seconds = time.perf_counter() - start_time
+        return HeadlessRunStats(num_ticks, tick_duration, wall_clock_seconds,
+                                len(self.game_state.game_world.non_player_characters), engine_events)
+
+    # Plays back the input from a recording, tick by tick, in the same order as the game handles it (see PlayingScene)
+    def run_recording(self, recording: InputRecording) -> HeadlessRunStats:
+        engine_events = []
+        game_time = 0
+        start_time = time.perf_counter()
+        for tick in recording.ticks:
+            for action in tick.actions:
+                self._handle_action(action)
+            self.player_interactions_state.handle_nearby_entities(
+                self.game_state.game_world.player_entity, self.game_state, self.game_engine)
+            engine_events += self.game_engine.run_one_frame(tick.time_passed)
+            game_time += tick.time_passed
+        wall_clock_seconds = time.perf_counter() - start_time
+        num_ticks = len(recording.ticks)
+        average_tick_duration = Millis(game_time // num_ticks if num_ticks else 0)
+        return HeadlessRunStats(num_ticks, average_tick_duration, wall_clock_seconds,
+                                len(self.game_state.game_world.non_player_characters), engine_events)
+
+    def _handle_action(self, action: Any):
+        if isinstance(action, ActionTryUseAbility):
+            self.game_engine.try_use_ability(action.ability_type)
+        elif isinstance(action, ActionTryUsePotion):
+            self.game_engine.try_use_consumable(action.slot_number)
+        elif isinstance(action, ActionMoveInDirection):
+            self.game_engine.move_in_direction(action.direction)
+        elif isinstance(action, ActionStopMoving):
+            self.game_engine.stop_moving()
+        elif isinstance(action, ActionPressSpaceKey):
+            # Only the interactions that don't open a dialog or change the world can be replayed
+            ready_entity = self.player_interactions_state.get_entity_to_interact_with()
+            if isinstance(ready_entity, LootableOnGround):
+                self.game_engine.try_pick_up_loot_from_ground(ready_entity)
+            elif isinstance(ready_entity, Portal):
+                self.game_engine.interact_with_portal(ready_entity)
+            elif isinstance(ready_entity, WarpPoint):
+                self.game_engine.use_warp_point(ready_entity)
+            elif isinstance(ready_entity, Chest):
+                self.game_engine.open_chest(ready_entity)
+            elif isinstance(ready_entity, Shrine):
+                self.game_engine.interact_with_shrine(ready_entity)
+        else:
+            raise Exception("Unhandled action: " + str(action))
+
+
+# Sets up the game the same way as it's done for a new character in the story mode, which is where recordings are made
+def create_runner_for_recording(recording: InputRecording) -> HeadlessRunner:
+    global_path_finder.max_path_requests_per_frame = PATH_REQUESTS_PER_FRAME_WHEN_DETERMINISTIC
+    runner = HeadlessRunner(recording.map_file_path, recording.hero_id, random.Random(recording.seed))
+    game_engine = runner.game_engine
+    player_state = runner.game_state.player_state
+    if recording.hero_start_level > 1:
+        game_engine.gain_levels(recording.hero_start_level - 1)
+    if recording.start_money > 0:
+        player_state.modify_money(recording.start_money)
+    player_state.gain_buff_effect(get_buff_effect(BuffType.BEING_SPAWNED), Millis(1000))
+    player_state.consumable_inventory.add_consumable(ConsumableType.HEALTH_LESSER)
+    player_state.consumable_inventory.add_consumable(ConsumableType.MANA_LESSER)
+    for item_id in HEROES[recording.hero_id].initial_player_state.starting_items:
+        game_engine.try_add_item_to_inventory(item_id)
+    return runner
+
+
+def main(map_file_name: Optional[str], hero_id: Optional[str], num_ticks: int, tick_duration: Millis,
+         seed: Optional[int], replay_file_name: Optional[str]):
+    if replay_file_name:
+        recording = load_recording_from_file(replay_file_name)
+        map_file_path = recording.map_file_path
+        runner = create_runner_for_recording(recording)
+        stats = runner.run_recording(recording)
+        print("Replayed: %s (seed: %i)" % (replay_file_name, recording.seed))
+    else:
+        map_file_path = "resources/maps/" + (map_file_name or "map1.json")
+        rng = random.Random(seed) if seed is not None else None
+        runner = HeadlessRunner(map_file_path, HeroId[hero_id] if hero_id else HeroId.MAGE, rng)
+        stats = runner.run(num_ticks, tick_duration)
+    print("Map: %s" % map_file_path)
+    print("Ticks: %i x %ims (%.1fs of game time)" % (stats.num_ticks, stats.tick_duration,
+                                                    stats.num_ticks * stats.tick_duration / 1000))
+    print("Wall clock time: %.2fs" % stats.wall_clock_seconds)
+    print("Ticks per second: %.1f (%.1fx real-time)" % (stats.ticks_per_second(), stats.realtime_factor()))
+    print("NPCs remaining: %i" % stats.num_npcs)
+    player_state = runner.game_state.player_state
+    print("Player: level %i, %i exp, %i money, %i health" % (
+        player_state.level, player_state.exp, player_state.money, player_state.health_resource.value))
@@ -0,0 +1,147 @@
+import json
+from typing import Any, Dict, List, Optional
+
+from pythongame.core.common import AbilityType, Direction, HeroId, Millis
+from pythongame.core.user_input import ActionTryUseAbility, ActionTryUsePotion, ActionMoveInDirection, \
+    ActionStopMoving, ActionPressSpaceKey
+
+# While recording or replaying, path requests are limited per frame by count rather than by time. Otherwise the
+# simulation would depend on how fast the machine happens to be.
+PATH_REQUESTS_PER_FRAME_WHEN_DETERMINISTIC = 2
+
+
+# A recording of the player's input while playing, that can be replayed headlessly (see headless_runner.py). Together
+# with the seed of the game's RNG, this is enough to reproduce the same game. Only the actions that go to the game
+# engine are recorded. Dialogs and other UI interactions (dragging items, etc) are not part of a recording, and the
+# recording stops when the player leaves the world that the game was started in.
+class InputRecording:
+    def __init__(self, seed: int, map_file_path: str, hero_id: HeroId, hero_start_level: int, start_money: int,
+                 ticks: List['RecordedTick']):
+        self.seed = seed
+        self.map_file_path = map_file_path
+        self.hero_id = hero_id
+        self.hero_start_level = hero_start_level
+        self.start_money = start_money
+        self.ticks = ticks
+
+
+class RecordedTick:
+    def __init__(self, time_passed: Millis, actions: List[Any]):
+        self.time_passed = time_passed
+        self.actions = actions
+
+
+class InputRecordingJson:
+    @staticmethod
+    def serialize(recording: InputRecording):
+        return {
+            "seed": recording.seed,
+            "map": recording.map_file_path,
+            "hero": recording.hero_id.name,
+            "hero_start_level": recording.hero_start_level,
+            "start_money": recording.start_money,
+            "ticks": [[tick.time_passed, [_serialize_action(action) for action in tick.actions]]
+                      for tick in recording.ticks]
+        }
+
+    @staticmethod
+    def deserialize(data) -> InputRecording:
+        return InputRecording(
+            data["seed"],
+            data["map"],
+            HeroId[data["hero"]],
+            data.get("hero_start_level", 1),
+            data.get("start_money", 0),
+            [RecordedTick(Millis(time_passed), [_deserialize_action(action) for action in actions])
+             for (time_passed, actions) in data["ticks"]]
+        )
+
+
+def save_recording_to_file(recording: InputRecording, file_path: str):
+    with open(file_path, 'w') as file:
+        file.write(json.dumps(InputRecordingJson.serialize(recording)))
+
+
+def load_recording_from_file(file_path: str) -> InputRecording:
+    with open(file_path) as file:
+        return InputRecordingJson.deserialize(json.loads(file.read()))
+
+
+def is_action_recorded(action: Any) -> bool:
+    return isinstance(action, (ActionTryUseAbility, ActionTryUsePotion, ActionMoveInDirection, ActionStopMoving,
+                               ActionPressSpaceKey))
+
+
+def _serialize_action(action: Any) -> Dict[str, Any]:
+    if isinstance(action, ActionTryUseAbility):
+        return {"type": "ability", "ability": action.ability_type.name}
+    elif isinstance(action, ActionTryUsePotion):
+        return {"type": "potion", "slot": action.slot_number}
+    elif isinstance(action, ActionMoveInDirection):
+        return {"type": "move", "direction": action.direction.name}
+    elif isinstance(action, ActionStopMoving):
+        return {"type": "stop"}
+    elif isinstance(action, ActionPressSpaceKey):
+        return {"type": "interact"}
+    raise Exception("Unhandled action: " + str(action))
+
+
+def _deserialize_action(data: Dict[str, Any]) -> Any:
+    action_type = data["type"]
+    if action_type == "ability":
+        return ActionTryUseAbility(AbilityType[data["ability"]])
+    elif action_type == "potion":
+        return ActionTryUsePotion(data["slot"])
+    elif action_type == "move":
+        return ActionMoveInDirection(Direction[data["direction"]])
+    elif action_type == "stop":
+        return ActionStopMoving()
+    elif action_type == "interact":
+        return ActionPressSpaceKey()
+    raise Exception("Unhandled action type: " + str(action_type))
+
+
+class InputRecorder:
+    def __init__(self, file_path: str, seed: int):
+        self.file_path = file_path
+        self.seed = seed
+        self._recording: Optional[InputRecording] = None
+        self._actions_in_current_tick: List[Any] = []
+
+    def start(self, map_file_path: str, hero_id: HeroId, hero_start_level: int, start_money: int):
+        self._recording = InputRecording(self.seed, map_file_path, hero_id, hero_start_level, start_money, [])
+        self._actions_in_current_tick = []
+        print("Recording input to " + self.file_path + " (seed: " + str(self.seed) + ")")
+
+    def is_recording(self) -> bool:
+        return self._recording is not None
+
+    def record_actions(self, actions: List[Any]):
+        if self._recording:
+            self._actions_in_current_tick += [action for action in actions if is_action_recorded(action)]
+
+    # Actions that were handled before the game engine was run with the given time, belong to the same tick
+    def end_tick(self, time_passed: Millis):
+        if self._recording:
+            self._recording.ticks.append(RecordedTick(time_passed, self._actions_in_current_tick))
+            self._actions_in_current_tick = []
+
+    def stop(self):
+        if self._recording:
+            save_recording_to_file(self._recording, self.file_path)
+            print("Saved input recording (%i ticks) to %s" % (len(self._recording.ticks), self.file_path))
+            self._recording = None
+
+
+# Like the sound player, the recorder is set up once when the program starts (if the user asked for a recording)
+input_recorder: Optional[InputRecorder] = None
+
+
+def init_input_recorder(file_path: str, seed: int) -> InputRecorder:
+    global input_recorder
+    input_recorder = InputRecorder(file_path, seed)
+    return input_recorder
+
+
+def get_input_recorder() -> Optional[InputRecorder]:
+    return input_recorder
@@ -1,16 +1,21 @@
+import random
 import sys
 from typing import Optional, List, Any, Tuple, Callable
 
 import pygame
 
+from pythongame.core import global_path_finder
+from pythongame.core.asset_loader import AssetLoader
 from pythongame.core.common import Millis, SceneTransition, AbstractScene, AbstractWorldBehavior
 from pythongame.core.game_data import ENTITY_SPRITE_INITIALIZERS, \
     UI_ICON_SPRITE_PATHS, PORTRAIT_ICON_SPRITE_PATHS
 from pythongame.core.game_state import GameState
-from pythongame.core.sound_player import init_sound_player
+from pythongame.core.sound_player import init_sound_player, start_decoding_sound_files
 from pythongame.core.view.game_world_view import GameWorldView
-from pythongame.core.view.image_loading import load_images_by_sprite, \
-    load_images_by_ui_sprite, load_images_by_portrait_sprite
+from pythongame.core.view.image_loading import LazyImagesBySprite, start_loading_images_by_ui_sprite, \
+    start_loading_images_by_portrait_sprite, SPRITE_IMAGES_MAX_NUM_BYTES
+from pythongame.input_recording import init_input_recorder, get_input_recorder, \
+    PATH_REQUESTS_PER_FRAME_WHEN_DETERMINISTIC
 from pythongame.player_file import SaveFileHandler
 from pythongame.register_game_data import register_all_game_data
 from pythongame.scenes.scene_challenge_complete_screen.scene_challenge_complete_screen import \
@@ -86,39 +91,63 @@ class SceneFactory(AbstractSceneFactory):
 
 class Main:
     def __init__(self, map_file_name: Optional[str], chosen_hero_id: Optional[str], hero_start_level: Optional[int],
-                 start_money: Optional[int], save_file_name: Optional[str]):
+                 start_money: Optional[int], save_file_name: Optional[str], record_file_name: Optional[str],
+                 seed: Optional[int]):
 
         cmd_flags = CommandlineFlags(map_file_name, chosen_hero_id, hero_start_level, start_money, save_file_name)
 
+        if record_file_name:
+            init_input_recorder(record_file_name, seed if seed is not None else random.randrange(2 ** 32))
+            global_path_finder.max_path_requests_per_frame = PATH_REQUESTS_PER_FRAME_WHEN_DETERMINISTIC
+
         pygame.init()
 
         print("Available display modes: " + str(pygame.display.list_modes()))
 
         self.fullscreen = False  # TODO
         self.pygame_screen = self.setup_screen()
-        images_by_sprite = load_images_by_sprite(ENTITY_SPRITE_INITIALIZERS)
-        images_by_ui_sprite = load_images_by_ui_sprite(UI_ICON_SPRITE_PATHS, UI_ICON_SIZE)
-        big_images_by_ui_sprite = load_images_by_ui_sprite(UI_ICON_SPRITE_PATHS, UI_ICON_BIG_SIZE)
-        self.images_by_portrait_sprite = load_images_by_portrait_sprite(PORTRAIT_ICON_SPRITE_PATHS, PORTRAIT_ICON_SIZE)
+        self.is_entire_screen_outdated = True
+        self.save_file_handler = SaveFileHandler()
+        self.clock = pygame.time.Clock()
+
+        # Image and sound files are decoded in the background, while the starting scene shows the progress. The views
+        # and the scene factory are created once the files are loaded.
+        self.asset_loader = AssetLoader()
+        self.finish_loading_ui_icons = start_loading_images_by_ui_sprite(
+            self.asset_loader, UI_ICON_SPRITE_PATHS, UI_ICON_SIZE)
+        self.finish_loading_big_ui_icons = start_loading_images_by_ui_sprite(
+            self.asset_loader, UI_ICON_SPRITE_PATHS, UI_ICON_BIG_SIZE)
+        self.finish_loading_portraits = start_loading_images_by_portrait_sprite(
+            self.asset_loader, PORTRAIT_ICON_SPRITE_PATHS, PORTRAIT_ICON_SIZE)
+        self.decoded_sounds = start_decoding_sound_files(self.asset_loader)
+        self.world_view: Optional[GameWorldView] = None
+        self.ui_view: Optional[GameUiView] = None
+
+        self.scene: AbstractScene = StartingProgramScene(
+            self.pygame_screen, self.asset_loader, self.on_assets_loaded, cmd_flags, self.save_file_handler)
+
+    def on_assets_loaded(self) -> AbstractSceneFactory:
+        self.asset_loader.shutdown()
+        images_by_sprite = LazyImagesBySprite(ENTITY_SPRITE_INITIALIZERS, SPRITE_IMAGES_MAX_NUM_BYTES)
+        images_by_ui_sprite = self.finish_loading_ui_icons()
+        big_images_by_ui_sprite = self.finish_loading_big_ui_icons()
+        images_by_portrait_sprite = self.finish_loading_portraits()
         self.world_view = GameWorldView(self.pygame_screen, CAMERA_SIZE, SCREEN_SIZE, images_by_sprite)
         self.ui_view = GameUiView(
             self.pygame_screen, CAMERA_SIZE, SCREEN_SIZE, images_by_ui_sprite,
-            big_images_by_ui_sprite, self.images_by_portrait_sprite, ABILITY_KEY_LABELS)
+            big_images_by_ui_sprite, images_by_portrait_sprite, ABILITY_KEY_LABELS)
         self.ui_view.on_fullscreen_changed(self.fullscreen)
-        self.save_file_handler = SaveFileHandler()
-        init_sound_player()
-        self.clock = pygame.time.Clock()
-
-        self.scene_factory = SceneFactory(self.pygame_screen, self.images_by_portrait_sprite, self.save_file_handler,
-                                          self.ui_view, self.world_view, self.toggle_fullscreen, CAMERA_SIZE)
-
-        self.scene: AbstractScene = StartingProgramScene(self.scene_factory, cmd_flags, self.save_file_handler)
+        init_sound_player(self.decoded_sounds)
+        return SceneFactory(self.pygame_screen, images_by_portrait_sprite, self.save_file_handler, self.ui_view,
+                            self.world_view, self.toggle_fullscreen, CAMERA_SIZE)
 
     def main_loop(self):
         try:
             self._main_loop()
         except Exception as e:
             print("Game crashed with an unexpected error! %s" % e)
+            if get_input_recorder():
+                get_input_recorder().stop()
             if hasattr(self.scene, 'game_state'):
                 game_state: GameState = getattr(self.scene, 'game_state', None)
                 print("Saving character to file as backup...")
@@ -132,7 +161,8 @@ class Main:
             self.clock.tick()
             time_passed = Millis(self.clock.get_time())
             fps_string = str(int(self.clock.get_fps()))
-            self.ui_view.update_fps_string(fps_string)
+            if self.ui_view:
+                self.ui_view.update_fps_string(fps_string)
 
             input_events: List[Any] = pygame.event.get()
             for event in input_events:
@@ -140,7 +170,8 @@ class Main:
                     self.quit_game()
                 elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE and self.fullscreen:
                     self.toggle_fullscreen()
-                    self.ui_view.on_fullscreen_changed(self.fullscreen)
+                    if self.ui_view:
+                        self.ui_view.on_fullscreen_changed(self.fullscreen)
 
             transition: Optional[SceneTransition] = self.scene.handle_user_input(input_events)
             if transition:
@@ -152,12 +183,17 @@ class Main:
                 self.change_scene(transition)
                 continue
 
-            self.scene.render()
-            pygame.display.update()
+            updated_screen_rects = self.scene.render()
+            if updated_screen_rects is None or self.is_entire_screen_outdated:
+                pygame.display.update()
+                self.is_entire_screen_outdated = False
+            else:
+                pygame.display.update(updated_screen_rects)
 
     def toggle_fullscreen(self):
         self.fullscreen = not self.fullscreen
         self.pygame_screen = self.setup_screen()
+        self.is_entire_screen_outdated = True
 
     def setup_screen(self):
         flags = pygame.DOUBLEBUF
@@ -167,15 +203,20 @@ class Main:
 
     @staticmethod
     def quit_game():
+        if get_input_recorder():
+            get_input_recorder().stop()
         pygame.quit()
         sys.exit()
 
     def change_scene(self, scene_transition: SceneTransition):
         self.scene = scene_transition.scene
         self.scene.on_enter()
+        # Scenes only report what they have changed themselves
+        self.is_entire_screen_outdated = True
 
 
 def start(map_file_name: Optional[str], chosen_hero_id: Optional[str], hero_start_level: Optional[int],
-          start_money: Optional[int], save_file_name: Optional[str]):
-    main = Main(map_file_name, chosen_hero_id, hero_start_level, start_money, save_file_name)
+          start_money: Optional[int], save_file_name: Optional[str], record_file_name: Optional[str] = None,
+          seed: Optional[int] = None):
+    main = Main(map_file_name, chosen_hero_id, hero_start_level, start_money, save_file_name, record_file_name, seed)
     main.main_loop()
@@ -17,15 +17,15 @@ from pythongame.core.game_state import GameState, NonPlayerCharacter, GameWorldS
 from pythongame.core.item_data import randomized_item_id
 from pythongame.core.math import sum_of_vectors
 from pythongame.core.view.game_world_view import GameWorldView
-from pythongame.core.view.image_loading import load_images_by_sprite, load_images_by_ui_sprite, \
-    load_images_by_portrait_sprite
+from pythongame.core.view.image_loading import LazyImagesBySprite, load_images_by_ui_sprite, \
+    load_images_by_portrait_sprite, SPRITE_IMAGES_MAX_NUM_BYTES
 from pythongame.dungeon_generator import DungeonGenerator, Grid
 from pythongame.map_editor.map_editor_ui_view import MapEditorView, PORTRAIT_ICON_SIZE, MAP_EDITOR_UI_ICON_SIZE, \
     EntityTab, GenerateRandomMap, SetCameraPosition, AddEntity, DeleteEntities, DeleteDecorations, MapEditorAction, \
     SaveMap, ToggleOutlines, AddSmartFloorTiles, DeleteSmartFloorTiles
 from pythongame.map_editor.map_editor_world_entity import MapEditorWorldEntity
 from pythongame.map_file import save_map_to_json_file, load_map_from_json_file, create_map_from_json, MapData, \
-    MapEditorConfig
+    MapEditorConfig, save_map_to_binary_file
 from pythongame.register_game_data import register_all_game_data
 
 MAP_DIR = "resources/maps/"
@@ -45,7 +45,7 @@ ADVANCED_ENTITIES = [
 ]
 WALL_ENTITIES = [MapEditorWorldEntity.wall(wall_type) for wall_type in WallType]
 NPC_ENTITIES = [MapEditorWorldEntity.npc(npc_type) for npc_type in NpcType]
-ITEM_ENTITIES = [MapEditorWorldEntity.item(randomized_item_id(item_type)) for item_type in ItemType]
+ITEM_ENTITIES = [MapEditorWorldEntity.item(randomized_item_id(item_type, random)) for item_type in ItemType]
 MISC_ENTITIES: List[MapEditorWorldEntity] = \
     [
         MapEditorWorldEntity.player(),
@@ -128,7 +128,7 @@ class MapEditor:
         pygame.init()
 
         pygame_screen = pygame.display.set_mode(SCREEN_SIZE)
-        images_by_sprite = load_images_by_sprite(ENTITY_SPRITE_INITIALIZERS)
+        images_by_sprite = LazyImagesBySprite(ENTITY_SPRITE_INITIALIZERS, SPRITE_IMAGES_MAX_NUM_BYTES)
         images_by_ui_sprite = load_images_by_ui_sprite(UI_ICON_SPRITE_PATHS, MAP_EDITOR_UI_ICON_SIZE)
         images_by_portrait_sprite = load_images_by_portrait_sprite(PORTRAIT_ICON_SPRITE_PATHS, PORTRAIT_ICON_SIZE)
         world_view = GameWorldView(pygame_screen, CAMERA_SIZE, SCREEN_SIZE, images_by_sprite)
@@ -220,7 +220,8 @@ class MapEditor:
 
             world_view.render_world(
                 all_entities_to_render=self.game_state.get_all_entities_to_render(),
-                decorations_to_render=self.game_state.get_decorations_to_render(),
+                walls_state=self.game_state.game_world.walls_state,
+                decorations_state=self.game_state.game_world.decorations_state,
                 player_entity=self.game_state.game_world.player_entity,
                 is_player_invisible=self.game_state.player_state.is_invisible,
                 player_active_buffs=self.game_state.player_state.active_buffs,
@@ -264,7 +265,9 @@ class MapEditor:
         game_world = self.game_state.game_world
         map_data = MapData(game_world, self.config, grid_string, game_world.player_entity.get_position())
         save_map_to_json_file(map_data, self.map_file_path)
-        print("Saved state to " + self.map_file_path)
+        # The game loads maps from the binary format, so it's kept up to date with the JSON file
+        binary_map_file_path = save_map_to_binary_file(map_data, self.map_file_path)
+        print("Saved state to " + self.map_file_path + " and " + binary_map_file_path)
 
     def _handle_action(self, action: MapEditorAction, grid_cell_size: int):
         if isinstance(action, GenerateRandomMap):
@@ -350,7 +353,8 @@ class MapEditor:
             room_allowed_width=(8, 25),
             room_allowed_height=(8, 25),
             corridor_allowed_width=(2, 6),
-            generate_npc=self.generate_npc_for_random_map)
+            generate_npc=self.generate_npc_for_random_map,
+            rng=random)
         print("Generating random mapp ...")
         self.grid, rooms = dungeon_generator.generate_random_grid()
         map_json = dungeon_generator.generate_random_map_as_json_from_grid(self.grid, rooms)
@@ -452,7 +456,7 @@ class MapEditor:
         self.game_state.game_world.walls_state.remove_all_from_position(snapped_mouse_world_position)
         for enemy in [e for e in self.game_state.game_world.non_player_characters if
                       e.world_entity.get_position() == snapped_mouse_world_position]:
-            self.game_state.game_world.non_player_characters.remove(enemy)
+            self.game_state.game_world.remove_non_player_character(enemy)
         for consumable in [p for p in self.game_state.game_world.consumables_on_ground
                            if p.world_entity.get_position() == snapped_mouse_world_position]:
             self.game_state.game_world.consumables_on_ground.remove(consumable)
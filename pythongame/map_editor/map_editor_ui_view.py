@@ -12,7 +12,7 @@ from pythongame.core.item_data import create_item_description
 from pythongame.core.item_data import get_item_data
 from pythongame.core.item_inventory import ITEM_EQUIPMENT_CATEGORY_NAMES
 from pythongame.core.math import sum_of_vectors
-from pythongame.core.view.image_loading import ImageWithRelativePosition
+from pythongame.core.view.image_loading import ImageWithRelativePosition, LazyImagesBySprite
 from pythongame.core.view.render_util import DrawableArea
 from pythongame.dungeon_generator import Grid
 from pythongame.map_editor.map_editor_world_entity import MapEditorWorldEntity
@@ -122,7 +122,7 @@ class MapEditorView:
                  pygame_screen,
                  camera_world_area: Rect,
                  screen_size: Tuple[int, int],
-                 images_by_sprite: Dict[Sprite, Dict[Direction, List[ImageWithRelativePosition]]],
+                 images_by_sprite: LazyImagesBySprite,
                  images_by_ui_sprite: Dict[UiIconSprite, Any],
                  images_by_portrait_sprite: Dict[PortraitIconSprite, Any],
                  world_area: Rect,
@@ -1,4 +1,8 @@
+import hashlib
 import json
+import os
+import struct
+from typing import Dict
 
 from pygame.rect import Rect
 
@@ -7,10 +11,16 @@ from pythongame.core.entity_creation import create_npc, create_money_pile_on_gro
     create_consumable_on_ground, create_portal, create_wall, create_decoration_entity, create_item_on_ground, \
     create_chest, create_shrine, \
     create_dungeon_entrance
+from pythongame.core.game_data import WALLS
 from pythongame.core.game_state import NonPlayerCharacter, Wall, Portal, DecorationEntity, \
     MoneyPileOnGround, ItemOnGround, ConsumableOnGround, Chest, Shrine, DungeonEntrance, GameWorldState
 from pythongame.core.world_entity import WorldEntity
 
+BINARY_MAP_FILE_EXTENSION = ".bin"
+BINARY_MAP_FORMAT_VERSION = 2
+BINARY_MAP_REGION_SIZE = 2000  # Must be a multiple of the bucket size (see Buckets)
+GRID_RUN_LENGTH_PREFIX = "rle:"
+
 
 class MapEditorConfig:
     def __init__(self, disable_smart_grid: bool):
@@ -22,11 +32,14 @@ class MapData:
                  game_world: GameWorldState,
                  map_editor_config: MapEditorConfig,
                  grid_string: str,
-                 player_position: Tuple[int, int]):
+                 player_position: Tuple[int, int],
+                 source_hash: Optional[str] = None):
         self.game_world = game_world
         self.map_editor_config = map_editor_config
         self.grid_string = grid_string
         self.player_position = player_position
+        # Hash of the JSON map file that the map was loaded from (if it was loaded with load_map_from_file)
+        self.source_hash = source_hash
 
 
 def load_map_from_json_file(map_file_path: str) -> MapData:
@@ -35,6 +48,94 @@ def load_map_from_json_file(map_file_path: str) -> MapData:
         return create_map_from_json(json_data)
 
 
+# Maps are edited and stored as JSON, but the game loads them from a binary file next to the JSON file if there is
+# one (see MapBinary). The binary file is only used if it was converted from the current version of the JSON file.
+def load_map_from_file(map_file_path: str) -> MapData:
+    binary_map_file_path, source_hash = find_binary_map_file(map_file_path)
+    if binary_map_file_path is not None:
+        map_data = load_map_from_binary_file(binary_map_file_path)
+    else:
+        map_data = load_map_from_json_file(map_file_path)
+    map_data.source_hash = source_hash
+    return map_data
+
+
+# Returns the path of the map's binary file (or None if there is no binary file that was converted from the current
+# version of the JSON file), and the hash of the JSON file
+def find_binary_map_file(map_file_path: str) -> Tuple[Optional[str], str]:
+    with open(map_file_path, 'rb') as map_file:
+        source_hash = _hash_bytes(map_file.read())
+    binary_map_file_path = get_binary_map_file_path(map_file_path)
+    if os.path.exists(binary_map_file_path):
+        with open(binary_map_file_path, 'rb') as binary_map_file:
+            header = MapBinary.read_header_from_file(binary_map_file)
+        if header is not None and header["source_hash"] == source_hash:
+            return binary_map_file_path, source_hash
+    return None, source_hash
+
+
+def load_map_from_binary_file(binary_map_file_path: str) -> MapData:
+    with open(binary_map_file_path, 'rb') as binary_map_file:
+        return MapBinary.deserialize(binary_map_file.read())
+
+
+# The JSON file must be saved first, as the binary file records which version of it that it was converted from
+def save_map_to_binary_file(map_data: MapData, map_file_path: str) -> str:
+    with open(map_file_path, 'rb') as map_file:
+        source_hash = _hash_bytes(map_file.read())
+    binary_map_file_path = get_binary_map_file_path(map_file_path)
+    with open(binary_map_file_path, 'wb') as binary_map_file:
+        binary_map_file.write(MapBinary.serialize(map_data, source_hash))
+    return binary_map_file_path
+
+
+def get_binary_map_file_path(map_file_path: str) -> str:
+    return os.path.splitext(map_file_path)[0] + BINARY_MAP_FILE_EXTENSION
+
+
+# The map is divided into regions of BINARY_MAP_REGION_SIZE, starting from the top left corner of the world
+def get_map_region(entire_world_area: Rect, position: Tuple[int, int]) -> Tuple[int, int]:
+    return (int(position[0] - entire_world_area.x) // BINARY_MAP_REGION_SIZE,
+            int(position[1] - entire_world_area.y) // BINARY_MAP_REGION_SIZE)
+
+
+# The map editor's grid (see dungeon_generator.py) is stored as a run-length encoded string: "rle:W,H:" followed by
+# "value*count" runs of the cell values, column by column. Maps that were saved before that store the grid as nested
+# lists of cell values ("[[0, 0, 3, ...], ...]"), which can still be decoded.
+def encode_grid(size: Tuple[int, int], cells: bytes) -> str:
+    runs = []
+    i = 0
+    num_cells = len(cells)
+    while i < num_cells:
+        value = cells[i]
+        end = i + 1
+        while end < num_cells and cells[end] == value:
+            end += 1
+        runs.append("%i*%i" % (value, end - i))
+        i = end
+    return GRID_RUN_LENGTH_PREFIX + "%i,%i:" % size + ",".join(runs)
+
+
+# Returns the size of the grid and its cell values, column by column
+def decode_grid(grid_string: str) -> Tuple[Tuple[int, int], bytes]:
+    if grid_string.startswith(GRID_RUN_LENGTH_PREFIX):
+        size_string, runs_string = grid_string[len(GRID_RUN_LENGTH_PREFIX):].split(":")
+        w, h = [int(s) for s in size_string.split(",")]
+        cells = bytearray()
+        for run in runs_string.split(","):
+            value, count = run.split("*")
+            cells += bytes((int(value),)) * int(count)
+        if len(cells) != w * h:
+            raise ValueError("Grid has %i cells, expected %i" % (len(cells), w * h))
+        return (w, h), bytes(cells)
+    grid = json.loads(grid_string)
+    return (len(grid), len(grid[0])), bytes(cell for column in grid for cell in column)
+
+
+def _hash_bytes(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
 def create_map_from_json(json_data) -> MapData:
     return MapJson.deserialize(json_data)
 
@@ -120,6 +221,181 @@ class MapJson:
         return MapData(game_world, map_editor_config, grid_string, player_position)
 
 
+# Compact version of the map format, that is much faster to load. Most of a map consists of walls and decorations,
+# so those (and NPCs) are stored as packed arrays of (x, y, type) rather than as JSON objects. The type is an index into
+# a list of type names in the header, so that adding new types doesn't break existing files. The few remaining
+# objects (portals, chests, items, etc) are stored in the header, in the same way as in the JSON format. The grid that
+# the map editor uses is stored as one byte per cell.
+#
+# Walls and decorations are grouped by region (square areas of the map, see get_map_region), and the header lists how
+# many of them there are in each region. That way, large maps can be loaded one region at a time (see
+# map_streaming.py).
+#
+# File layout: header length (4 bytes), header (JSON), walls, decorations, NPCs, and grid.
+class MapBinary:
+
+    @staticmethod
+    def serialize(map_data: MapData, source_hash: Optional[str]) -> bytes:
+        game_world = map_data.game_world
+        entire_world_area = game_world.entire_world_area
+        walls = [(w.world_entity.get_position(), w.wall_type.name) for w in game_world.walls_state.walls]
+        decorations = [(d.get_position(), d.sprite.name) for d in game_world.decorations_state.decoration_entities]
+        npcs = [(npc.world_entity.get_position(), npc.npc_type.name) for npc in game_world.non_player_characters]
+        walls_by_region = MapBinary._group_by_region(walls, entire_world_area)
+        decorations_by_region = MapBinary._group_by_region(decorations, entire_world_area)
+        regions = sorted(set(walls_by_region.keys()) | set(decorations_by_region.keys()))
+        walls = [wall for region in regions for wall in walls_by_region.get(region, [])]
+        decorations = [decoration for region in regions for decoration in decorations_by_region.get(region, [])]
+        wall_types, wall_bytes = MapBinary._pack_typed_positions(walls)
+        decoration_sprites, decoration_bytes = MapBinary._pack_typed_positions(decorations)
+        npc_types, npc_bytes = MapBinary._pack_typed_positions(npcs)
+        grid_size, grid_bytes = MapBinary._pack_grid(map_data.grid_string)
+        header = {
+            "version": BINARY_MAP_FORMAT_VERSION,
+            "source_hash": source_hash,
+            "disable_smart_grid": map_data.map_editor_config.disable_smart_grid,
+            "player": PlayerJson.serialize_from_position(map_data.player_position),
+            "entire_world_area": WorldAreaJson.serialize(entire_world_area),
+            "wall_types": wall_types,
+            "num_walls": len(walls),
+            "decoration_sprites": decoration_sprites,
+            "num_decorations": len(decorations),
+            "npc_types": npc_types,
+            "num_npcs": len(npcs),
+            "region_size": BINARY_MAP_REGION_SIZE,
+            # [region_x, region_y, num_walls, num_decorations], in the order that the walls and decorations are stored
+            "regions": [[region[0], region[1], len(walls_by_region.get(region, [])),
+                         len(decorations_by_region.get(region, []))] for region in regions],
+            "grid_size": grid_size,
+            "consumables_on_ground": [ConsumableJson.serialize(p) for p in game_world.consumables_on_ground],
+            "items_on_ground": [ItemJson.serialize(i) for i in game_world.items_on_ground],
+            "money_piles_on_ground": [MoneyJson.serialize(m) for m in game_world.money_piles_on_ground],
+            "portals": [PortalJson.serialize(p) for p in game_world.portals],
+            "chests": [ChestJson.serialize(c) for c in game_world.chests],
+            "shrines": [ShrineJson.serialize(s) for s in game_world.shrines],
+            "dungeon_entrances": [DungeonEntranceJson.serialize(e) for e in game_world.dungeon_entrances]
+        }
+        header_bytes = json.dumps(header).encode("utf-8")
+        return struct.pack("<I", len(header_bytes)) + header_bytes + wall_bytes + decoration_bytes + npc_bytes + \
+               grid_bytes
+
+    @staticmethod
+    def deserialize(data: bytes) -> MapData:
+        header = MapBinary._read_header(data)
+        if header["version"] != BINARY_MAP_FORMAT_VERSION:
+            raise Exception("Unsupported binary map format version: " + str(header["version"]))
+        walls_offset, decorations_offset, npcs_offset, grid_offset = MapBinary.get_section_offsets(
+            header, struct.unpack_from("<I", data, 0)[0])
+        walls = MapBinary.unpack_walls(data[walls_offset:decorations_offset], header)
+        decorations = MapBinary.unpack_decorations(data[decorations_offset:npcs_offset], header)
+        npcs = [create_npc(npc_type, position)
+                for npc_type, position in MapBinary.unpack_npc_types(data[npcs_offset:grid_offset], header)]
+        game_world = MapBinary.create_game_world(header, walls, decorations, npcs)
+        map_editor_config = MapEditorConfig(disable_smart_grid=header["disable_smart_grid"])
+        grid_string = MapBinary._unpack_grid(data, grid_offset, header["grid_size"])
+        player_position = PlayerJson.deserialize(header["player"])
+        return MapData(game_world, map_editor_config, grid_string, player_position)
+
+    # The objects that are stored in the header (portals, chests, etc) are always part of the world
+    @staticmethod
+    def create_game_world(header, walls: List[Wall], decorations: List[DecorationEntity],
+                          npcs: List[NonPlayerCharacter]) -> GameWorldState:
+        return GameWorldState(
+            non_player_characters=npcs,
+            walls=walls,
+            entire_world_area=WorldAreaJson.deserialize(header["entire_world_area"]),
+            decoration_entities=decorations,
+            portals=[PortalJson.deserialize(p) for p in header["portals"]],
+            chests=[ChestJson.deserialize(c) for c in header["chests"]],
+            shrines=[ShrineJson.deserialize(s) for s in header["shrines"]],
+            dungeon_entrances=[DungeonEntranceJson.deserialize(e) for e in header["dungeon_entrances"]],
+            consumables_on_ground=[ConsumableJson.deserialize(p) for p in header["consumables_on_ground"]],
+            items_on_ground=[ItemJson.deserialize(i) for i in header["items_on_ground"]],
+            money_piles_on_ground=[MoneyJson.deserialize(p) for p in header["money_piles_on_ground"]],
+            player_entity=None,
+        )
+
+    # Returns where the walls, decorations, NPCs and grid start in the file
+    @staticmethod
+    def get_section_offsets(header, header_length: int) -> Tuple[int, int, int, int]:
+        walls_offset = 4 + header_length
+        decorations_offset = walls_offset + header["num_walls"] * 12
+        npcs_offset = decorations_offset + header["num_decorations"] * 12
+        grid_offset = npcs_offset + header["num_npcs"] * 12
+        return walls_offset, decorations_offset, npcs_offset, grid_offset
+
+    @staticmethod
+    def unpack_walls(data: bytes, header) -> List[Wall]:
+        walls = []
+        wall_types = [WallType[name] for name in header["wall_types"]]
+        wall_sizes_and_sprites = [(WALLS[wall_type].size, WALLS[wall_type].sprite) for wall_type in wall_types]
+        for x, y, type_index in struct.iter_unpack("<iii", data):
+            size, sprite = wall_sizes_and_sprites[type_index]
+            walls.append(Wall(wall_types[type_index], WorldEntity((x, y), size, sprite)))
+        return walls
+
+    @staticmethod
+    def unpack_wall_positions(data: bytes) -> List[Tuple[int, int]]:
+        return [(x, y) for x, y, _ in struct.iter_unpack("<iii", data)]
+
+    @staticmethod
+    def unpack_decorations(data: bytes, header) -> List[DecorationEntity]:
+        decoration_sprites = [Sprite[name] for name in header["decoration_sprites"]]
+        return [DecorationEntity((x, y), decoration_sprites[sprite_index])
+                for x, y, sprite_index in struct.iter_unpack("<iii", data)]
+
+    @staticmethod
+    def unpack_npc_types(data: bytes, header) -> List[Tuple[NpcType, Tuple[int, int]]]:
+        npc_types = [NpcType[name] for name in header["npc_types"]]
+        return [(npc_types[type_index], (x, y)) for x, y, type_index in struct.iter_unpack("<iii", data)]
+
+    # Returns None if the file is not a valid binary map
+    @staticmethod
+    def read_header_from_file(binary_map_file) -> Optional[Any]:
+        try:
+            header_length = struct.unpack("<I", binary_map_file.read(4))[0]
+            header = json.loads(binary_map_file.read(header_length).decode("utf-8"))
+            return header if header["version"] == BINARY_MAP_FORMAT_VERSION else None
+        except (ValueError, KeyError, struct.error):
+            return None
+
+    @staticmethod
+    def _read_header(data: bytes):
+        header_length = struct.unpack_from("<I", data, 0)[0]
+        return json.loads(data[4:4 + header_length].decode("utf-8"))
+
+    @staticmethod
+    def _group_by_region(entries: List[Tuple[Tuple[int, int], str]], entire_world_area: Rect) \
+            -> Dict[Tuple[int, int], List[Tuple[Tuple[int, int], str]]]:
+        entries_by_region = {}
+        for entry in entries:
+            entries_by_region.setdefault(get_map_region(entire_world_area, entry[0]), []).append(entry)
+        return entries_by_region
+
+    @staticmethod
+    def _pack_typed_positions(entries: List[Tuple[Tuple[int, int], str]]) -> Tuple[List[str], bytes]:
+        type_names = sorted({type_name for _, type_name in entries})
+        index_by_type_name = {type_name: index for index, type_name in enumerate(type_names)}
+        # Some older maps have decorations at float positions (that are whole numbers all the same)
+        values = [value for (x, y), type_name in entries for value in (int(x), int(y), index_by_type_name[type_name])]
+        return type_names, struct.pack("<%di" % len(values), *values)
+
+    @staticmethod
+    def _pack_grid(grid_string: Optional[str]) -> Tuple[Optional[List[int]], bytes]:
+        if not grid_string:
+            return None, b""
+        (w, h), cells = decode_grid(grid_string)
+        return [w, h], cells
+
+    # The grid is only used by the map editor, which expects it in the same form as in the JSON format
+    @staticmethod
+    def _unpack_grid(data: bytes, offset: int, grid_size: Optional[List[int]]) -> Optional[str]:
+        if grid_size is None:
+            return None
+        w, h = grid_size
+        return encode_grid((w, h), data[offset:offset + w * h])
+
+
 class PlayerJson:
     @staticmethod
     def serialize(entity: WorldEntity):
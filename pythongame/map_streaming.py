@@ -0,0 +1,212 @@
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, List, Tuple, Set
+
+from pygame.rect import Rect
+
+from pythongame.core.common import NpcType, Sprite, WallType
+from pythongame.core.entity_creation import create_npc
+from pythongame.core.game_data import NON_PLAYER_CHARACTERS, WALLS, NpcCategory
+from pythongame.core.game_state import GameWorldState, Wall, DecorationEntity, NonPlayerCharacter
+from pythongame.core.math import get_rect_with_increased_size_in_all_directions, rects_intersect
+from pythongame.map_file import MapData, MapBinary, MapEditorConfig, PlayerJson, WorldAreaJson, \
+    find_binary_map_file, load_map_from_file, get_map_region
+
+# Regions within LOAD_DISTANCE of the camera are loaded in the background, and regions further away than
+# UNLOAD_DISTANCE are unloaded. (The gap between them keeps a region from being loaded and unloaded over and over, as
+# the player walks back and forth along its border.)
+LOAD_DISTANCE = 1200
+UNLOAD_DISTANCE = 2400
+# If the camera gets this close to a region before it has been loaded in the background (as when the player is
+# teleported), the frame waits for the region to be loaded. It covers everything that's rendered, including the
+# margins of the static layer's chunks (see StaticLayerCache).
+REQUIRED_DISTANCE = 700
+
+# Smaller maps are loaded in their entirety, as usual
+MIN_NUM_REGIONS_FOR_STREAMING = 40
+
+use_region_streaming = True
+
+
+# Large maps are not loaded in their entirety. Only the regions around the camera have their walls, decorations and
+# enemies in the world, and as the camera moves, regions are loaded and unloaded. Reading and creating the entities
+# of a region is done on a background thread, and they are added to the world on the main thread once they're ready.
+#
+# Enemies are recreated at their original positions when their region is loaded again, unless they have been killed.
+# An enemy that is close to the camera when its region is unloaded (one that chased the player, for example) stays in
+# the world for good. Other NPC's (and bosses) are few and may be referred to by quests, so they're always loaded.
+#
+# Pathfinding still covers the entire map, as its data is compact and doesn't depend on the entities being loaded.
+class RegionStreamer:
+
+    def __init__(self, binary_map_file_path: str, header, header_length: int):
+        self.binary_map_file_path = binary_map_file_path
+        self._header = header
+        entire_world_area = WorldAreaJson.deserialize(header["entire_world_area"])
+        region_size = header["region_size"]
+        walls_offset, decorations_offset, _, _ = MapBinary.get_section_offsets(header, header_length)
+        self._regions: Dict[Tuple[int, int], _Region] = {}
+        for region_x, region_y, num_walls, num_decorations in header["regions"]:
+            area = Rect(entire_world_area.x + region_x * region_size, entire_world_area.y + region_y * region_size,
+                        region_size, region_size)
+            self._regions[(region_x, region_y)] = _Region(
+                area, walls_offset, num_walls, decorations_offset, num_decorations)
+            walls_offset += num_walls * 12
+            decorations_offset += num_decorations * 12
+        self._entire_world_area = entire_world_area
+        self._region_size = region_size
+        self._loaded_regions: Dict[Tuple[int, int], _Region] = {}
+        self._regions_being_loaded: Dict[Tuple[int, int], Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        # Set by load_streamed_map_from_file
+        self.wall_positions: List[Tuple[int, int]] = []
+
+    # Enemies of a region are created on the main thread, as NPC's need the global path finder
+    def add_enemy_spawn(self, npc_type: NpcType, position: Tuple[int, int]):
+        region = get_map_region(self._entire_world_area, position)
+        if region not in self._regions:
+            area = Rect(self._entire_world_area.x + region[0] * self._region_size,
+                        self._entire_world_area.y + region[1] * self._region_size, self._region_size,
+                        self._region_size)
+            self._regions[region] = _Region(area, 0, 0, 0, 0)
+        self._regions[region].enemy_spawns.append((npc_type, position))
+
+    def get_sprites(self) -> Set[Sprite]:
+        sprites = {WALLS[WallType[name]].sprite for name in self._header["wall_types"]}
+        sprites |= {Sprite[name] for name in self._header["decoration_sprites"]}
+        sprites |= {NON_PLAYER_CHARACTERS[npc_type].sprite for region in self._regions.values()
+                    for npc_type, _ in region.enemy_spawns}
+        return sprites
+
+    # Sizes of the enemies that are spawned when regions are loaded, so that pathfinding can be prepared for them
+    def get_enemy_sizes(self) -> Set[Tuple[int, int]]:
+        return {NON_PLAYER_CHARACTERS[npc_type].size for region in self._regions.values()
+                for npc_type, _ in region.enemy_spawns}
+
+    def update(self, game_world: GameWorldState, camera_world_area: Rect):
+        for index, future in list(self._regions_being_loaded.items()):
+            if future.done():
+                del self._regions_being_loaded[index]
+                self._add_to_world(game_world, index, future.result())
+
+        for index in self._get_regions_close_to(camera_world_area, REQUIRED_DISTANCE):
+            if index not in self._loaded_regions:
+                future = self._regions_being_loaded.pop(index, None)
+                contents = future.result() if future else self._read_region(self._regions[index])
+                self._add_to_world(game_world, index, contents)
+
+        for index in self._get_regions_close_to(camera_world_area, LOAD_DISTANCE):
+            if index not in self._loaded_regions and index not in self._regions_being_loaded:
+                self._regions_being_loaded[index] = self._executor.submit(self._read_region, self._regions[index])
+
+        unload_area = get_rect_with_increased_size_in_all_directions(camera_world_area, UNLOAD_DISTANCE)
+        for index, region in list(self._loaded_regions.items()):
+            if not rects_intersect(region.area, unload_area):
+                self._remove_from_world(game_world, index, camera_world_area)
+
+    def _get_regions_close_to(self, camera_world_area: Rect, distance: int) -> List[Tuple[int, int]]:
+        area = Rect(get_rect_with_increased_size_in_all_directions(camera_world_area, distance))
+        x0, y0 = get_map_region(self._entire_world_area, area.topleft)
+        x1, y1 = get_map_region(self._entire_world_area, area.bottomright)
+        return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1) if (x, y) in self._regions]
+
+    # Runs on the background thread
+    def _read_region(self, region: "_Region") -> Tuple[List[Wall], List[DecorationEntity]]:
+        with open(self.binary_map_file_path, 'rb') as binary_map_file:
+            binary_map_file.seek(region.walls_offset)
+            wall_bytes = binary_map_file.read(region.num_walls * 12)
+            binary_map_file.seek(region.decorations_offset)
+            decoration_bytes = binary_map_file.read(region.num_decorations * 12)
+        return MapBinary.unpack_walls(wall_bytes, self._header), \
+               MapBinary.unpack_decorations(decoration_bytes, self._header)
+
+    def _add_to_world(self, game_world: GameWorldState, index: Tuple[int, int],
+                      contents: Tuple[List[Wall], List[DecorationEntity]]):
+        region = self._regions[index]
+        region.walls, region.decorations = contents
+        game_world.walls_state.add_streamed_walls(region.walls)
+        game_world.decorations_state.add_streamed_decorations(region.decorations)
+        region.enemies = [create_npc(npc_type, position) for npc_type, position in region.enemy_spawns]
+        for npc in region.enemies:
+            game_world.add_non_player_character(npc)
+        self._loaded_regions[index] = region
+
+    def _remove_from_world(self, game_world: GameWorldState, index: Tuple[int, int], camera_world_area: Rect):
+        region = self._loaded_regions.pop(index)
+        game_world.walls_state.remove_streamed_walls(region.walls)
+        game_world.decorations_state.remove_streamed_decorations(region.decorations)
+        npcs_in_world = set(game_world.non_player_characters)
+        area_close_to_camera = get_rect_with_increased_size_in_all_directions(camera_world_area, LOAD_DISTANCE)
+        enemy_spawns = []
+        for enemy, spawn in zip(region.enemies, region.enemy_spawns):
+            # Enemies that have been killed are not spawned again, and the ones that are close to the camera are left
+            # in the world
+            if enemy in npcs_in_world and not rects_intersect(enemy.world_entity.rect(), area_close_to_camera):
+                game_world.remove_non_player_character(enemy)
+                enemy_spawns.append(spawn)
+        region.enemy_spawns = enemy_spawns
+        region.walls = []
+        region.decorations = []
+        region.enemies = []
+
+    # The background thread can't be stored (as when a suspended world is stored on disk, see world_instances.py).
+    # Regions that were being loaded are loaded again when needed.
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_executor"]
+        state["_regions_being_loaded"] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+
+class _Region:
+    def __init__(self, area: Rect, walls_offset: int, num_walls: int, decorations_offset: int, num_decorations: int):
+        self.area = area
+        self.walls_offset = walls_offset
+        self.num_walls = num_walls
+        self.decorations_offset = decorations_offset
+        self.num_decorations = num_decorations
+        self.enemy_spawns: List[Tuple[NpcType, Tuple[int, int]]] = []
+        # Only set while the region is loaded
+        self.walls: List[Wall] = []
+        self.decorations: List[DecorationEntity] = []
+        self.enemies: List[NonPlayerCharacter] = []
+
+
+# Streaming requires the binary version of the map (see map_file.py). Maps that are too small for streaming to be
+# worthwhile, or that don't have an up-to-date binary file, are loaded in their entirety.
+def load_streamed_map_from_file(map_file_path: str) -> MapData:
+    if not use_region_streaming:
+        return load_map_from_file(map_file_path)
+    binary_map_file_path, source_hash = find_binary_map_file(map_file_path)
+    if binary_map_file_path is None:
+        return load_map_from_file(map_file_path)
+    with open(binary_map_file_path, 'rb') as binary_map_file:
+        header = MapBinary.read_header_from_file(binary_map_file)
+        header_length = binary_map_file.tell() - 4
+        if header is None or len(header["regions"]) < MIN_NUM_REGIONS_FOR_STREAMING:
+            return load_map_from_file(map_file_path)
+        walls_offset, decorations_offset, npcs_offset, grid_offset = MapBinary.get_section_offsets(
+            header, header_length)
+        binary_map_file.seek(walls_offset)
+        wall_bytes = binary_map_file.read(decorations_offset - walls_offset)
+        binary_map_file.seek(npcs_offset)
+        npc_bytes = binary_map_file.read(grid_offset - npcs_offset)
+
+    region_streamer = RegionStreamer(binary_map_file_path, header, header_length)
+    region_streamer.wall_positions = MapBinary.unpack_wall_positions(wall_bytes)
+    npcs = []
+    for npc_type, position in MapBinary.unpack_npc_types(npc_bytes, header):
+        npc_data = NON_PLAYER_CHARACTERS[npc_type]
+        if npc_data.npc_category == NpcCategory.ENEMY and not npc_data.is_boss:
+            region_streamer.add_enemy_spawn(npc_type, position)
+        else:
+            npcs.append(create_npc(npc_type, position))
+
+    game_world = MapBinary.create_game_world(header, [], [], npcs)
+    game_world.region_streamer = region_streamer
+    # The grid is only used by the map editor, which loads the entire map
+    map_editor_config = MapEditorConfig(disable_smart_grid=header["disable_smart_grid"])
+    return MapData(game_world, map_editor_config, None, PlayerJson.deserialize(header["player"]), source_hash)
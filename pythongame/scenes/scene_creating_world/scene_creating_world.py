@@ -1,3 +1,4 @@
+import random
 from typing import Optional
 from typing import Tuple
 
@@ -8,9 +9,12 @@ from pythongame.core.game_state import GameState
 from pythongame.core.global_path_finder import init_global_path_finder
 from pythongame.core.hero_upgrades import pick_talent
 from pythongame.core.npc_behaviors import get_quest
+from pythongame.core.pathfinding.npc_pathfinding import get_agent_cell_size, get_cell_size_for_agent_size
 from pythongame.core.quests import QuestId
 from pythongame.core.world_behavior import ChallengeBehavior, StoryBehavior
-from pythongame.map_file import load_map_from_json_file
+from pythongame.core.world_snapshot import get_world_snapshot, update_world_snapshot, WorldSnapshot
+from pythongame.input_recording import get_input_recorder
+from pythongame.map_streaming import load_streamed_map_from_file
 from pythongame.player_file import SavedPlayerState
 from pythongame.scenes.scene_factory import AbstractSceneFactory
 from pythongame.scenes.scenes_game.game_engine import GameEngine
@@ -71,11 +75,21 @@ class CreatingWorldScene(AbstractScene):
         # NPC's share a "global path finder" that needs to be initialized before we start creating NPCs.
         # TODO This is very messy
         path_finder = init_global_path_finder()
-        game_state = self._load_map_and_setup_game_state(map_file_path, picked_hero_id)
-        path_finder.set_grid(game_state.pathfinder_wall_grid)
+        input_recorder = get_input_recorder()
+        rng = random.Random(input_recorder.seed) if input_recorder else None
+        game_state, world_snapshot = self._load_map_and_setup_game_state(map_file_path, picked_hero_id, rng)
+        path_finder.set_clearance_map(game_state.pathfinder_clearance_map, world_snapshot.abstract_graph_edges)
+        game_world = game_state.game_world
+        agent_cell_sizes = {get_agent_cell_size(npc.world_entity) for npc in game_world.non_player_characters}
+        region_streamer = game_world.region_streamer
+        if region_streamer is not None:
+            agent_cell_sizes |= {get_cell_size_for_agent_size(size) for size in region_streamer.get_enemy_sizes()}
+        path_finder.precompute_for_entity_sizes(list(agent_cell_sizes))
+        update_world_snapshot(world_snapshot, game_state.pathfinder_clearance_map, path_finder)
 
         # Must center camera before notifying player position as it affects which walls are shown on the minimap
         game_state.center_camera_on_player()
+        game_state.game_world.update_streamed_regions(game_state.camera_world_area)
         self.ui_view.on_world_area_updated(game_state.game_world.entire_world_area)
         self.ui_view.update_hero(game_state.player_state.hero_id)
 
@@ -133,20 +147,32 @@ class CreatingWorldScene(AbstractScene):
         else:
             world_behavior = StoryBehavior(self.scene_factory, game_engine, game_state, self.ui_view)
 
+        if input_recorder:
+            # A replay sets up the game like this scene does for a new character in the story mode (and nothing else)
+            if saved_player_state or isinstance(world_behavior, ChallengeBehavior):
+                print("WARN: Input can only be recorded for new characters in the story mode. Not recording!")
+            else:
+                input_recorder.start(map_file_path, picked_hero_id, hero_start_level, start_money)
+
         new_hero_was_created = saved_player_state is None
         playing_scene = self.scene_factory.playing_scene(
             game_state, game_engine, world_behavior, self.ui_view, new_hero_was_created, character_file,
             total_time_played_on_character)
         return SceneTransition(playing_scene)
 
-    def _load_map_and_setup_game_state(self, map_file_path: str, picked_hero_id: HeroId) -> GameState:
-        map_data = load_map_from_json_file(map_file_path)
+    def _load_map_and_setup_game_state(self, map_file_path: str, picked_hero_id: HeroId,
+                                       rng: Optional[random.Random]) -> Tuple[GameState, WorldSnapshot]:
+        map_data = load_streamed_map_from_file(map_file_path)
+        world_snapshot = get_world_snapshot(map_data.source_hash)
         game_world = map_data.game_world
         game_world.player_entity = create_hero_world_entity(picked_hero_id, map_data.player_position)
         enabled_portals = {portal.portal_id: portal.world_entity.sprite for portal in game_world.portals
                            if portal.is_enabled}
-        return GameState(game_world=game_world,
-                         camera_size=self.camera_size,
-                         player_state=create_player_state_as_initial(picked_hero_id, enabled_portals),
-                         is_dungeon=False,
-                         player_spawn_position=map_data.player_position)
+        game_state = GameState(game_world=game_world,
+                               camera_size=self.camera_size,
+                               player_state=create_player_state_as_initial(picked_hero_id, enabled_portals),
+                               is_dungeon=False,
+                               player_spawn_position=map_data.player_position,
+                               rng=rng,
+                               pathfinder_clearance=world_snapshot.pathfinder_clearance)
+        return game_state, world_snapshot
@@ -1,10 +1,20 @@
-from typing import Optional
+from typing import Optional, Callable
 
+import pygame
+from pygame.rect import Rect
+
+from pythongame.core.asset_loader import AssetLoader
 from pythongame.core.common import HeroId, Millis, AbstractScene, SceneTransition
+from pythongame.core.view.render_util import DrawableArea
 from pythongame.player_file import SaveFileHandler
 from pythongame.scenes.scene_creating_world.scene_creating_world import InitFlags
 from pythongame.scenes.scene_factory import AbstractSceneFactory
 
+COLOR_BLACK = (0, 0, 0)
+COLOR_WHITE = (250, 250, 250)
+COLOR_PROGRESS_BAR = (200, 200, 200)
+DIR_FONTS = './resources/fonts/'
+
 
 class CommandlineFlags:
     def __init__(self, map_file_name: Optional[str], picked_hero: Optional[HeroId],
@@ -20,16 +30,29 @@ class CommandlineFlags:
                str(self.hero_start_level) + ", " + str(self.start_money) + ")"
 
 
+# Shows the progress while asset files are being loaded, and then moves on to the main menu (or directly into the game,
+# depending on the commandline flags)
 class StartingProgramScene(AbstractScene):
     def __init__(self,
-                 scene_factory: AbstractSceneFactory,
+                 pygame_screen,
+                 asset_loader: AssetLoader,
+                 on_assets_loaded: Callable[[], AbstractSceneFactory],
                  cmd_flags: CommandlineFlags, save_file_handler: SaveFileHandler):
 
-        self.scene_factory = scene_factory
+        self.screen_size = pygame_screen.get_size()
+        self.screen_render = DrawableArea(pygame_screen)
+        self.font = pygame.font.Font(DIR_FONTS + 'Merchant Copy.ttf', 24)
+        self.asset_loader = asset_loader
+        self.on_assets_loaded = on_assets_loaded
+        self.scene_factory: Optional[AbstractSceneFactory] = None
         self.cmd_flags = cmd_flags
         self.save_file_handler = save_file_handler
 
     def run_one_frame(self, _time_passed: Millis) -> Optional[SceneTransition]:
+        if not self.asset_loader.is_done():
+            self.asset_loader.wait(0.05)
+            return None
+        self.scene_factory = self.on_assets_loaded()
 
         map_file_name = self.cmd_flags.map_file_name or "map1.json"
         map_file_path = "resources/maps/" + map_file_name
@@ -78,3 +101,13 @@ class StartingProgramScene(AbstractScene):
                 start_money=0,
                 character_file=None)
             return SceneTransition(self.scene_factory.main_menu_scene(flags))
+
+    def render(self):
+        self.screen_render.fill(COLOR_BLACK)
+        bar_size = (300, 12)
+        x = (self.screen_size[0] - bar_size[0]) // 2
+        y = self.screen_size[1] // 2
+        self.screen_render.text_centered(self.font, "Loading...", (self.screen_size[0] // 2, y - 40), COLOR_WHITE)
+        self.screen_render.rect(COLOR_PROGRESS_BAR, Rect(x - 2, y - 2, bar_size[0] + 4, bar_size[1] + 4), 1)
+        self.screen_render.rect_filled(
+            COLOR_PROGRESS_BAR, Rect(x, y, int(bar_size[0] * self.asset_loader.get_progress()), bar_size[1]))
@@ -1,7 +1,6 @@
 from typing import Optional, Callable, Tuple
 
 from pythongame.core.common import Millis, AbstractScene, SceneTransition, AbstractWorldBehavior
-from pythongame.core.global_path_finder import init_global_path_finder
 from pythongame.scenes.scene_factory import AbstractSceneFactory
 from pythongame.scenes.scenes_game.game_engine import GameEngine
 from pythongame.scenes.scenes_game.game_ui_view import GameUiView
@@ -28,12 +27,10 @@ class SwitchingGameWorldScene(AbstractScene):
         # movement speed affects the hero entity in the game state (in contrast to other stats)
         player_speed_multiplier = self.previous_game_engine.game_state.game_world.player_entity.get_speed_multiplier()
 
-        # NPC's share a "global path finder" that needs to be initialized before we start creating NPCs.
-        # TODO This is very messy
-        path_finder = init_global_path_finder()
+        # Setting up the global path finder is up to this function, as a world that is resumed (see world_instances.py)
+        # already has a path finder of its own
         new_game_engine, new_world_behavior = self.create_new_game_engine_and_behavior(self.previous_game_engine)
         new_game_state = new_game_engine.game_state
-        path_finder.set_grid(new_game_state.pathfinder_wall_grid)
 
         # Must center camera before notifying player position as it affects which walls are shown on the minimap
         new_game_state.center_camera_on_player()
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Optional
 
 from pythongame.core.abilities import ABILITIES, allocate_input_keys_for_abilities, KEYS_BY_ABILITY_TYPE
 from pythongame.core.buff_effects import AbstractBuffEffect, get_buff_effect
@@ -6,10 +6,12 @@ from pythongame.core.common import *
 from pythongame.core.common import EngineEvent
 from pythongame.core.entity_creation import create_money_pile_on_ground, create_item_on_ground, \
     create_consumable_on_ground
+from pythongame.core.frame_phase_timer import FramePhaseTimer
 from pythongame.core.game_data import CONSUMABLES, NON_PLAYER_CHARACTERS, NpcCategory, PORTALS
 from pythongame.core.game_state import GameState, ItemOnGround, ConsumableOnGround, LootableOnGround, BuffWithDuration, \
     EnemyDiedEvent, NonPlayerCharacter, Portal, PlayerLeveledUp, PlayerLearnedNewAbility, WarpPoint, Chest, \
     PlayerUnlockedNewTalent, AgentBuffsUpdate, Shrine
+from pythongame.core.global_path_finder import get_global_path_finder
 from pythongame.core.item_data import ITEM_ENTITY_SIZE, get_item_data_by_type
 from pythongame.core.item_data import randomized_item_id, get_item_data
 from pythongame.core.item_effects import create_item_effect
@@ -35,6 +37,7 @@ class GameEngine:
         self.ability_was_clicked = Observable()
         self.abilities_were_updated = Observable()
         self.consumable_was_clicked = Observable()
+        self.phase_timer: Optional[FramePhaseTimer] = None  # Only set when benchmarking
 
     def try_use_ability(self, ability_type: AbilityType):
         PlayerControls.try_use_ability(ability_type, self.game_state, self.info_message)
@@ -192,7 +195,7 @@ class GameEngine:
     def interact_with_shrine(self, shrine: Shrine):
         if not shrine.has_been_used:
             shrine.has_been_used = True
-            message = apply_shrine_buff_to_player(self.game_state.player_state)
+            message = apply_shrine_buff_to_player(self.game_state.player_state, self.game_state.rng)
             self.info_message.set_message(message)
 
     def use_warp_point(self, warp_point: WarpPoint):
@@ -207,7 +210,7 @@ class GameEngine:
         increased_rare_or_unique_chance = self.game_state.player_state.increased_loot_rare_or_unique_chance
         loot_table = get_loot_table(chest.loot_table)
         loot = loot_table.generate_loot(increased_money_chance, increased_rare_or_unique_chance,
-                                        self.game_state.is_dungeon)
+                                        self.game_state.is_dungeon, self.game_state.rng)
         chest_position = chest.world_entity.get_position()
         self._put_loot_on_ground(chest_position, loot)
         chest.has_been_opened = True
@@ -225,12 +228,22 @@ class GameEngine:
     def run_one_frame(self, time_passed: Millis) -> List[EngineEvent]:
 
         events = []
+        if self.phase_timer:
+            self.phase_timer.start_frame()
+
+        self.game_state.game_world.update_streamed_regions(self.game_state.camera_world_area)
+        self._end_phase("region_streaming")
 
         for npc in self.game_state.game_world.non_player_characters:
             # NonPlayerCharacter AI shouldn't run if enemy is too far out of sight
             if self._is_npc_close_to_camera(npc):
                 npc.npc_mind.control_npc(self.game_state, npc, self.game_state.game_world.player_entity,
                                          self.game_state.player_state.is_invisible, time_passed)
+        self._end_phase("npc_ai")
+
+        # NPCs queue up path requests rather than computing paths right away. Some of them are handled here.
+        get_global_path_finder().process_queued_requests()
+        self._end_phase("pathfinding")
 
         for projectile in self.game_state.game_world.projectile_entities:
             projectile.projectile_controller.notify_time_passed(self.game_state, projectile, time_passed)
@@ -239,6 +252,7 @@ class GameEngine:
             visual_effect.notify_time_passed(time_passed)
 
         self.game_state.handle_camera_shake(time_passed)
+        self._end_phase("projectiles_and_visual_effects")
 
         npcs_that_died = self.game_state.game_world.remove_dead_npcs()
         enemies_that_died = [e for e in npcs_that_died if e.is_enemy]
@@ -258,7 +272,8 @@ class GameEngine:
                 increased_rare_or_unique_chance = self.game_state.player_state.increased_loot_rare_or_unique_chance
                 loot_table = get_loot_table(enemy_that_died.enemy_loot_table)
                 loot: List[LootEntry] = loot_table.generate_loot(
-                    increased_money_chance, increased_rare_or_unique_chance, self.game_state.is_dungeon)
+                    increased_money_chance, increased_rare_or_unique_chance, self.game_state.is_dungeon,
+                    self.game_state.rng)
                 enemy_death_position = enemy_that_died.world_entity.get_position()
                 self._put_loot_on_ground(enemy_death_position, loot)
                 self.game_state.player_state.notify_about_event(EnemyDiedEvent(), self.game_state)
@@ -267,6 +282,7 @@ class GameEngine:
         self.game_state.game_world.remove_expired_projectiles()
         self.game_state.game_world.remove_expired_visual_effects()
         self.game_state.game_world.remove_opened_chests()
+        self._end_phase("deaths_and_loot")
 
         player_buffs_update = self.game_state.player_state.handle_buffs(time_passed)
         for buff in player_buffs_update.buffs_that_started:
@@ -296,6 +312,7 @@ class GameEngine:
         self.game_state.player_state.health_resource.regenerate(time_passed)
         self.game_state.player_state.mana_resource.regenerate(time_passed)
         self.game_state.player_state.recharge_ability_cooldowns(time_passed)
+        self._end_phase("buffs_and_item_effects")
 
         self.game_state.game_world.player_entity.update_movement_animation(time_passed)
         for npc in self.game_state.game_world.non_player_characters:
@@ -324,6 +341,7 @@ class GameEngine:
                 if not visual_effect.attached_to_entity in npcs + projectiles + [
                     self.game_state.game_world.player_entity]:
                     visual_effect.has_expired = True
+        self._end_phase("movement")
 
         # ------------------------------------
         #          HANDLE COLLISIONS
@@ -359,6 +377,7 @@ class GameEngine:
 
         self.game_state.game_world.remove_money_piles_that_have_been_picked_up()
         self.game_state.game_world.remove_projectiles_that_have_been_destroyed()
+        self._end_phase("collisions")
 
         # ------------------------------------
         #       UPDATE CAMERA POSITION
@@ -368,9 +387,14 @@ class GameEngine:
 
         if self.game_state.player_state.health_resource.is_at_or_below_zero():
             events.append(EngineEvent.PLAYER_DIED)
+        self._end_phase("camera")
 
         return events
 
+    def _end_phase(self, phase: str):
+        if self.phase_timer:
+            self.phase_timer.end_phase(phase)
+
     def _handle_gain_exp_events(self, gain_exp_events):
         did_level_up = False
         new_abilities: List[str] = []
@@ -414,7 +438,7 @@ class GameEngine:
     def _put_loot_on_ground(self, enemy_death_position: Tuple[int, int], loot: List[LootEntry]):
         for loot_entry in loot:
             if len(loot) > 1:
-                position_offset = (random.randint(-20, 20), random.randint(-20, 20))
+                position_offset = (self.game_state.rng.randint(-20, 20), self.game_state.rng.randint(-20, 20))
             else:
                 position_offset = (0, 0)
             loot_position = sum_of_vectors(enemy_death_position, position_offset)
@@ -423,7 +447,7 @@ class GameEngine:
                 money_pile_on_ground = create_money_pile_on_ground(loot_entry.amount, loot_position)
                 self.game_state.game_world.money_piles_on_ground.append(money_pile_on_ground)
             elif isinstance(loot_entry, ItemLootEntry):
-                item_id = randomized_item_id(loot_entry.item_type)
+                item_id = randomized_item_id(loot_entry.item_type, self.game_state.rng)
                 item_on_ground = create_item_on_ground(item_id, loot_position)
                 self.game_state.game_world.items_on_ground.append(item_on_ground)
             elif isinstance(loot_entry, AffixedItemLootEntry):
@@ -15,7 +15,7 @@ from pythongame.core.math import is_point_in_rect
 from pythongame.core.quests import Quest
 from pythongame.core.sound_player import play_sound
 from pythongame.core.talents import TalentsState, TalentsConfig
-from pythongame.core.view.render_util import DrawableArea
+from pythongame.core.view.render_util import DrawableArea, text_surface_cache, transparent_rect_cache
 from pythongame.scenes.scenes_game.ui_components import AbilityIcon, ConsumableIcon, ItemIcon, TooltipGraphics, StatBar, \
     ToggleButton, ControlsWindow, StatsWindow, TalentsWindow, ExpBar, Portrait, Minimap, Buffs, Text, \
     DialogOption, Dialog, Checkbox, Button, Message, PausedSplashScreen, TalentTierData, TalentOptionData, TalentIcon, \
@@ -27,6 +27,7 @@ from pythongame.scenes.scenes_game.ui_events import TrySwitchItemInInventory, Ev
 COLOR_WHITE = (250, 250, 250)
 COLOR_BLACK = (0, 0, 0)
 COLOR_BORDER = COLOR_WHITE
+COLOR_UI_PANEL = (20, 10, 0)
 UI_ICON_SIZE = (32, 32)
 UI_ICON_BIG_SIZE = (36, 36)
 PORTRAIT_ICON_SIZE = (100, 70)
@@ -34,6 +35,7 @@ PORTRAIT_ICON_SIZE = (100, 70)
 DIR_FONTS = './resources/fonts/'
 
 HIGHLIGHT_CONSUMABLE_ACTION_DURATION = 120
+RENDER_CACHE_STATS = False  # Shows how often texts and transparent rects are reused from caches instead of recreated
 HIGHLIGHT_ABILITY_ACTION_DURATION = 120
 
 
@@ -86,6 +88,14 @@ class GameUiView:
         self.screen_render = DrawableArea(pygame_screen)
         self.ui_render = DrawableArea(pygame_screen, self._translate_ui_position_to_screen)
         self.ui_screen_area = Rect(0, camera_size[1], screen_size[0], screen_size[1] - camera_size[1])
+        # The UI panel below the camera changes rarely compared to the game world, so it is rendered into a surface
+        # of its own. Only the parts of it that have been marked as dirty are rendered again.
+        self.ui_panel_surface = pygame.Surface(self.ui_screen_area.size)
+        if pygame.display.get_surface() is not None:
+            self.ui_panel_surface = self.ui_panel_surface.convert()
+        self.ui_panel_render = DrawableArea(self.ui_panel_surface)
+        self._dirty_ui_panel_rects: List[Rect] = [Rect((0, 0), self.ui_screen_area.size)]
+        self._was_ui_panel_covered_last_frame = False
         self.camera_size = camera_size
         self.screen_size = screen_size
         self.ability_key_labels = ability_key_labels
@@ -123,10 +133,10 @@ class GameUiView:
         self.consumable_icons: List[ConsumableIcon] = []
         self.inventory_icons_rect: Rect = Rect(0, 0, 0, 0)
         self.inventory_icons: List[ItemIcon] = []
-        self.exp_bar = ExpBar(self.ui_render, Rect(135, 8, 300, 2), self.font_level)
-        self.minimap = Minimap(self.ui_render, Rect(475, 52, 80, 80), Rect(0, 0, 1, 1), (0, 0))
+        self.exp_bar = ExpBar(self.ui_panel_render, Rect(135, 8, 300, 2), self.font_level)
+        self.minimap = Minimap(self.ui_panel_render, Rect(475, 52, 80, 80), Rect(0, 0, 1, 1), (0, 0))
         self.buffs = Buffs(self.ui_render, self.font_buff_texts, (10, -35))
-        self.money_text = Text(self.ui_render, self.font_ui_money, (24, 150), "NO MONEY")
+        self.money_text = Text(self.ui_panel_render, self.font_ui_money, (24, 150), "NO MONEY")
         self.talents_window: TalentsWindow = None
         self.quests_window: QuestsWindow = None
         self.message = Message(self.screen_render, self.font_message, self.ui_screen_area.w // 2,
@@ -182,7 +192,8 @@ class GameUiView:
         for i in range(max_num_abilities):
             x = x_0 + i * (UI_ICON_SIZE[0] + icon_space)
             rect = Rect(x, y, UI_ICON_SIZE[0], UI_ICON_SIZE[1])
-            icon = AbilityIcon(self.ui_render, rect, None, None, self.font_ui_icon_keys, None, None, 0)
+            icon = AbilityIcon(self.ui_panel_render, rect, None, None, self.font_ui_icon_keys, None, None, 0,
+                               tooltip_render=self.ui_render)
             self.ability_icons.append(icon)
 
     def _setup_consumable_icons(self):
@@ -202,8 +213,8 @@ class GameUiView:
             x = x_0 + i * (UI_ICON_SIZE[0] + icon_space)
             rect = Rect(x, y, UI_ICON_SIZE[0], UI_ICON_SIZE[1])
             slot_number = i + 1
-            icon = ConsumableIcon(self.ui_render, rect, None, str(slot_number), self.font_ui_icon_keys, None, [],
-                                  slot_number)
+            icon = ConsumableIcon(self.ui_panel_render, rect, None, str(slot_number), self.font_ui_icon_keys, None,
+                                  [], slot_number, tooltip_render=self.ui_render)
             self.consumable_icons.append(icon)
 
     def _setup_inventory_icons(self):
@@ -222,15 +233,15 @@ class GameUiView:
             x = x_0 + (i % num_slots_per_row) * (UI_ICON_SIZE[0] + icon_space)
             y = y_0 + (i // num_slots_per_row) * (UI_ICON_SIZE[1] + icon_space)
             rect = Rect(x, y, UI_ICON_SIZE[0], UI_ICON_SIZE[1])
-            icon = ItemIcon(self.ui_render, rect, None, None, None, None, i)
+            icon = ItemIcon(self.ui_panel_render, rect, None, None, None, None, i)
             self.inventory_icons.append(icon)
 
     def _setup_health_and_mana_bars(self):
         rect_healthbar = Rect(20, 111, 100, 14)
-        self.healthbar = StatBar(self.ui_render, rect_healthbar, (200, 0, 50), None, 0, 1,
+        self.healthbar = StatBar(self.ui_panel_render, rect_healthbar, (200, 0, 50), None, 0, 1,
                                  show_numbers=True, font=self.font_ui_stat_bar_numbers)
         rect_manabar = Rect(20, 132, 100, 14)
-        self.manabar = StatBar(self.ui_render, rect_manabar, (50, 0, 200), None, 0, 1,
+        self.manabar = StatBar(self.ui_panel_render, rect_manabar, (50, 0, 200), None, 0, 1,
                                show_numbers=True, font=self.font_ui_stat_bar_numbers)
 
     def _setup_toggle_buttons(self):
@@ -239,21 +250,21 @@ class GameUiView:
         w = 150
         h = 20
         font = self.font_buttons
-        self.stats_toggle = ToggleButton(self.ui_render, Rect(x, y_0, w, h), font, "STATS    [A]", ToggleButtonId.STATS,
-                                         False, self.stats_window)
-        self.talents_toggle = ToggleButton(self.ui_render, Rect(x, y_0 + 25, w, h), font, "TALENTS  [N]",
+        self.stats_toggle = ToggleButton(self.ui_panel_render, Rect(x, y_0, w, h), font, "STATS    [A]",
+                                         ToggleButtonId.STATS, False, self.stats_window)
+        self.talents_toggle = ToggleButton(self.ui_panel_render, Rect(x, y_0 + 25, w, h), font, "TALENTS  [N]",
                                            ToggleButtonId.TALENTS, False, self.talents_window)
         # TODO Add hotkey, and handle that user input in this module
-        self.quests_toggle = ToggleButton(self.ui_render, Rect(x, y_0 + 50, w, h), font, "QUESTS   [B]",
+        self.quests_toggle = ToggleButton(self.ui_panel_render, Rect(x, y_0 + 50, w, h), font, "QUESTS   [B]",
                                           ToggleButtonId.QUESTS, False, self.quests_window)
 
-        self.controls_toggle = ToggleButton(self.ui_render, Rect(x, y_0 + 75, w, h), font, "HELP     [H]",
+        self.controls_toggle = ToggleButton(self.ui_panel_render, Rect(x, y_0 + 75, w, h), font, "HELP     [H]",
                                             ToggleButtonId.HELP, False, self.controls_window)
         self.toggle_buttons = [self.stats_toggle, self.talents_toggle, self.quests_toggle, self.controls_toggle]
-        self.sound_checkbox = Checkbox(self.ui_render, Rect(x, y_0 + 100, 70, h), "SOUND", True,
+        self.sound_checkbox = Checkbox(self.ui_panel_render, Rect(x, y_0 + 100, 70, h), "SOUND", True,
                                        lambda _: ToggleSound())
-        self.save_button = Button(self.ui_render, Rect(x + 80, y_0 + 100, 70, h), "SAVE [S]", lambda: SaveGame())
-        self.fullscreen_checkbox = Checkbox(self.ui_render, Rect(x, y_0 + 125, w, h), "FULLSCREEN",
+        self.save_button = Button(self.ui_panel_render, Rect(x + 80, y_0 + 100, 70, h), "SAVE [S]", lambda: SaveGame())
+        self.fullscreen_checkbox = Checkbox(self.ui_panel_render, Rect(x, y_0 + 125, w, h), "FULLSCREEN",
                                             True, lambda _: ToggleFullscreen())
 
     def _setup_stats_window(self):
@@ -278,7 +289,7 @@ class GameUiView:
 
     def _setup_portrait(self):
         rect = Rect(20, 18, PORTRAIT_ICON_SIZE[0], PORTRAIT_ICON_SIZE[1])
-        self.portrait = Portrait(self.ui_render, rect, None)
+        self.portrait = Portrait(self.ui_panel_render, rect, None)
 
     def _setup_dialog(self):
         self.dialog = Dialog(self.screen_render, None, None, [], 0, PORTRAIT_ICON_SIZE, UI_ICON_SIZE)
@@ -335,22 +346,28 @@ class GameUiView:
         self._set_currently_hovered_component_not_hovered()
 
     def _on_hover_component(self, component):
+        if component == self.hovered_component:
+            return
         self._set_currently_hovered_component_not_hovered()
         self.hovered_component = component
         self.hovered_component.hovered = True
+        self._mark_ui_panel_dirty(component.rect)
 
     def _set_currently_hovered_component_not_hovered(self):
         if self.hovered_component is not None:
             self.hovered_component.hovered = False
+            self._mark_ui_panel_dirty(self.hovered_component.rect)
             self.hovered_component = None
 
     def handle_mouse_click(self) -> List[EventTriggeredFromUi]:
         if self.hovered_component in self.toggle_buttons:
             self._on_click_toggle(self.hovered_component)
         elif self.hovered_component in [self.save_button, self.fullscreen_checkbox, self.sound_checkbox]:
+            self._mark_ui_panel_dirty(self.hovered_component.rect)
             return [self.hovered_component.on_click()]
         elif self.hovered_component in self.inventory_icons and self.hovered_component.item_id:
             self.item_slot_being_dragged = self.hovered_component
+            self._mark_ui_panel_dirty(self.inventory_icons_rect)
             return [StartDraggingItemOrConsumable()]
         elif self.hovered_component in self.consumable_icons and self.hovered_component.consumable_types:
             self.consumable_slot_being_dragged = self.hovered_component
@@ -379,6 +396,7 @@ class GameUiView:
                 event = DropItemOnGround(self.item_slot_being_dragged.inventory_slot_index, self.mouse_screen_position)
                 triggered_events.append(event)
             self.item_slot_being_dragged = None
+            self._mark_ui_panel_dirty(self.inventory_icons_rect)
 
         if self.consumable_slot_being_dragged:
             if self.hovered_component in self.consumable_icons and self.hovered_component != self.consumable_slot_being_dragged:
@@ -428,6 +446,7 @@ class GameUiView:
 
     def _on_click_toggle(self, clicked_toggle: ToggleButton):
         play_sound(SoundId.UI_TOGGLE)
+        self._mark_toggle_buttons_dirty()
         if clicked_toggle.is_open:
             self.enabled_toggle.close()
             self.enabled_toggle = None
@@ -440,6 +459,7 @@ class GameUiView:
 
     def close_talent_window(self):
         if self.enabled_toggle == self.talents_toggle:
+            self._mark_toggle_buttons_dirty()
             self.enabled_toggle.close()
             self.enabled_toggle = None
             self._check_for_hovered_components()
@@ -452,18 +472,22 @@ class GameUiView:
         self._setup_talents_window(talents_state)
         if talents_state.has_unpicked_talents() and not self.talents_toggle.is_open:
             self.talents_toggle.highlighted = True
+            self._mark_ui_panel_dirty(self.talents_toggle.rect)
 
     def on_talent_was_unlocked(self, _event):
         if self.enabled_toggle != self.talents_toggle:
             self.talents_toggle.highlighted = True
+            self._mark_ui_panel_dirty(self.talents_toggle.rect)
 
     def on_ability_was_clicked(self, ability_type: AbilityType):
         self.highlighted_ability_action = ability_type
         self._ticks_since_last_ability_action = 0
+        self._mark_ui_panel_dirty(self._ability_icons_area())
 
     def on_consumable_was_clicked(self, slot_number: int):
         self.highlighted_consumable_action = slot_number
         self._ticks_since_last_consumable_action = 0
+        self._mark_ui_panel_dirty(self._consumable_icons_area())
 
     def on_player_movement_speed_updated(self, speed_multiplier: float):
         self.stats_window.player_speed_multiplier = speed_multiplier
@@ -472,6 +496,7 @@ class GameUiView:
         level, ratio_exp_until_next_level = event
         self.exp_bar.update(level, ratio_exp_until_next_level)
         self.stats_window.level = level
+        self._mark_ui_panel_dirty(Rect(self.exp_bar.rect.x - 2, self.exp_bar.rect.y - 2, self.exp_bar.rect.w + 4, 26))
 
     def on_player_quests_updated(self, event: Tuple[List[Quest], List[Quest]]):
         active_quests, completed_quests = event
@@ -479,22 +504,29 @@ class GameUiView:
         self.quests_window.completed_quests = list(completed_quests)
 
     def on_money_updated(self, money: int):
+        self._mark_ui_panel_dirty(self._money_text_area())
         self.money_text.text = "Money: " + str(money)
+        self._mark_ui_panel_dirty(self._money_text_area())
 
     def on_cooldowns_updated(self, ability_cooldowns_remaining: Dict[AbilityType, int]):
         for icon in self.ability_icons:
             ability_type = icon.ability_type
             if ability_type:
                 ability = ABILITIES[ability_type]
-                icon.cooldown_remaining_ratio = ability_cooldowns_remaining[ability_type] / ability.cooldown
+                cooldown_remaining_ratio = ability_cooldowns_remaining[ability_type] / ability.cooldown
+                if cooldown_remaining_ratio != icon.cooldown_remaining_ratio:
+                    icon.cooldown_remaining_ratio = cooldown_remaining_ratio
+                    self._mark_ui_panel_dirty(icon.rect)
 
     def on_health_updated(self, health: Tuple[int, int]):
         value, max_value = health
         self.healthbar.update(value, max_value)
+        self._mark_ui_panel_dirty(self.healthbar.rect)
 
     def on_mana_updated(self, mana: Tuple[int, int]):
         value, max_value = mana
         self.manabar.update(value, max_value)
+        self._mark_ui_panel_dirty(self.manabar.rect)
 
     def on_buffs_updated(self, active_buffs: List[BuffWithDuration]):
         buffs = []
@@ -535,6 +567,7 @@ class GameUiView:
                 label=key_string,
                 ability=ability,
                 ability_type=ability_type)
+        self._mark_ui_panel_dirty(self._ability_icons_area())
 
     def on_consumables_updated(self, consumable_slots: Dict[int, List[ConsumableType]]):
         for i, slot_number in enumerate(consumable_slots):
@@ -547,6 +580,7 @@ class GameUiView:
                 image = self.images_by_ui_sprite[consumable.icon_sprite]
 
             icon.update(image, consumable, consumable_types)
+        self._mark_ui_panel_dirty(self._consumable_icons_area())
 
     def on_inventory_updated(self, item_slots: List[ItemInventorySlot]):
         for i in range(len(item_slots)):
@@ -581,18 +615,23 @@ class GameUiView:
             icon.tooltip = tooltip
             icon.slot_equipment_category = slot_equipment_category
             icon.item_id = item_id
+        self._mark_ui_panel_dirty(self.inventory_icons_rect)
 
     def on_fullscreen_changed(self, fullscreen: bool):
         self.fullscreen_checkbox.checked = fullscreen
+        # The screen has been set up again, so everything needs to be rendered
+        self._mark_ui_panel_dirty(None)
 
     def on_world_area_updated(self, world_area: Rect):
         self.minimap.update_world_area(world_area)
+        self._mark_ui_panel_dirty(self.minimap.rect)
 
     def on_walls_seen(self, seen_wall_positions: List[Tuple[int, int]]):
         self.minimap.add_walls(seen_wall_positions)
 
     def on_player_position_updated(self, center_position: Tuple[int, int]):
         self.minimap.update_player_position(center_position)
+        self._mark_ui_panel_dirty(self.minimap.rect)
 
     # --------------------------------------------------------------------------------------------------------
     #                              HANDLE DIALOG USER INTERACTIONS
@@ -639,15 +678,20 @@ class GameUiView:
     # --------------------------------------------------------------------------------------------------------
 
     def update(self, time_passed: Millis):
-        self.minimap.update(time_passed)
+        if self.minimap.update(time_passed):
+            self._mark_ui_panel_dirty(self.minimap.rect)
 
         self._ticks_since_last_consumable_action += time_passed
-        if self._ticks_since_last_consumable_action > HIGHLIGHT_CONSUMABLE_ACTION_DURATION:
+        if self._ticks_since_last_consumable_action > HIGHLIGHT_CONSUMABLE_ACTION_DURATION \
+                and self.highlighted_consumable_action is not None:
             self.highlighted_consumable_action = None
+            self._mark_ui_panel_dirty(self._consumable_icons_area())
 
         self._ticks_since_last_ability_action += time_passed
-        if self._ticks_since_last_ability_action > HIGHLIGHT_ABILITY_ACTION_DURATION:
+        if self._ticks_since_last_ability_action > HIGHLIGHT_ABILITY_ACTION_DURATION \
+                and self.highlighted_ability_action is not None:
             self.highlighted_ability_action = None
+            self._mark_ui_panel_dirty(self._ability_icons_area())
 
         self.info_message.notify_time_passed(time_passed)
 
@@ -656,6 +700,7 @@ class GameUiView:
         image = self.images_by_portrait_sprite[sprite]
         self.portrait.image = image
         self.stats_window.hero_id = hero_id
+        self._mark_ui_panel_dirty(self.portrait.rect)
 
     def set_paused(self, paused: bool):
         self.paused_splash_screen.shown = paused
@@ -668,20 +713,25 @@ class GameUiView:
 
     def remove_highlight_from_talent_toggle(self):
         self.talents_toggle.highlighted = False
+        self._mark_ui_panel_dirty(self.talents_toggle.rect)
 
     def set_minimap_highlight(self, position_ratio: Tuple[float, float]):
         self.minimap.set_highlight(position_ratio)
+        self._mark_ui_panel_dirty(self.minimap.rect)
 
     def remove_minimap_highlight(self):
         self.minimap.remove_highlight()
+        self._mark_ui_panel_dirty(self.minimap.rect)
 
     def set_inventory_highlight(self, item_id: ItemId):
         for icon in self.inventory_icons:
             if icon.item_id == item_id:
                 self.manually_highlighted_inventory_item = item_id
+        self._mark_ui_panel_dirty(self.inventory_icons_rect)
 
     def remove_inventory_highlight(self):
         self.manually_highlighted_inventory_item = None
+        self._mark_ui_panel_dirty(self.inventory_icons_rect)
 
     # --------------------------------------------------------------------------------------------------------
     #                                          RENDERING
@@ -710,21 +760,45 @@ class GameUiView:
                     mouse_screen_position[1] - relative_mouse_pos[1] - (UI_ICON_BIG_SIZE[1] - UI_ICON_SIZE[1]) // 2)
         self.screen_render.image(big_image, position)
 
-    def render(self):
+    def _mark_ui_panel_dirty(self, ui_rect: Optional[Rect]):
+        # None means that the entire panel is dirty. Highlights and outlines are drawn slightly outside of components.
+        panel_rect = Rect((0, 0), self.ui_screen_area.size)
+        dirty_rect = panel_rect if ui_rect is None else ui_rect.inflate(6, 6).clip(panel_rect)
+        if dirty_rect.w > 0 and dirty_rect.h > 0:
+            self._dirty_ui_panel_rects.append(dirty_rect)
 
-        self.screen_render.rect(COLOR_BORDER, Rect(0, 0, self.camera_size[0], self.camera_size[1]), 1)
-        self.screen_render.rect_filled((20, 10, 0), Rect(0, self.camera_size[1], self.screen_size[0],
-                                                         self.screen_size[1] - self.camera_size[1]))
+    def _mark_toggle_buttons_dirty(self):
+        for toggle in self.toggle_buttons:
+            self._mark_ui_panel_dirty(toggle.rect)
+
+    def _ability_icons_area(self) -> Rect:
+        # Key labels are rendered below the icons
+        row = self.ability_icons_row
+        return Rect(row.x, row.y, row.w, row.h + 20)
+
+    def _consumable_icons_area(self) -> Rect:
+        # Stacked consumables are shown above the icons, and key labels below them
+        row = self.consumable_icons_row
+        return Rect(row.x, row.y - 24, row.w, row.h + 44)
+
+    def _money_text_area(self) -> Rect:
+        return Rect(self.money_text.ui_position, self.font_ui_money.size(self.money_text.text))
+
+    def _render_ui_panel(self):
+        dirty_rect = self._dirty_ui_panel_rects[0].unionall(self._dirty_ui_panel_rects[1:])
+        # Everything is rendered, but only the pixels within the dirty area are changed
+        self.ui_panel_surface.set_clip(dirty_rect)
+        self.ui_panel_render.fill(COLOR_UI_PANEL)
 
         # CONSUMABLES
-        self.ui_render.rect_filled((60, 60, 80), self.consumable_icons_row)
+        self.ui_panel_render.rect_filled((60, 60, 80), self.consumable_icons_row)
         for icon in self.consumable_icons:
             # TODO treat this as state and update it elsewhere
             recently_clicked = icon.slot_number == self.highlighted_consumable_action
             icon.render(recently_clicked)
 
         # ABILITIES
-        self.ui_render.rect_filled((60, 60, 80), self.ability_icons_row)
+        self.ui_panel_render.rect_filled((60, 60, 80), self.ability_icons_row)
         for icon in self.ability_icons:
             ability_type = icon.ability_type
             # TODO treat this as state and update it elsewhere
@@ -733,7 +807,7 @@ class GameUiView:
                 icon.render(recently_clicked)
 
         # ITEMS
-        self.ui_render.rect_filled((60, 60, 80), self.inventory_icons_rect)
+        self.ui_panel_render.rect_filled((60, 60, 80), self.inventory_icons_rect)
         for icon in self.inventory_icons:
             # TODO treat this as state and update it elsewhere
             highlighted = False
@@ -750,20 +824,42 @@ class GameUiView:
         self.minimap.render()
 
         simple_components = [self.exp_bar, self.portrait, self.healthbar, self.manabar, self.money_text,
-                             self.buffs, self.sound_checkbox, self.save_button, self.fullscreen_checkbox,
-                             self.stats_window, self.talents_window, self.quests_window,
-                             self.controls_window] + self.toggle_buttons
+                             self.sound_checkbox, self.save_button, self.fullscreen_checkbox] + self.toggle_buttons
 
         for component in simple_components:
             component.render()
 
-        self.screen_render.rect(COLOR_BORDER, self.ui_screen_area, 1)
+        self.ui_panel_render.rect(COLOR_BORDER, Rect((0, 0), self.ui_screen_area.size), 1)
+        self.ui_panel_surface.set_clip(None)
+
+    # Returns the parts of the screen that may have changed outside of the camera area
+    def render(self) -> List[Rect]:
+        updated_screen_rects = []
+        if self._dirty_ui_panel_rects:
+            self._render_ui_panel()
+            updated_screen_rects += [rect.move(self.ui_screen_area.topleft) for rect in self._dirty_ui_panel_rects]
+            self._dirty_ui_panel_rects = []
+        self.screen_render.image(self.ui_panel_surface, self.ui_screen_area.topleft)
+
+        self.screen_render.rect(COLOR_BORDER, Rect(0, 0, self.camera_size[0], self.camera_size[1]), 1)
+
+        windows = [self.buffs, self.stats_window, self.talents_window, self.quests_window, self.controls_window]
+        for window in windows:
+            window.render()
 
         self.screen_render.rect_transparent(Rect(1, 1, 70, 20), 100, COLOR_BLACK)
         self.screen_render.text(self.font_debug_info, "fps: " + self.fps_string, (6, 4))
         if self.game_mode_string:
             self.screen_render.rect_transparent(Rect(1, 23, 70, 20), 100, COLOR_BLACK)
             self.screen_render.text(self.font_debug_info, self.game_mode_string, (6, 26))
+        if RENDER_CACHE_STATS:
+            self.screen_render.rect_transparent(Rect(1, 45, 250, 42), 100, COLOR_BLACK)
+            self.screen_render.text(self.font_debug_info, "text cache: %i%% (%i/%i)" % (
+                text_surface_cache.hit_ratio() * 100, text_surface_cache.num_hits,
+                text_surface_cache.num_hits + text_surface_cache.num_misses), (6, 48))
+            self.screen_render.text(self.font_debug_info, "rect cache: %i%% (%i/%i)" % (
+                transparent_rect_cache.hit_ratio() * 100, transparent_rect_cache.num_hits,
+                transparent_rect_cache.num_hits + transparent_rect_cache.num_misses), (6, 70))
 
         self.message.render(self.info_message.message)
 
@@ -778,9 +874,20 @@ class GameUiView:
 
         self.dialog.render()
 
-        if self.hovered_component and self.hovered_component.tooltip and not self.item_slot_being_dragged \
-                and not self.consumable_slot_being_dragged:
+        is_tooltip_shown = self.hovered_component and self.hovered_component.tooltip \
+                           and not self.item_slot_being_dragged and not self.consumable_slot_being_dragged
+        if is_tooltip_shown:
             tooltip: TooltipGraphics = self.hovered_component.tooltip
             tooltip.render()
 
         self.paused_splash_screen.render()
+
+        # These may be drawn on top of the UI panel. Then the panel must be updated on screen also in the frame after
+        # they disappear.
+        is_ui_panel_covered = bool(is_tooltip_shown or self.item_slot_being_dragged
+                                   or self.consumable_slot_being_dragged or self.dialog_state.active
+                                   or self.paused_splash_screen.shown)
+        if is_ui_panel_covered or self._was_ui_panel_covered_last_frame:
+            updated_screen_rects.append(self.ui_screen_area)
+        self._was_ui_panel_covered_last_frame = is_ui_panel_covered
+        return updated_screen_rects
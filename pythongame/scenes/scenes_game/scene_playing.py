@@ -1,5 +1,7 @@
 from typing import Optional, Any, List, Tuple, Callable
 
+from pygame.rect import Rect
+
 import pythongame.core.pathfinding.npc_pathfinding
 import pythongame.core.pathfinding.npc_pathfinding
 import pythongame.core.pathfinding.npc_pathfinding
@@ -7,11 +9,13 @@ from pythongame.core.common import AbstractWorldBehavior
 from pythongame.core.common import Millis, SoundId, AbstractScene, SceneTransition, NpcType, ItemType
 from pythongame.core.game_state import GameState, NonPlayerCharacter, LootableOnGround, Portal, WarpPoint, \
     Chest, Shrine, DungeonEntrance
+from pythongame.core.global_path_finder import init_global_path_finder
 from pythongame.core.hero_upgrades import pick_talent
 from pythongame.core.item_data import plain_item_id
 from pythongame.core.math import get_directions_to_position
 from pythongame.core.npc_behaviors import select_npc_action, get_dialog_data, blur_npc_action, \
     hover_npc_action
+from pythongame.core.pathfinding.npc_pathfinding import get_agent_cell_size
 from pythongame.core.sound_player import play_sound, toggle_muted
 from pythongame.core.user_input import ActionTryUseAbility, ActionTryUsePotion, \
     ActionMoveInDirection, ActionStopMoving, ActionPauseGame, ActionToggleRenderDebugging, ActionMouseMovement, \
@@ -19,6 +23,8 @@ from pythongame.core.user_input import ActionTryUseAbility, ActionTryUsePotion,
     ActionChangeDialogOption, PlayingUserInputHandler, ActionRightMouseClicked, ActionPressKey
 from pythongame.core.view.game_world_view import GameWorldView
 from pythongame.core.world_behavior import DungeonBehavior
+from pythongame.core.world_instances import world_instance_manager
+from pythongame.input_recording import get_input_recorder
 from pythongame.leveled_dungeons import create_dungeon_game_state
 from pythongame.player_file import SaveFileHandler
 from pythongame.scenes.scene_factory import AbstractSceneFactory
@@ -49,6 +55,7 @@ class PlayingScene(AbstractScene):
         self.scene_factory = scene_factory
         self.player_interactions_state = PlayerInteractionsState()
         self.world_view = world_view
+        self.world_view.preload_images_for_world(game_state.game_world)
         self.render_hit_and_collision_boxes = False
         self.game_state: GameState = game_state
         self.game_engine: GameEngine = game_engine
@@ -76,8 +83,13 @@ class PlayingScene(AbstractScene):
 
         # TODO handle dialog/no dialog more explicitly as states, and delegate more things to them (?)
 
+        input_recorder = get_input_recorder()
+
         if self.ui_view.has_open_dialog():
             self.game_state.game_world.player_entity.set_not_moving()
+            if input_recorder:
+                # The dialog itself isn't recorded, but the player must stand still in the replay too
+                input_recorder.record_actions([ActionStopMoving()])
             user_actions = get_dialog_actions(events)
             for action in user_actions:
                 if isinstance(action, ActionChangeDialogOption):
@@ -110,6 +122,8 @@ class PlayingScene(AbstractScene):
 
         else:
             user_actions = self.user_input_handler.get_actions(events)
+            if input_recorder:
+                input_recorder.record_actions(user_actions)
             for action in user_actions:
                 if isinstance(action, ActionToggleRenderDebugging):
                     self.render_hit_and_collision_boxes = not self.render_hit_and_collision_boxes
@@ -162,6 +176,9 @@ class PlayingScene(AbstractScene):
                             has_key = self.game_state.player_state.item_inventory.has_item_in_inventory(
                                 plain_item_id(ItemType.PORTAL_KEY))
                             if has_key:
+                                if input_recorder:
+                                    # Replays only cover the world that the game was started in
+                                    input_recorder.stop()
                                 entering_dungeon_scene = self.scene_factory.switching_game_world(
                                     self.game_engine, self.character_file, self.total_time_played_on_character,
                                     self._create_dungeon_engine_and_behavior)
@@ -222,12 +239,18 @@ class PlayingScene(AbstractScene):
 
     def _create_dungeon_engine_and_behavior(self, previous_engine: GameEngine):
         previous_game_state = previous_engine.game_state
+        main_world = world_instance_manager.suspend(previous_game_state)
         player_state = previous_game_state.player_state
+        # NPC's share a "global path finder" that needs to be initialized before we start creating NPCs.
+        path_finder = init_global_path_finder()
         new_game_state = create_dungeon_game_state(player_state, previous_game_state.camera_size,
-                                                   player_state.dungeon_difficulty_level)
+                                                   player_state.dungeon_difficulty_level, previous_game_state.rng)
+        path_finder.set_clearance_map(new_game_state.pathfinder_clearance_map)
+        path_finder.precompute_for_entity_sizes(
+            list({get_agent_cell_size(npc.world_entity) for npc in new_game_state.game_world.non_player_characters}))
         new_game_engine = GameEngine(new_game_state, self.ui_view.info_message)
         new_behavior = DungeonBehavior(
-            self.scene_factory, previous_game_state, new_game_engine, self.ui_view, self.character_file,
+            self.scene_factory, main_world, new_game_engine, self.ui_view, self.character_file,
             self.total_time_played_on_character)
         return new_game_engine, new_behavior
 
@@ -240,6 +263,10 @@ class PlayingScene(AbstractScene):
 
         self.total_time_played_on_character += time_passed
 
+        input_recorder = get_input_recorder()
+        if input_recorder:
+            input_recorder.end_tick(time_passed)
+
         if not self.ui_view.has_open_dialog():
             self.player_interactions_state.handle_nearby_entities(
                 self.game_state.game_world.player_entity, self.game_state, self.game_engine)
@@ -259,7 +286,7 @@ class PlayingScene(AbstractScene):
 
         return None
 
-    def render(self):
+    def render(self) -> List[Rect]:
 
         entity_action_text = None
         # Don't display any actions on screen if player is stunned. It would look weird when using warp stones
@@ -271,7 +298,8 @@ class PlayingScene(AbstractScene):
         game_world = self.game_state.game_world
         self.world_view.render_world(
             all_entities_to_render=self.game_state.get_all_entities_to_render(),
-            decorations_to_render=self.game_state.get_decorations_to_render(),
+            walls_state=game_world.walls_state,
+            decorations_state=game_world.decorations_state,
             player_entity=game_world.player_entity,
             is_player_invisible=player_state.is_invisible,
             player_active_buffs=player_state.active_buffs,
@@ -284,7 +312,8 @@ class PlayingScene(AbstractScene):
             entire_world_area=game_world.entire_world_area,
             entity_action_text=entity_action_text)
 
-        self.ui_view.render()
+        # The game world is rendered every frame, but the UI only changes some parts of the screen outside of it
+        return [Rect((0, 0), self.world_view.camera_size)] + self.ui_view.render()
 
     def _save_game(self):
         play_sound(SoundId.EVENT_SAVED_GAME)
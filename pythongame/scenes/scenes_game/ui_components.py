@@ -318,9 +318,10 @@ class TooltipGraphics:
 class AbilityIcon(UiComponent):
     def __init__(self, ui_render: DrawableArea, rect: Rect, image, label: Optional[str], font,
                  tooltip: Optional[TooltipGraphics], ability_type: Optional[AbilityType],
-                 cooldown_remaining_ratio: float):
+                 cooldown_remaining_ratio: float, tooltip_render: Optional[DrawableArea] = None):
         super().__init__(rect)
         self._ui_render = ui_render
+        self._tooltip_render = tooltip_render or ui_render
         self._font = font
         self.image = image
         self.label = label
@@ -354,7 +355,7 @@ class AbilityIcon(UiComponent):
             tooltip_details = [DetailLine("Cooldown: " + str(ability.cooldown / 1000.0) + " s"),
                                DetailLine("Mana: " + str(ability.mana_cost)),
                                DetailLine(ability.description)]
-            self.tooltip = TooltipGraphics(self._ui_render, COLOR_WHITE, ability.name, tooltip_details,
+            self.tooltip = TooltipGraphics(self._tooltip_render, COLOR_WHITE, ability.name, tooltip_details,
                                            bottom_left=self.rect.topleft)
         else:
             self.tooltip = None
@@ -363,9 +364,11 @@ class AbilityIcon(UiComponent):
 
 class ConsumableIcon(UiComponent):
     def __init__(self, ui_render: DrawableArea, rect: Rect, image, label: str, font, tooltip: Optional[TooltipGraphics],
-                 consumable_types: List[ConsumableType], slot_number: int):
+                 consumable_types: List[ConsumableType], slot_number: int,
+                 tooltip_render: Optional[DrawableArea] = None):
         super().__init__(rect)
         self._ui_render = ui_render
+        self._tooltip_render = tooltip_render or ui_render
         self._image = image
         self._label = label
         self._font = font
@@ -404,7 +407,8 @@ class ConsumableIcon(UiComponent):
         self._image = image
         self.consumable_types = consumable_types
         if top_consumable:
-            self.tooltip = TooltipGraphics.create_for_consumable(self._ui_render, top_consumable, self.rect.topleft)
+            self.tooltip = TooltipGraphics.create_for_consumable(self._tooltip_render, top_consumable,
+                                                                 self.rect.topleft)
         else:
             self.tooltip = None
 
@@ -1053,9 +1057,12 @@ class Minimap(UiComponent):
     def get_position_ratio(self, point: Tuple[int, int]) -> Tuple[float, float]:
         return (point[0] - self.rect.x) / self.rect.w, (point[1] - self.rect.y) / self.rect.h
 
-    def update(self, time_passed: Millis):
+    # Returns True if the minimap changed
+    def update(self, time_passed: Millis) -> bool:
         if self._timer.update_and_check_if_ready(time_passed):
             self._update_wall_pixel_positions()
+            return True
+        return False
 
     def update_camera_area(self, camera_world_area: Rect):
         self.camera_rect_ratio = ((camera_world_area.x - self._world_area.x) / self._world_area.w,
@@ -10,6 +10,8 @@ parser.add_argument('--hero')
 parser.add_argument('--level')
 parser.add_argument('--money')
 parser.add_argument('--file')
+parser.add_argument('--record', help="Record input to this file, so that the game can be replayed with run_headless.py")
+parser.add_argument('--seed', type=int, help="Seed for the game's random generator when recording (random by default)")
 args = parser.parse_args()
 
-main.start(args.map, args.hero, args.level, args.money, args.file)
+main.start(args.map, args.hero, args.level, args.money, args.file, args.record, args.seed)
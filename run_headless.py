@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+
+import argparse
+
+from pythongame import headless_runner
+from pythongame.core.common import Millis
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--map')
+parser.add_argument('--hero')
+parser.add_argument('--ticks', type=int, default=1000)
+parser.add_argument('--tick-duration', type=int, default=16, help="Milliseconds of game time per tick")
+parser.add_argument('--seed', type=int)
+parser.add_argument('--replay', help="Replay a recording that was made with 'run.py --record'")
+args = parser.parse_args()
+
+headless_runner.main(args.map, args.hero, args.ticks, Millis(args.tick_duration), args.seed, args.replay)